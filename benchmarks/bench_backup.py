@@ -0,0 +1,69 @@
+"""
+Throughput and memory of encrypted backup export and restore.
+
+For each vault size this exports a synthetic vault with backup.export_backup
+and reads it back with backup.restore_backup, for each cipher, printing MB/s
+(including the passphrase key derivation, which dominates small vaults)
+and the peak memory traced during each step (a separate tracemalloc run, as
+tracing slows everything down). The peak should stay flat as the vault grows.
+Run from the project root:
+    python benchmarks/bench_backup.py [sizes...]      e.g. 10000 100000
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import backup
+
+SIZES = [10_000, 100_000]
+PASSPHRASE = "correct horse battery staple"
+
+
+def entries(size):
+    # Generated on the fly, so the vault itself does not count towards the peak
+    for i in range(size):
+        yield f"site-{i}.com", {"username": f"user{i}@example.com", "index": i}
+
+
+def get_secret(entry):
+    return {"password": f"Passw0rd!{entry['index']}", "notes": "note " * (entry["index"] % 40)}
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def peak_kib(func, *args):
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main(sizes):
+    print(f"{'entries':>8}  {'cipher':>18}  {'size (MB)':>9}  {'export MB/s':>11}  {'restore MB/s':>12}  "
+          f"{'export peak KiB':>15}  {'restore peak KiB':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "vault.cvbackup")
+        for size in sizes:
+            for cipher in backup.CIPHERS:
+                export_time = timed(backup.export_backup, path, entries(size), get_secret, PASSPHRASE, cipher)
+                megabytes = os.path.getsize(path) / 2**20
+                restore_time = timed(lambda: sum(1 for _ in backup.restore_backup(path, PASSPHRASE)))
+
+                export_peak = peak_kib(backup.export_backup, path, entries(size), get_secret, PASSPHRASE, cipher)
+                restore_peak = peak_kib(lambda: sum(1 for _ in backup.restore_backup(path, PASSPHRASE)))
+
+                print(f"{size:>8}  {cipher:>18}  {megabytes:>9.1f}  {megabytes / export_time:>11.1f}  "
+                      f"{megabytes / restore_time:>12.1f}  {export_peak:>15.0f}  {restore_peak:>16.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
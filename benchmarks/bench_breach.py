@@ -0,0 +1,82 @@
+"""
+Lookup latency of the offline breach corpus, with and without its Bloom filter.
+
+Builds a corpus of random SHA-1 hashes for each size, then times lookups of
+hashes that are in it (hits) and random ones that are not (misses). Pass a
+corpus file instead of sizes to time an existing (e.g. full HIBP) corpus.
+
+Run from the project root:
+    python benchmarks/bench_breach.py [sizes...]      e.g. 100000 1000000 10000000
+    python benchmarks/bench_breach.py path/to/breach_corpus.bin
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import breach_check
+
+SIZES = [100_000, 1_000_000]
+LOOKUPS = 50_000
+
+
+def per_lookup_us(corpus, digests):
+    start = time.perf_counter()
+    for digest in digests:
+        corpus.contains_digest(digest)
+    return (time.perf_counter() - start) / len(digests) * 1e6
+
+
+def report(label, corpus, hits):
+    rng = random.Random(1)
+    misses = [rng.randbytes(20) for _ in range(LOOKUPS)]
+    false_matches = sum(corpus.contains_digest(digest) for digest in misses)
+    size_mb = os.path.getsize(corpus.path) / 2 ** 20
+    print(f"{corpus.count:>11,}  {label:>8}  {size_mb:>9.1f}  {per_lookup_us(corpus, hits):>8.2f}  "
+          f"{per_lookup_us(corpus, misses):>9.2f}  {false_matches:>13}")
+
+
+def main(sizes):
+    print(f"{'hashes':>11}  {'bloom':>8}  {'file (MB)':>9}  {'hit (us)':>8}  {'miss (us)':>9}  {'false matches':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            rng = random.Random(size)
+            digests = [rng.randbytes(20) for _ in range(size)]
+            hits = rng.sample(digests, min(LOOKUPS, size))
+            lines = (digest.hex().upper() + ":1" for digest in digests)
+            dump = os.path.join(tmp, "dump.txt")
+            with open(dump, "w") as f:
+                f.writelines(line + "\n" for line in lines)
+
+            for bloom in (False, True):
+                path = os.path.join(tmp, f"corpus-{size}-{bloom}.bin")
+                with open(dump) as f:
+                    breach_check.build_corpus(f, path, bloom=bloom)
+                corpus = breach_check.BreachCorpus(path)
+                report("yes" if bloom else "no", corpus, hits)
+                corpus.close()
+                os.remove(path)
+
+
+def main_existing(path):
+    corpus = breach_check.BreachCorpus(path)
+    # Every record is a hit; read some back as full-length probes
+    rng = random.Random(1)
+    width, base = corpus.prefix_bytes, corpus._records
+    hits = []
+    for index in (rng.randrange(corpus.count) for _ in range(min(LOOKUPS, corpus.count))):
+        start = base + index * width
+        hits.append(corpus._map[start:start + width])
+    print(f"{'hashes':>11}  {'bloom':>8}  {'file (MB)':>9}  {'hit (us)':>8}  {'miss (us)':>9}  {'false matches':>13}")
+    report("yes" if corpus._bloom_bits else "no", corpus, hits)
+    corpus.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2 and not sys.argv[1].isdigit():
+        main_existing(sys.argv[1])
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or SIZES)
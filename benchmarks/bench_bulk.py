@@ -0,0 +1,74 @@
+"""
+Bulk edits against one write per account.
+
+For each batch size this selects that many accounts in a 20,000 account vault
+(in a temporary directory) and runs each bulk operation in bulk_ops, writing
+its change set with a single vault.write_changes(), as the GUI does. For
+comparison, "per account" writes the same change set one account at a time,
+which is what editing or deleting the accounts one by one costs. Times
+include computing the change set. Run from the project root:
+    python benchmarks/bench_bulk.py [batch sizes...]      e.g. 100 1000 10000
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cryptography.fernet import Fernet
+from src import bulk_ops, vault
+
+SIZES = [100, 1_000, 10_000]
+VAULT_SIZE = 20_000
+
+OPERATIONS = {
+    "move": lambda data, names: (bulk_ops.move_changes(data, names, "Work"), None),
+    "username": lambda data, names: (bulk_ops.username_changes(data, names, "shared@example.com"), None),
+    "rename": lambda data, names: bulk_ops.rename_changes(data, names, "site-*.com", "site-*.org"),
+    "delete": lambda data, names: (bulk_ops.delete_changes(data, names), None),
+}
+
+
+def apply(data, changes):
+    for name, entry in changes.items():
+        if entry is None:
+            data.pop(name, None)
+        else:
+            data[name] = entry
+
+
+def main(sizes):
+    fernet = Fernet(Fernet.generate_key())
+    base = {f"site-{i}.com": vault.make_entry(f"user{i}@example.com", f"Passw0rd!{i}", "", fernet)
+            for i in range(VAULT_SIZE)}
+
+    print(f"{'accounts':>8}  {'operation':>9}  {'bulk (ms)':>9}  {'per account (ms)':>16}  {'speed-up':>8}")
+    for size in sizes:
+        for operation, build in OPERATIONS.items():
+            timings = []
+            for per_account in (False, True):
+                with tempfile.TemporaryDirectory() as tmp:
+                    vault.use_data_dir(tmp)
+                    data = dict(base)
+                    vault.write_changes(data, fernet, len(data))
+                    names = list(data)[:size]
+
+                    start = time.perf_counter()
+                    changes, _ = build(data, names)
+                    if per_account:
+                        for name, entry in changes.items():
+                            vault.write_changes({name: entry}, fernet, bulk_ops.live_count(data, {name: entry}))
+                            apply(data, {name: entry})
+                    else:
+                        vault.write_changes(changes, fernet, bulk_ops.live_count(data, changes))
+                        apply(data, changes)
+                    timings.append((time.perf_counter() - start) * 1000)
+                    vault.close()
+
+            bulk, single = timings
+            print(f"{size:>8}  {operation:>9}  {bulk:>9.1f}  {single:>16.1f}  {single / bulk:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
@@ -0,0 +1,84 @@
+"""
+Size and latency of the vault record formats.
+
+Compares the original JSON records with the codec under each compression
+setting (none writes compact JSON; zlib and lzma write compressed binary
+bodies once a record is worth compressing) on a vault with long notes. For each format it reports the
+size of vault.log and the time to save (full rewrite) and load (index
+replay + decrypting every secret).
+
+Run from the project root:
+    python benchmarks/bench_codec.py [entries] [notes_length]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cryptography.fernet import Fernet
+from src import codec, vault
+
+ENTRIES = 5_000
+NOTES_LENGTH = 2_000
+
+WORDS = ("recovery code backup email pin security question answer account "
+         "billing address phone support ticket renewal date").split()
+
+
+def make_notes(i, length):
+    words = []
+    while sum(len(w) + 1 for w in words) < length:
+        words.append(WORDS[(i + len(words) * 7) % len(WORDS)])
+    return " ".join(words)
+
+
+def run(label, data, fernet):
+    with tempfile.TemporaryDirectory() as tmp:
+        vault.use_data_dir(tmp)
+        vault.set_fsync_policy("never")
+
+        start = time.perf_counter()
+        vault.save_vault(data, fernet)
+        save = time.perf_counter() - start
+        size = os.path.getsize(vault.LOG_FILE)
+
+        start = time.perf_counter()
+        loaded = vault.load_vault(fernet)
+        for entry in loaded.values():
+            vault.get_secret(entry, fernet)
+        load = time.perf_counter() - start
+
+    print(f"{label:>12}  {size / 1024:>10.0f}  {save * 1000:>9.0f}  {load * 1000:>9.0f}")
+
+
+def main(entries, notes_length):
+    fernet = Fernet(Fernet.generate_key())
+    plain = [(i, make_notes(i, notes_length)) for i in range(entries)]
+
+    print(f"{entries} entries, {notes_length}-char notes")
+    print(f"{'format':>12}  {'size (KiB)':>10}  {'save (ms)':>9}  {'load (ms)':>9}")
+
+    # Baseline: records serialized with json.dumps, as before the codec existed
+    encode = codec.encode
+    codec.encode = lambda record, compression=None: json.dumps(record).encode()
+    try:
+        data = {f"site-{i}.com": vault.make_entry(f"user{i}@example.com", f"Passw0rd!{i}", notes, fernet)
+                for i, notes in plain}
+        run("json", data, fernet)
+    finally:
+        codec.encode = encode
+
+    for compression in codec.COMPRESSORS:
+        vault.set_compression(compression)
+        data = {f"site-{i}.com": vault.make_entry(f"user{i}@example.com", f"Passw0rd!{i}", notes, fernet)
+                for i, notes in plain}
+        run(f"codec+{compression}", data, fernet)
+    vault.set_compression("none")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [ENTRIES, NOTES_LENGTH][len(args):]))
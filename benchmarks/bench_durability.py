@@ -0,0 +1,62 @@
+"""
+Durability cost of the vault log at different sizes and fsync policies.
+
+For each vault size and FSYNC_POLICY this measures:
+  * append  - mean latency of persisting one changed entry (write_changes)
+  * rewrite - one full atomic rewrite (save_vault: temp file, fsync, rename,
+              directory fsync and generation rotation)
+
+Run from the project root:
+    python benchmarks/bench_durability.py [sizes...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cryptography.fernet import Fernet
+from src import vault
+
+SIZES = [100, 1_000, 10_000]
+APPENDS = 50
+
+
+def build_vault(size, fernet):
+    return {
+        f"site-{i}.com": vault.make_entry(f"user{i}@example.com", f"Passw0rd!{i}", "", fernet)
+        for i in range(size)
+    }
+
+
+def bench(size, policy, data, fernet):
+    with tempfile.TemporaryDirectory() as tmp:
+        vault.use_data_dir(tmp)
+        vault.set_fsync_policy(policy)
+
+        start = time.perf_counter()
+        vault.save_vault(data, fernet)
+        rewrite = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(APPENDS):
+            name = f"site-{i}.com"
+            vault.write_changes({name: data[name]}, fernet)
+        append = (time.perf_counter() - start) / APPENDS
+
+    return append, rewrite
+
+
+def main(sizes):
+    fernet = Fernet(Fernet.generate_key())
+    print(f"{'entries':>8}  {'policy':>8}  {'append (ms)':>12}  {'rewrite (ms)':>13}")
+    for size in sizes:
+        data = build_vault(size, fernet)
+        for policy in vault.FSYNC_POLICIES:
+            append, rewrite = bench(size, policy, data, fernet)
+            print(f"{size:>8}  {policy:>8}  {append * 1000:>12.3f}  {rewrite * 1000:>13.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
@@ -0,0 +1,69 @@
+"""
+Bulk import throughput, from export file to vault on disk.
+
+For each size this writes a Chrome-style CSV export (with some duplicate
+rows and realistic passwords), imports it with importer.import_accounts
+into an empty vault in a temporary directory and persists the result with
+one vault.write_changes, timing both steps. The process's peak resident
+memory is printed too (Unix only). Run from the project root:
+    python benchmarks/bench_import.py [sizes...]      e.g. 10000 100000
+"""
+import csv
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cryptography.fernet import Fernet
+from src import importer, vault
+from src.password_policy import PasswordPolicy
+
+SIZES = [10_000, 100_000]
+WORDS = ["dragon", "summer", "monkey", "Orange", "falcon", "river", "Castle", "pepper", "tiger", "silver"]
+
+
+def write_export(path, size):
+    rng = random.Random(size)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "url", "username", "password", "note"])
+        for i in range(size):
+            if i and rng.random() < 0.05:
+                i = rng.randrange(i)  # a duplicate of an earlier row
+            password = rng.choice([
+                f"{rng.choice(WORDS)}{rng.randint(0, 9999)}!",
+                "".join(rng.choices("abcdefghijkmnpqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ23456789!@#$%", k=16)),
+            ])
+            writer.writerow([f"site-{i}.com", f"https://site-{i}.com/login", f"user{i}@example.com", password, ""])
+
+
+def main(sizes):
+    fernet = Fernet(Fernet.generate_key())
+    policy = PasswordPolicy({})
+    print(f"{'rows':>8}  {'imported':>8}  {'import (s)':>10}  {'write (s)':>9}  {'rows/s':>9}  {'peak RSS MB':>11}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            export = os.path.join(tmp, "export.csv")
+            write_export(export, size)
+            vault.use_data_dir(tmp)
+
+            start = time.perf_counter()
+            entries, report = importer.import_accounts(export, {}, fernet, policy)
+            import_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            vault.write_changes(entries, fernet, len(entries))
+            write_time = time.perf_counter() - start
+
+            total = import_time + write_time
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+            print(f"{size:>8}  {report['imported']:>8}  {import_time:>10.2f}  {write_time:>9.2f}  "
+                  f"{size / total:>9,.0f}  {peak:>11.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
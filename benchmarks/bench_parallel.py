@@ -0,0 +1,67 @@
+"""
+Speedup of bulk vault crypto with 1, 2, 4 and 8 worker threads.
+
+For each vault size and worker count this measures:
+  * unlock    - load_vault (decrypting every index token)
+  * reencrypt - re-keying the stored vault under a new key (rekey_vault)
+  * secrets   - decrypting every password/notes token (the export path)
+
+Speedup is relative to one worker. Run from the project root:
+    python benchmarks/bench_parallel.py [sizes...]      e.g. 10000 100000 1000000
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cryptography.fernet import Fernet
+from src import vault
+
+SIZES = [10_000, 100_000]
+WORKER_COUNTS = [1, 2, 4, 8]
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main(sizes):
+    fernet = Fernet(Fernet.generate_key())
+    print(f"CPU cores available: {os.cpu_count()}")
+    print(f"{'entries':>9}  {'workers':>7}  {'unlock (s)':>10}  {'reencrypt (s)':>13}  {'secrets (s)':>11}  {'speedup':>20}")
+
+    for size in sizes:
+        vault.set_workers(0)
+        data = {
+            f"site-{i}.com": vault.make_entry(f"user{i}@example.com", f"Passw0rd!{i}", "", fernet)
+            for i in range(size)
+        }
+
+        with tempfile.TemporaryDirectory() as tmp:
+            vault.use_data_dir(tmp)
+            vault.set_fsync_policy("never")
+            vault.save_vault(data, fernet)
+
+            # Each run re-keys the vault under a fresh key, as a password change does
+            key = fernet
+            baseline = None
+            for workers in WORKER_COUNTS:
+                vault.set_workers(workers)
+                unlock = timed(lambda: vault.load_vault(key))
+                new_key = Fernet(Fernet.generate_key())
+                reencrypt = timed(lambda: vault.rekey_vault(key, new_key))
+                key = new_key
+                secrets = timed(lambda: vault.get_secrets(data.values(), fernet))
+
+                times = (unlock, reencrypt, secrets)
+                baseline = baseline or times
+                speedup = " / ".join(f"{b / t:.1f}x" for b, t in zip(baseline, times))
+                print(f"{size:>9}  {workers:>7}  {unlock:>10.2f}  {reencrypt:>13.2f}  {secrets:>11.2f}  {speedup:>20}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
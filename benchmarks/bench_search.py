@@ -0,0 +1,61 @@
+"""
+Search latency while typing, for tuning the search debounce delay.
+
+Simulates a user typing a few queries at a fixed keystroke interval into the
+search worker, for each vault size and debounce delay, and reports:
+  * searches  - how many queries actually ran (the rest were skipped or dropped)
+  * latency   - mean / p95 time from the last keystroke to the result
+  * search    - mean / p95 time spent matching
+
+Run from the project root:
+    python benchmarks/bench_search.py [sizes...]      e.g. 10000 100000 1000000
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.search_index import TrigramIndex
+from src.search_scheduler import SearchScheduler
+
+SIZES = [10_000, 100_000]
+DELAYS_MS = [0, 50, 150, 300]
+KEYSTROKE_MS = 80
+QUERIES = ["site-12", "user4", "example", "e-99", "github"]
+
+
+def type_queries(scheduler, delivered):
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            scheduler.submit(query[:end])
+            time.sleep(KEYSTROKE_MS / 1000)
+        # Wait for the final query's result before typing the next one
+        while not delivered.wait(5) or not scheduler.is_current(query):
+            pass
+        delivered.clear()
+
+
+def main(sizes):
+    print(f"keystroke interval: {KEYSTROKE_MS} ms, {sum(map(len, QUERIES))} keystrokes")
+    print(f"{'entries':>9}  {'delay (ms)':>10}  {'searches':>8}  {'latency mean/p95 (ms)':>22}  {'search mean/p95 (ms)':>21}")
+
+    for size in sizes:
+        index = TrigramIndex()
+        index.rebuild((f"site-{i}.com", f"user{i}@example.com") for i in range(size))
+
+        for delay in DELAYS_MS:
+            delivered = threading.Event()
+            scheduler = SearchScheduler(index.query, lambda query, result: delivered.set(), delay=delay / 1000)
+            type_queries(scheduler, delivered)
+            stats = scheduler.stats()
+            scheduler.stop()
+
+            print(f"{size:>9}  {delay:>10}  {stats['completed']:>8}  "
+                  f"{stats['latency_mean_ms']:>10.1f} / {stats['latency_p95_ms']:<9.1f}  "
+                  f"{stats['search_mean_ms']:>9.1f} / {stats['search_p95_ms']:<9.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
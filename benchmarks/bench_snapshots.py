@@ -0,0 +1,96 @@
+"""
+Storage growth of incremental snapshots over simulated edit sessions.
+
+Starting from a vault of each size (log backend, in a temporary directory),
+this runs SESSIONS edit sessions. Each one changes a few accounts, sometimes
+adds or deletes one, and now and then compacts the log. It then closes the
+vault and takes a snapshot, as locking does. Every 100 sessions it prints
+the size of the snapshot store next to what keeping a full copy per session
+would take, and the mean snapshot time so far. Listing, restoring the newest
+and oldest snapshot, and pruning to the newest 50 are timed at the end.
+Run from the project root:
+    python benchmarks/bench_snapshots.py [sizes...]      e.g. 1000 10000
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cryptography.fernet import Fernet
+from src import snapshots, vault
+
+SIZES = [1_000, 10_000]
+SESSIONS = 1_000
+KEEP = 50
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def edit_session(rng, data, fernet, number):
+    changes = {}
+    for _ in range(rng.randint(1, 5)):
+        name = rng.choice(list(data))
+        changes[name] = vault.make_entry(data[name]["username"], f"Changed!{rng.random()}", "", fernet)
+    if rng.random() < 0.2:
+        changes[f"new-site-{number}.com"] = vault.make_entry("new@example.com", f"New!{rng.random()}", "", fernet)
+    if rng.random() < 0.1:
+        changes[rng.choice(list(data))] = None
+    for name, entry in changes.items():
+        if entry is None:
+            data.pop(name, None)
+        else:
+            data[name] = entry
+    vault.write_changes(changes, fernet, len(data))
+    if rng.random() < 0.02:
+        vault.compact_vault(data, fernet)
+    vault.close()
+
+
+def main(sizes):
+    fernet = Fernet(Fernet.generate_key())
+    for size in sizes:
+        rng = random.Random(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            vault.use_data_dir(tmp)
+            data = {f"site-{i}.com": vault.make_entry(f"user{i}@example.com", f"Passw0rd!{i}", "", fernet)
+                    for i in range(size)}
+            vault.write_changes(data, fernet, len(data))
+            vault.close()
+
+            print(f"\n{size} accounts, {SESSIONS} sessions")
+            print(f"{'session':>8}  {'vault (MB)':>10}  {'full copies (MB)':>16}  {'store (MB)':>10}  "
+                  f"{'ratio':>6}  {'snapshot (ms)':>13}")
+            full_copies = snapshot_time = 0
+            ids = []
+            for number in range(1, SESSIONS + 1):
+                edit_session(rng, data, fernet, number)
+                summary, seconds = timed(snapshots.take_snapshot, "Locked")
+                ids.append(summary["id"])
+                full_copies += summary["size"]
+                snapshot_time += seconds
+
+                if number % 100 == 0:
+                    store = snapshots.store_size()
+                    print(f"{number:>8}  {summary['size'] / 2**20:>10.2f}  {full_copies / 2**20:>16.1f}  "
+                          f"{store / 2**20:>10.1f}  {full_copies / store:>5.1f}x  "
+                          f"{1000 * snapshot_time / number:>13.1f}")
+
+            listed, list_time = timed(snapshots.list_snapshots)
+            with tempfile.TemporaryDirectory() as target:
+                _, newest_time = timed(snapshots.restore_snapshot, ids[-1], target)
+                _, oldest_time = timed(snapshots.restore_snapshot, ids[0], target)
+            freed, prune_time = timed(snapshots.prune_snapshots, KEEP)
+            print(f"list {len(listed)}: {1000 * list_time:.0f} ms   restore newest: {1000 * newest_time:.0f} ms   "
+                  f"restore oldest: {1000 * oldest_time:.0f} ms   prune to {KEEP}: {1000 * prune_time:.0f} ms "
+                  f"({freed / 2**20:.1f} MB freed, {snapshots.store_size() / 2**20:.1f} MB left)")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
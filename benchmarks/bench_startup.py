@@ -0,0 +1,84 @@
+"""
+Time from launch to the login prompt, and what is imported on the way.
+
+Runs `python main.py --startup-report` several times and reports the median
+of each startup phase, then runs it once more under `-X importtime` and lists
+the slowest top-level imports. Fails (exit status 1) when the median time to
+the login prompt exceeds the budget, or when any of the analytics-only
+libraries (pandas, seaborn, matplotlib, numpy) is loaded before the prompt,
+so it can guard against startup regressions. Needs a display. Run from the
+project root:
+    python benchmarks/bench_startup.py [runs] [budget_ms]      e.g. 5 1500
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RUNS = 5
+BUDGET_MS = 1500
+PROMPT_PHASE = "login prompt shown"
+
+_PHASE = re.compile(r"^\s+(.+?)\s+([\d.]+) ms\s+\(\+")
+
+
+def run_once(*python_flags):
+    result = subprocess.run(
+        [sys.executable, *python_flags, "main.py", "--startup-report"],
+        cwd=ROOT, capture_output=True, text=True, timeout=120
+    )
+    phases = {}
+    heavy = ""
+    for line in result.stdout.splitlines():
+        match = _PHASE.match(line)
+        if match:
+            phases[match.group(1)] = float(match.group(2))
+        elif "heavy modules loaded:" in line:
+            heavy = line.split(":", 1)[1].strip()
+    if PROMPT_PHASE not in phases:
+        raise RuntimeError(f"No startup report from main.py:\n{result.stdout}\n{result.stderr}")
+    return phases, heavy, result.stderr
+
+
+def slowest_imports(stderr: str, count: int = 10):
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # top-level imports only
+            imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main(runs, budget_ms):
+    samples = [run_once() for _ in range(runs)]
+
+    print(f"{'phase':<24}  {'median (ms)':>11}  {'min (ms)':>8}  {'max (ms)':>8}")
+    for phase in samples[0][0]:
+        values = [phases[phase] for phases, _, _ in samples]
+        print(f"{phase:<24}  {statistics.median(values):>11.1f}  {min(values):>8.1f}  {max(values):>8.1f}")
+
+    _, _, importtime = run_once("-X", "importtime")
+    print("\nslowest top-level imports (cumulative):")
+    for micros, name in slowest_imports(importtime):
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    prompt_ms = statistics.median(phases[PROMPT_PHASE] for phases, _, _ in samples)
+    heavy = {module for _, loaded, _ in samples for module in loaded.split(", ") if loaded != "none"}
+    print(f"\ntime to login prompt: {prompt_ms:.1f} ms (budget {budget_ms} ms)")
+    print(f"heavy modules before prompt: {', '.join(sorted(heavy)) or 'none'}")
+
+    if prompt_ms > budget_ms or heavy:
+        print("FAIL: startup regressed")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    sys.exit(main(args[0] if args else RUNS, args[1] if len(args) > 1 else BUDGET_MS))
@@ -0,0 +1,126 @@
+"""
+Latency of the guess-based strength estimator as it is used in the UI, and
+throughput of batch scoring.
+
+For each size this "types" that many random passwords (common words, digits,
+keyboard walks and random characters mixed), scoring every prefix the way
+update_strength does on <KeyRelease>, with a cold cache. It prints the mean,
+p95 and worst time per keystroke against the 2 ms budget.
+
+It then re-scores vaults of RESCORE_SIZES accounts against a breach corpus
+built from a tenth of their passwords: with analytics.password_strength one
+account at a time, and with analytics.password_strengths in batches of
+RESCORE_BATCH sharing one memo, as rescore_strengths does. A REUSE share of
+the accounts reuse an earlier account's password, as people do; the batch
+path scores each distinct password once, so its gain follows that share.
+It checks that both agree and prints passwords per second.
+Run from the project root:
+    python benchmarks/bench_strength.py [sizes...]      e.g. 1000 10000
+    python benchmarks/bench_strength.py --rescore [sizes...]      e.g. 10000 100000 1000000
+"""
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import breach_check, strength_estimator
+from src.analytics import password_strength, password_strengths
+
+SIZES = [1_000, 10_000]
+RESCORE_SIZES = [10_000, 100_000, 1_000_000]
+RESCORE_BATCH = 1_000
+REUSE = 0.3
+BUDGET_MS = 2.0
+ALPHABET = string.ascii_letters + string.digits + "!@#$%^&*()-_=+[]{};:,.<>/?~ "
+PIECES = ["password", "dragon", "Summer", "monkey", "qwerty", "asdfgh", "1234", "2024", "1990", "!", "@", "123"]
+
+
+def random_passwords(count):
+    rng = random.Random(count)
+    passwords = []
+    for _ in range(count):
+        parts = [rng.choice(PIECES) if rng.random() < 0.5 else "".join(rng.choices(ALPHABET, k=rng.randint(1, 6)))
+                 for _ in range(rng.randint(1, 5))]
+        passwords.append("".join(parts))
+    return passwords
+
+
+def vault_passwords(count):
+    rng = random.Random(-count)
+    passwords = random_passwords(count)
+    for i in range(1, count):
+        if rng.random() < REUSE:
+            passwords[i] = passwords[rng.randrange(i)]
+    return passwords
+
+
+def batched(passwords):
+    memo, results = {}, []
+    for start in range(0, len(passwords), RESCORE_BATCH):
+        results += password_strengths(passwords[start:start + RESCORE_BATCH], memo)
+    return results
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def keystrokes(sizes):
+    print(f"{'passwords':>10}  {'keys':>8}  {'mean (ms)':>9}  {'p95 (ms)':>8}  {'max (ms)':>8}")
+    for size in sizes:
+        passwords = random_passwords(size)
+
+        strength_estimator.clear_cache()
+        timings = []
+        for password in passwords:
+            for end in range(1, len(password) + 1):
+                start = time.perf_counter()
+                password_strength(password[:end])
+                timings.append((time.perf_counter() - start) * 1000)
+
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        print(f"{size:>10}  {len(timings):>8}  {statistics.fmean(timings):>9.3f}  {p95:>8.3f}  {max(timings):>8.3f}")
+        if p95 > BUDGET_MS:
+            print(f"  p95 is over the {BUDGET_MS} ms keystroke budget")
+
+
+def rescore(sizes):
+    print(f"{'passwords':>10}  {'distinct':>8}  {'loop (pw/s)':>12}  {'batch (pw/s)':>12}  {'speedup':>7}")
+    for size in sizes:
+        passwords = vault_passwords(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus = os.path.join(tmp, "corpus.bin")
+            breach_check.build_corpus(passwords[::10], corpus, plaintext=True)
+            breach_check.open_corpus(corpus)
+
+            strength_estimator.clear_cache()
+            expected, loop_time = timed(lambda: [password_strength(password) for password in passwords])
+            strength_estimator.clear_cache()
+            actual, batch_time = timed(batched, passwords)
+            breach_check.close_corpus()
+        if actual != expected:
+            raise AssertionError("password_strengths disagrees with password_strength")
+
+        print(f"{size:>10}  {len(set(passwords)):>8}  {size / loop_time:>12,.0f}  {size / batch_time:>12,.0f}  "
+              f"{loop_time / batch_time:>6.1f}x")
+
+
+def main(argv):
+    password_strength("warm up")    # compiles or maps the dictionary
+    if argv[:1] == ["--rescore"]:
+        rescore([int(arg) for arg in argv[1:]] or RESCORE_SIZES)
+        return
+    keystrokes([int(arg) for arg in argv] or SIZES)
+    print()
+    rescore(RESCORE_SIZES)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
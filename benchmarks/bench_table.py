@@ -0,0 +1,122 @@
+"""
+First paint and scroll frame time of the accounts table at 1k to 1M rows.
+
+For each row count this measures:
+  * first paint - set_rows() plus the redraw, as after unlock or a search
+  * scroll      - mean time per frame while scrolling three rows at a time
+  * jump        - mean time per frame for scrollbar drags to random positions
+  * refresh     - refresh_home() after adding one account near the top of the view
+
+The "full" rows repeat each measurement for the old approach of
+inserting every account into the Treeview (skipped above 100k rows, where it
+takes minutes). Needs a display. Run from the project root:
+    python benchmarks/bench_table.py [sizes...]      e.g. 1000 10000 100000 1000000
+"""
+import os
+import random
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.virtual_table import VirtualTable
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+FULL_MAX_ROWS = 100_000
+FRAMES = 200
+
+
+def make_table(root):
+    frame = ttk.Frame(root)
+    tree = ttk.Treeview(frame, columns=("Account", "Username"), show="headings")
+    scrollbar = ttk.Scrollbar(frame, orient="vertical")
+    scrollbar.pack(side="right", fill="y")
+    tree.pack(side="left", fill="both", expand=True)
+    frame.pack(fill="both", expand=True)
+    root.update()
+    return frame, tree, scrollbar
+
+
+def per_frame(root, step, frames=FRAMES):
+    start = time.perf_counter()
+    for i in range(frames):
+        step(i)
+        root.update_idletasks()
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def bench_virtual(root, data):
+    frame, tree, scrollbar = make_table(root)
+    table = VirtualTable(tree, scrollbar, row_values=lambda name: (name, data[name]))
+    # The <Configure> binding was added after the first layout; size the pool directly
+    table.visible = max(1, tree.winfo_height() // table._lookup_row_height() - 1)
+
+    start = time.perf_counter()
+    table.set_rows(list(data))
+    root.update_idletasks()
+    paint = (time.perf_counter() - start) * 1000
+
+    scroll = per_frame(root, lambda i: table.scroll(3))
+    positions = [random.random() for _ in range(FRAMES)]
+    jump = per_frame(root, lambda i: table._on_scrollbar("moveto", positions[i]))
+
+    keys = list(data)
+    keys.insert(table.first + 1, "new-account.com")
+    data["new-account.com"] = "new@example.com"
+    start = time.perf_counter()
+    table.set_rows(keys)
+    root.update_idletasks()
+    refresh = (time.perf_counter() - start) * 1000
+    del data["new-account.com"]
+
+    frame.destroy()
+    return paint, scroll, jump, refresh
+
+
+def bench_full(root, data):
+    frame, tree, scrollbar = make_table(root)
+    tree.configure(yscrollcommand=scrollbar.set)
+
+    start = time.perf_counter()
+    for index, (name, username) in enumerate(data.items()):
+        tree.insert("", "end", values=(name, username), tags=("even" if index % 2 == 0 else "odd",))
+    root.update_idletasks()
+    paint = (time.perf_counter() - start) * 1000
+
+    scroll = per_frame(root, lambda i: tree.yview_scroll(3, "units"))
+    positions = [random.random() for _ in range(FRAMES)]
+    jump = per_frame(root, lambda i: tree.yview_moveto(positions[i]))
+
+    # The old refresh_home: delete everything and insert it again
+    start = time.perf_counter()
+    tree.delete(*tree.get_children())
+    for index, (name, username) in enumerate(data.items()):
+        tree.insert("", "end", values=(name, username), tags=("even" if index % 2 == 0 else "odd",))
+    root.update_idletasks()
+    refresh = (time.perf_counter() - start) * 1000
+
+    frame.destroy()
+    return paint, scroll, jump, refresh
+
+
+def main(sizes):
+    root = tk.Tk()
+    root.geometry("900x600")
+    print(f"{'rows':>9}  {'table':>7}  {'first paint (ms)':>16}  {'scroll (ms/frame)':>17}  {'jump (ms/frame)':>15}  {'refresh (ms)':>12}")
+
+    for size in sizes:
+        data = {f"site-{i}.com": f"user{i}@example.com" for i in range(size)}
+        runs = [("virtual", bench_virtual)]
+        if size <= FULL_MAX_ROWS:
+            runs.append(("full", bench_full))
+        for label, bench in runs:
+            paint, scroll, jump, refresh = bench(root, data)
+            print(f"{size:>9}  {label:>7}  {paint:>16.1f}  {scroll:>17.3f}  {jump:>15.3f}  {refresh:>12.1f}")
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
@@ -8,13 +8,11 @@ key = generate_key(master)
 fernet = Fernet(key)
 
 data = {
-    "gmail": {
-        "username": "test@gmail.com",
-        "password": "secret123"
-    }
+    "gmail": vault.make_entry("test@gmail.com", "secret123", "", fernet)
 }
 
 vault.save_vault(data, fernet)
 
 loaded = vault.load_vault(fernet)
 print(loaded)
+print(vault.get_secret(loaded["gmail"], fernet))
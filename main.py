@@ -1,9 +1,16 @@
 import sys
 import os
 
+# Imported first so startup timing covers everything that follows
+from src import startup
+
 # This line tells Python to look inside the 'src' folder for your files
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'src')))
 
+# `python main.py --startup-report` prints how long each startup phase took
+# and exits once the login prompt is on screen
+startup.REPORT_AND_EXIT = "--startup-report" in sys.argv
+
 try:
     # Replace 'gui_dashboard' with your filename if it's different
     # This runs the code inside your dashboard file immediately
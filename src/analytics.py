@@ -1,32 +1,61 @@
-import re
+import hashlib
+import os
+
+from src import breach_check
+from src import strength_estimator
+
+_MEMO_KEY = os.urandom(16)   # password_strengths memos are keyed hashes, never the passwords
+
 
 def password_strength(password):
     """
-    Returns a score and message for password strength
+    Returns a score (0-4) and message for password strength, from the number
+    of guesses an attacker would need (see strength_estimator)
     """
-    score = 0
-    # Length check
-    if len(password) >= 8:
-        score += 1
-    # Uppercase
-    if re.search(r"[A-Z]", password):
-        score += 1
-    # Lowercase
-    if re.search(r"[a-z]", password):
-        score += 1
-    # Numbers
-    if re.search(r"[0-9]", password):
-        score += 1
-    # Special characters
-    if re.search(r"[!@#$%^&*(),.?\":{}|<>]", password):
-        score += 1
-
-    # Message based on score
-    if score <= 2:
+    result = strength_estimator.estimate(password)
+    msg = result["strength"]
+
+    # A password from a known breach is weak however it is composed
+    if msg != "Weak" and breach_check.is_breached(password):
         msg = "Weak"
-    elif score == 3 or score == 4:
-        msg = "Medium"
-    else:
-        msg = "Strong"
 
-    return score, msg
+    return result["score"], msg
+
+
+def password_strengths(passwords, memo: dict = None):
+    """
+    Scores many passwords; returns a list of (score, message) pairs, the same
+    as calling password_strength on each. Each distinct password is scored
+    once, and the estimator and breach corpus see the batch as a whole (see
+    strength_estimator.estimate_many and breach_check.breached). Pass the
+    same `memo` dict to every call over one vault's batches to share scores
+    across them; it is keyed by keyed hashes and holds no passwords
+    """
+    memo = {} if memo is None else memo
+    passwords = list(passwords)
+    keys = [_memo_key(password) for password in passwords]
+
+    new = {}
+    for key, password in zip(keys, passwords):
+        if key not in memo:
+            new.setdefault(key, password)
+    estimates = strength_estimator.estimate_many(list(new.values()))
+
+    # A password from a known breach is weak however it is composed
+    breached = breach_check.breached(
+        [password for password, result in zip(new.values(), estimates) if result["strength"] != "Weak"])
+    for (key, password), result in zip(new.items(), estimates):
+        memo[key] = result["score"], "Weak" if password in breached else result["strength"]
+    return [memo[key] for key in keys]
+
+
+def _memo_key(password: str) -> bytes:
+    return hashlib.blake2b(password.encode(), key=_MEMO_KEY, digest_size=16).digest()
+
+
+def scoring_identity():
+    """
+    Changes whenever stored strength classes may be stale: a new estimator
+    version or a different breach corpus
+    """
+    return f"{strength_estimator.ESTIMATOR_VERSION}:{breach_check.corpus_identity()}"
@@ -1,33 +1,142 @@
 import hashlib
+import hmac
+import json
 import os
+from src import kdf
+from src.crypto_utils import generate_key
+from src.utils import fsync_dir
 
 # This gets the directory where auth.py is actually sitting
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # This creates a 'data' folder inside that same directory
 DATA_DIR = os.path.join(BASE_DIR, "data")
-MASTER_HASH_FILE = os.path.join(DATA_DIR, "master.hash")
+MASTER_HASH_FILE = os.path.join(DATA_DIR, "master.hash")  # legacy SHA-256 scheme
+MASTER_KDF_FILE = os.path.join(DATA_DIR, "master.kdf")    # KDF parameters + verifier
+PENDING_KDF_FILE = MASTER_KDF_FILE + ".pending"           # new parameters during a key change
+
+# Set by unlock() when the password matched the pending parameters of an
+# interrupted key change; confirm_unlock() then finishes that change.
+_unlocked_pending = False
 
 def hash_password(password: str) -> str:
     return hashlib.sha256(password.encode()).hexdigest()
 
 def master_exists() -> bool:
-    return os.path.exists(MASTER_HASH_FILE)
+    return os.path.exists(MASTER_KDF_FILE) or os.path.exists(MASTER_HASH_FILE)
+
+def uses_legacy_scheme() -> bool:
+    """True while the master password is still stored as a plain SHA-256 hash."""
+    return not os.path.exists(MASTER_KDF_FILE) and os.path.exists(MASTER_HASH_FILE)
 
-def create_master(password: str):
-    # This creates the 'data' folder if it doesn't exist
+def _write_kdf_file(params: dict, verifier: str, path: str = None):
+    path = path or MASTER_KDF_FILE
     if not os.path.exists(DATA_DIR):
         os.makedirs(DATA_DIR)
 
-    hashed = hash_password(password)
-    with open(MASTER_HASH_FILE, "w") as f:
-        f.write(hashed)
+    # Always synced: a vault re-keyed under parameters that were lost in a
+    # crash could never be unlocked again
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump({"kdf": params, "verifier": verifier}, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+    fsync_dir(DATA_DIR)
+
+def create_master(password: str, algorithm: str = kdf.DEFAULT_ALGORITHM) -> bytes:
+    """Sets up a new master password and returns the vault key."""
+    params = kdf.calibrate(algorithm)
+    verifier, key = kdf.split_keys(kdf.derive(password, params))
+    _write_kdf_file(params, verifier)
+    return key
+
+def _check(password: str, path: str):
+    with open(path, "r") as f:
+        stored = json.load(f)
+
+    verifier, key = kdf.split_keys(kdf.derive(password, stored["kdf"]))
+    if not hmac.compare_digest(verifier, stored["verifier"]):
+        return None
+    return key
+
+def unlock(password: str):
+    """Runs the KDF once; returns the vault key, or None if the password is wrong."""
+    global _unlocked_pending
+    _unlocked_pending = False
+
+    key = _check(password, MASTER_KDF_FILE) if os.path.exists(MASTER_KDF_FILE) else None
+    if key is None and os.path.exists(PENDING_KDF_FILE):
+        # The new password of a key change that stopped after re-keying the vault
+        key = _check(password, PENDING_KDF_FILE)
+        _unlocked_pending = key is not None
+    return key
+
+def confirm_unlock():
+    """Call once the vault has opened with the key from unlock()."""
+    if _unlocked_pending:
+        _commit_pending()
 
 def verify_master(password: str) -> bool:
     if not master_exists():
         return False
 
+    if not uses_legacy_scheme():
+        return unlock(password) is not None
+
     with open(MASTER_HASH_FILE, "r") as f:
         stored_hash = f.read().strip() # Added .strip() to ignore extra spaces
 
-    return hash_password(password) == stored_hash
\ No newline at end of file
+    return hash_password(password) == stored_hash
+
+def _commit_pending():
+    global _unlocked_pending
+    os.replace(PENDING_KDF_FILE, MASTER_KDF_FILE)
+    if os.path.exists(MASTER_HASH_FILE):
+        os.remove(MASTER_HASH_FILE)
+    fsync_dir(DATA_DIR)
+    _unlocked_pending = False
+
+def _switch_master(new_password: str, old_key: bytes, reencrypt, algorithm: str) -> bytes:
+    """
+    Moves the vault from old_key to a key derived from new_password.
+    reencrypt(old_key, new_key) must move the vault to the new key, and may
+    only raise while the vault is still under old_key; the new parameters
+    are only committed after it succeeds.
+    """
+    # The parameters are parked (durably) in a pending file first, so an
+    # interrupted change derives the same new key when it is retried or unlocked.
+    resumed = os.path.exists(PENDING_KDF_FILE)
+    if resumed:
+        with open(PENDING_KDF_FILE, "r") as f:
+            params = json.load(f)["kdf"]
+    else:
+        params = kdf.calibrate(algorithm)
+
+    verifier, key = kdf.split_keys(kdf.derive(new_password, params))
+    _write_kdf_file(params, verifier, PENDING_KDF_FILE)
+
+    try:
+        reencrypt(old_key, key)
+    except Exception:
+        # The vault is still under old_key, so the new password must not
+        # unlock it. A pending file left by an interrupted change is kept:
+        # that change may already have re-keyed the vault.
+        if not resumed:
+            os.remove(PENDING_KDF_FILE)
+            fsync_dir(DATA_DIR)
+        raise
+
+    _commit_pending()
+    return key
+
+def migrate_master(password: str, reencrypt, algorithm: str = kdf.DEFAULT_ALGORITHM) -> bytes:
+    """Moves a legacy master password to the KDF scheme and returns the new key."""
+    return _switch_master(password, generate_key(password), reencrypt, algorithm)
+
+def change_master(old_password: str, new_password: str, reencrypt, algorithm: str = kdf.DEFAULT_ALGORITHM):
+    """Changes the master password; returns the new key, or None if old_password is wrong."""
+    old_key = unlock(old_password)
+    if old_key is None:
+        return None
+    return _switch_master(new_password, old_key, reencrypt, algorithm)
@@ -0,0 +1,163 @@
+import json
+import os
+import struct
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+
+from src import codec
+from src import kdf
+
+# Portable, passphrase-protected vault backups in a chunked AEAD container:
+#
+#   header | chunk | chunk | ... | final chunk
+#
+#   header: magic | version (u8) | cipher (u8) | nonce prefix (7 bytes) |
+#           KDF parameters length (u16) | KDF parameters (JSON)
+#   chunk:  final flag (u8) | ciphertext length (u32) | ciphertext + tag
+#
+# The plaintext is a stream of length-prefixed codec records, one per account
+# (name, username, password, notes, folder), cut into CHUNK_SIZE pieces. Each chunk is
+# sealed on its own with nonce = prefix | chunk number (u32) | final flag, and
+# the whole header as associated data, so chunks cannot be reordered, dropped,
+# replayed from another backup, or cut off after a non-final chunk without
+# failing authentication. Writing and reading hold one chunk at a time.
+MAGIC = b"CVBACKUP"
+VERSION = 2                 # v2 headers carry version 2 KDF parameters (see kdf.py)
+CIPHERS = {"aes-gcm": (1, AESGCM), "chacha20-poly1305": (2, ChaCha20Poly1305)}
+DEFAULT_CIPHER = "aes-gcm"
+CHUNK_SIZE = 64 * 1024
+
+_HEADER = struct.Struct("<8sBB7sH")
+_CHUNK = struct.Struct("<BI")
+_RECORD = struct.Struct("<I")
+_NONCE_PREFIX_BYTES = 7
+_MAX_CHUNK = CHUNK_SIZE + 16    # plaintext plus the tag
+
+
+def _nonce(prefix: bytes, number: int, final: bool) -> bytes:
+    return prefix + struct.pack(">IB", number, final)
+
+
+def _key(passphrase: str, params: dict) -> bytes:
+    return kdf.backup_key(kdf.derive(passphrase, params))
+
+
+def export_backup(path: str, entries, get_secret, passphrase: str, cipher: str = DEFAULT_CIPHER,
+                  progress=None) -> int:
+    """
+    Streams accounts into an encrypted backup file and returns how many were written.
+
+    `entries` yields (name, entry) pairs as held in the vault; get_secret(entry)
+    decrypts one entry's password and notes. The file is written under a
+    temporary name and renamed when complete. progress(count) is called after
+    each chunk.
+    """
+    if cipher not in CIPHERS:
+        raise ValueError(f"Unknown backup cipher: {cipher}")
+    code, aead_class = CIPHERS[cipher]
+
+    params = kdf.calibrate()
+    params_json = json.dumps(params).encode()
+    prefix = os.urandom(_NONCE_PREFIX_BYTES)
+    header = _HEADER.pack(MAGIC, VERSION, code, prefix, len(params_json)) + params_json
+    aead = aead_class(_key(passphrase, params))
+
+    count = number = 0
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+
+        def seal(chunk: bytes, final: bool):
+            sealed = aead.encrypt(_nonce(prefix, number, final), chunk, header)
+            f.write(_CHUNK.pack(final, len(sealed)))
+            f.write(sealed)
+
+        buffer = bytearray()
+        for name, entry in entries:
+            secret = get_secret(entry)
+            record = codec.encode({"name": name, "username": entry["username"],
+                                   "password": secret["password"], "notes": secret["notes"],
+                                   "folder": entry.get("folder", "")}, "none")
+            buffer += _RECORD.pack(len(record)) + record
+            count += 1
+            while len(buffer) > CHUNK_SIZE:
+                seal(bytes(buffer[:CHUNK_SIZE]), False)
+                del buffer[:CHUNK_SIZE]
+                number += 1
+                if progress:
+                    progress(count)
+        seal(bytes(buffer), True)
+
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    if progress:
+        progress(count)
+    return count
+
+
+def _read_exact(f, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("Backup file is truncated")
+    return data
+
+
+def restore_backup(path: str, passphrase: str, progress=None):
+    """
+    Reads an encrypted backup, yielding (name, username, password, notes,
+    folder) per account. Each chunk is authenticated before any of its records are
+    yielded; a wrong passphrase or a modified file raises ValueError at the
+    first bad chunk, and a file cut short raises once its end is reached.
+    progress(done, total) gets bytes read.
+    """
+    total = os.path.getsize(path)
+    with open(path, "rb") as f:
+        magic, version, code, prefix, params_length = _HEADER.unpack(_read_exact(f, _HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a vault backup")
+        if version > VERSION:
+            raise ValueError(f"Backup format v{version} is newer than this app supports")
+        ciphers = {code: aead_class for code, aead_class in CIPHERS.values()}
+        if code not in ciphers:
+            raise ValueError(f"Unknown backup cipher {code}")
+
+        params_json = _read_exact(f, params_length)
+        header = _HEADER.pack(magic, version, code, prefix, params_length) + params_json
+        aead = ciphers[code](_key(passphrase, json.loads(params_json)))
+
+        buffer = bytearray()
+        number, final = 0, False
+        while not final:
+            flag, length = _CHUNK.unpack(_read_exact(f, _CHUNK.size))
+            if length > _MAX_CHUNK:
+                raise ValueError("Backup file is corrupted")
+            final = bool(flag)
+            try:
+                buffer += aead.decrypt(_nonce(prefix, number, final), _read_exact(f, length), header)
+            except InvalidTag:
+                if number == 0:
+                    raise ValueError("Wrong passphrase, or the backup file is corrupted")
+                raise ValueError(f"Backup chunk {number} failed verification")
+            number += 1
+
+            # Hand out every complete record in what has been verified so far
+            position = 0
+            while len(buffer) - position >= _RECORD.size:
+                (size,) = _RECORD.unpack_from(buffer, position)
+                if len(buffer) - position - _RECORD.size < size:
+                    break
+                start = position + _RECORD.size
+                record = codec.decode(bytes(buffer[start:start + size]))
+                position = start + size
+                yield record["name"], record["username"], record["password"], record["notes"], \
+                    record.get("folder", "")
+            del buffer[:position]
+
+            if progress:
+                progress(f.tell(), total)
+
+        if buffer or f.read(1):
+            raise ValueError("Backup file has trailing data")
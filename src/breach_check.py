@@ -0,0 +1,333 @@
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+# Offline breached-password check against a local corpus of password hashes
+# (e.g. a Have I Been Pwned SHA-1 or NTLM dump), built once into:
+#
+#   header | fan-out table | sorted hash prefixes | Bloom filter (optional)
+#
+# The fan-out table holds, for every 2-byte leading value, the index of the
+# first record starting with it, so a lookup binary-searches one small bucket.
+# The file is memory-mapped and never read into RAM as a whole; a lookup only
+# touches a few pages (none at all for most misses when the Bloom filter is
+# present).
+MAGIC = b"CVBREACH"
+VERSION = 1
+ALGORITHMS = {"sha1": 1, "ntlm": 2}
+_HEADER = struct.Struct("<8sBBBxQQB7x")   # magic, version, algorithm, prefix bytes, count, bloom bits, bloom k
+FANOUT_BUCKETS = 1 << 16
+_FANOUT = struct.Struct(f"<{FANOUT_BUCKETS + 1}Q")
+
+DEFAULT_PREFIX_BYTES = 8        # 64-bit prefixes: false matches are negligible even for 10^9 hashes
+BLOOM_BITS_PER_KEY = 10         # about 1% false positives with 7 probes
+BLOOM_PROBES = 7
+RUN_RECORDS = 2_000_000         # records sorted in memory per run while building
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DEFAULT_CORPUS_FILE = os.path.join(DATA_DIR, "breach_corpus.bin")
+
+
+def hash_password(password: str, algorithm: str) -> bytes:
+    if algorithm == "sha1":
+        return hashlib.sha1(password.encode()).digest()
+    if algorithm == "ntlm":
+        try:
+            return hashlib.new("md4", password.encode("utf-16-le")).digest()
+        except ValueError:
+            raise ValueError("NTLM corpora need MD4, which this Python/OpenSSL build does not provide")
+    raise ValueError(f"Unknown breach corpus algorithm: {algorithm}")
+
+
+def _bloom_positions(key: bytes, bits: int, probes: int):
+    # Prefixes are already uniformly distributed; double hashing over two halves
+    h1 = int.from_bytes(key[-8:-4], "little")
+    h2 = int.from_bytes(key[-4:], "little") | 1
+    return [(h1 + i * h2) % bits for i in range(probes)]
+
+
+class BreachCorpus:
+    """A memory-mapped, sorted breach corpus file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty")
+
+        magic, version, algorithm, prefix_bytes, count, bloom_bits, bloom_k = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a breach corpus")
+        if version > VERSION:
+            self.close()
+            raise ValueError(f"Breach corpus format v{version} is newer than this app supports")
+
+        names = {code: name for name, code in ALGORITHMS.items()}
+        if algorithm not in names:
+            self.close()
+            raise ValueError(f"{path} uses an unknown hash algorithm (code {algorithm})")
+        self.algorithm = names[algorithm]
+        self.prefix_bytes = prefix_bytes
+        self.count = count
+        self._fanout = _FANOUT.unpack_from(self._map, _HEADER.size)
+        self._records = _HEADER.size + _FANOUT.size
+        self._bloom_bits = bloom_bits
+        self._bloom_k = bloom_k
+        self._bloom = self._records + count * prefix_bytes
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def contains_digest(self, digest: bytes) -> bool:
+        key = digest[:self.prefix_bytes]
+        mm = self._map
+
+        if self._bloom_bits:
+            bloom = self._bloom
+            for bit in _bloom_positions(key, self._bloom_bits, self._bloom_k):
+                if not mm[bloom + (bit >> 3)] & (1 << (bit & 7)):
+                    return False
+
+        bucket = (key[0] << 8) | key[1]
+        lo, hi = self._fanout[bucket], self._fanout[bucket + 1]
+        width, base = self.prefix_bytes, self._records
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            start = base + mid * width
+            record = mm[start:start + width]
+            if record < key:
+                lo = mid + 1
+            elif record > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def contains(self, password: str) -> bool:
+        return self.contains_digest(hash_password(password, self.algorithm))
+
+    def contains_many(self, passwords) -> set:
+        """
+        The passwords from `passwords` that are in the corpus. Each distinct
+        password is hashed once and the lookups run in digest order, so
+        neighbouring lookups share the pages they touch.
+        """
+        keys = sorted((hash_password(password, self.algorithm), password) for password in set(passwords))
+        return {password for digest, password in keys if self.contains_digest(digest)}
+
+    def identity(self) -> str:
+        """Changes whenever the corpus file is rebuilt or replaced."""
+        stat = os.stat(self.path)
+        return f"{self.count}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+# -------------------
+# Active corpus (the app checks against at most one)
+# -------------------
+_corpus = None
+
+
+def open_corpus(path: str = None) -> bool:
+    """Opens the corpus at `path` (default: data/breach_corpus.bin); False if there is none."""
+    global _corpus
+    close_corpus()
+    path = path or DEFAULT_CORPUS_FILE
+    if not os.path.exists(path):
+        return False
+    _corpus = BreachCorpus(path)
+    return True
+
+
+def close_corpus():
+    global _corpus
+    if _corpus is not None:
+        _corpus.close()
+        _corpus = None
+
+
+def corpus_identity():
+    """Identity of the open corpus, or None; used to tell when stored strengths are stale."""
+    return _corpus.identity() if _corpus is not None else None
+
+
+def is_breached(password: str) -> bool:
+    return _corpus is not None and _corpus.contains(password)
+
+
+def breached(passwords) -> set:
+    """The passwords from `passwords` found in the open corpus (none if there is no corpus)."""
+    return _corpus.contains_many(passwords) if _corpus is not None else set()
+
+
+# -------------------
+# Building a corpus from a raw dump
+# -------------------
+def _parse_keys(lines, algorithm, prefix_bytes, plaintext):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if plaintext:
+            digest = hash_password(line, algorithm)
+        else:
+            # HIBP lines look like "HASH:count"
+            digest = bytes.fromhex(line.split(":", 1)[0])
+        yield digest[:prefix_bytes]
+
+
+def _write_run(keys):
+    keys.sort()
+    run = tempfile.TemporaryFile()
+    run.write(b"".join(keys))
+    run.seek(0)
+    return run
+
+
+def _read_run(run, width):
+    while True:
+        block = run.read(width * 65536)
+        if not block:
+            return
+        for offset in range(0, len(block), width):
+            yield block[offset:offset + width]
+
+
+def build_corpus(lines, out_path, algorithm="sha1", prefix_bytes=DEFAULT_PREFIX_BYTES,
+                 bloom=True, plaintext=False, progress=None):
+    """
+    Builds a corpus file from dump lines ("HEX" or "HEX:count", or plain
+    passwords with plaintext=True) using an external sort, so memory stays at
+    about RUN_RECORDS prefixes however large the dump is. Returns the number
+    of distinct prefixes written.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown breach corpus algorithm: {algorithm}")
+    if not 4 <= prefix_bytes <= 20:
+        raise ValueError("prefix_bytes must be between 4 and 20")
+
+    # 1. Sorted runs on disk
+    runs, keys, parsed = [], [], 0
+    for key in _parse_keys(lines, algorithm, prefix_bytes, plaintext):
+        keys.append(key)
+        parsed += 1
+        if len(keys) >= RUN_RECORDS:
+            runs.append(_write_run(keys))
+            keys = []
+            if progress:
+                progress(parsed)
+    if keys:
+        runs.append(_write_run(keys))
+
+    # 2. Merge the runs into the records section, dropping duplicates
+    tmp_path = out_path + ".tmp"
+    fanout = [0] * (FANOUT_BUCKETS + 1)
+    count = 0
+    with open(tmp_path, "w+b") as out:
+        out.write(b"\0" * (_HEADER.size + _FANOUT.size))
+        previous = None
+        for key in heapq.merge(*(_read_run(run, prefix_bytes) for run in runs)):
+            if key == previous:
+                continue
+            out.write(key)
+            fanout[((key[0] << 8) | key[1]) + 1] += 1
+            previous = key
+            count += 1
+        for run in runs:
+            run.close()
+
+        for bucket in range(FANOUT_BUCKETS):
+            fanout[bucket + 1] += fanout[bucket]
+
+        # 3. Bloom filter over the written records, set through a mapping of
+        #    the file so a multi-gigabyte filter does not have to fit in RAM
+        bloom_bits = bloom_k = 0
+        if bloom and count:
+            bloom_bits = max(64, count * BLOOM_BITS_PER_KEY)
+            bloom_k = BLOOM_PROBES
+            records = _HEADER.size + _FANOUT.size
+            bloom_start = records + count * prefix_bytes
+            out.truncate(bloom_start + (bloom_bits + 7) // 8)
+            with mmap.mmap(out.fileno(), 0) as mm:
+                for start in range(records, bloom_start, prefix_bytes):
+                    for bit in _bloom_positions(mm[start:start + prefix_bytes], bloom_bits, bloom_k):
+                        mm[bloom_start + (bit >> 3)] |= 1 << (bit & 7)
+                mm.flush()
+
+        out.seek(0)
+        out.write(_HEADER.pack(MAGIC, VERSION, ALGORITHMS[algorithm], prefix_bytes, count, bloom_bits, bloom_k))
+        out.write(_FANOUT.pack(*fanout))
+        out.flush()
+        os.fsync(out.fileno())
+
+    os.replace(tmp_path, out_path)
+    return count
+
+
+def _main(argv):
+    usage = (
+        "usage: python -m src.breach_check build DUMP [OUT] [--ntlm] [--plaintext] [--no-bloom] [--prefix-bytes N]\n"
+        "       python -m src.breach_check check [CORPUS]      (reads passwords from stdin)"
+    )
+    args, flags, prefix_bytes = [], set(), DEFAULT_PREFIX_BYTES
+    argv = iter(argv)
+    for arg in argv:
+        if not arg.startswith("--"):
+            args.append(arg)
+            continue
+        # --prefix-bytes takes a value, as "--prefix-bytes N" or "--prefix-bytes=N"
+        flag, _, value = arg.partition("=")
+        if flag == "--prefix-bytes":
+            value = value or next(argv, "")
+            if not value.isdigit():
+                print(f"--prefix-bytes needs a number\n{usage}")
+                return 2
+            prefix_bytes = int(value)
+        elif arg in ("--ntlm", "--plaintext", "--no-bloom"):
+            flags.add(arg)
+        else:
+            print(f"unknown option: {arg}\n{usage}")
+            return 2
+
+    if not args or args[0] not in ("build", "check"):
+        print(usage)
+        return 2
+
+    if args[0] == "build":
+        if len(args) < 2:
+            print(usage)
+            return 2
+        out_path = args[2] if len(args) > 2 else DEFAULT_CORPUS_FILE
+        os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+
+        with open(args[1], "r", encoding="utf-8", errors="replace") as dump:
+            count = build_corpus(
+                dump, out_path,
+                algorithm="ntlm" if "--ntlm" in flags else "sha1",
+                prefix_bytes=prefix_bytes,
+                bloom="--no-bloom" not in flags,
+                plaintext="--plaintext" in flags,
+                progress=lambda parsed: print(f"  {parsed:,} hashes read", file=sys.stderr)
+            )
+        print(f"Wrote {count:,} hashes to {out_path}")
+        return 0
+
+    corpus = BreachCorpus(args[1] if len(args) > 1 else DEFAULT_CORPUS_FILE)
+    for line in sys.stdin:
+        password = line.rstrip("\n")
+        print(f"{'BREACHED' if corpus.contains(password) else 'ok':>8}  {password}")
+    corpus.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
@@ -0,0 +1,107 @@
+import re
+
+# Bulk edits over many accounts at once.
+#
+# Each operation only computes a change set, in the shape vault.write_changes()
+# takes: account name -> new entry, or None for a delete. The caller writes
+# it with one write_changes() call (one log append or one SQLite transaction)
+# and then applies it to its in-memory state, so the cost on disk and on
+# screen is the same for 2 accounts as for 20,000.
+#
+# None of these touch the password or notes. Entries keep their encrypted
+# secret token as is, so a bulk edit decrypts and re-encrypts nothing.
+
+
+def delete_changes(data: dict, names) -> dict:
+    """Deletes the given accounts."""
+    return {name: None for name in names if name in data}
+
+
+def move_changes(data: dict, names, folder: str) -> dict:
+    """Moves the given accounts into `folder` ("" takes them out of any folder)."""
+    folder = folder.strip()
+    return {name: {**data[name], "folder": folder} for name in names
+            if name in data and data[name].get("folder", "") != folder}
+
+
+def username_changes(data: dict, names, username: str) -> dict:
+    """Sets one username on all the given accounts."""
+    username = username.strip()
+    if not username:
+        raise ValueError("Username cannot be empty.")
+    return {name: {**data[name], "username": username} for name in names
+            if name in data and data[name]["username"] != username}
+
+
+def _renamer(pattern: str, replacement: str, regex: bool):
+    if regex:
+        try:
+            compiled = re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid pattern: {e}")
+        return lambda name: compiled.sub(replacement, name)
+
+    if "*" in pattern or "?" in pattern:
+        # Wildcards match the whole name; each * or ? in the replacement takes
+        # what the next wildcard matched, so "* (old)" -> "*" drops a suffix
+        compiled = re.compile("".join("(.*)" if char == "*" else "(.)" if char == "?" else re.escape(char)
+                                      for char in pattern))
+
+        def rename(name):
+            match = compiled.fullmatch(name)
+            if match is None:
+                return name
+            groups = iter(match.groups())
+            return re.sub(r"[*?]", lambda m: next(groups, ""), replacement)
+        return rename
+
+    return lambda name: name.replace(pattern, replacement)
+
+
+def rename_changes(data: dict, names, pattern: str, replacement: str, regex: bool = False):
+    """
+    Renames the given accounts and returns (changes, renamed), where renamed
+    maps each old name to its new one. `pattern` is plain text replaced
+    wherever it occurs, a wildcard pattern (* and ?) matched against the
+    whole name, or, with regex set, a regular expression for re.sub.
+    Raises ValueError, before anything is changed, if a new name is empty or
+    would collide with another account.
+    """
+    if not pattern:
+        raise ValueError("Pattern cannot be empty.")
+    rename = _renamer(pattern, replacement, regex)
+
+    renamed = {}
+    for name in names:
+        if name not in data:
+            continue
+        try:
+            new_name = rename(name).strip()
+        except (re.error, IndexError) as e:
+            raise ValueError(f"Invalid replacement: {e}")
+        if new_name != name:
+            renamed[name] = new_name
+
+    taken = {}
+    for name, new_name in renamed.items():
+        if not new_name:
+            raise ValueError(f"'{name}' would be renamed to an empty name.")
+        if new_name in taken:
+            raise ValueError(f"'{taken[new_name]}' and '{name}' would both be renamed to '{new_name}'.")
+        # Names being renamed away are free, so swaps and shifts work
+        if new_name in data and new_name not in renamed:
+            raise ValueError(f"'{name}' would be renamed to '{new_name}', which already exists.")
+        taken[new_name] = name
+
+    # One state per name: every old name goes, then every new name is written
+    changes = {name: None for name in renamed}
+    changes.update({new_name: data[name] for name, new_name in renamed.items()})
+    return changes, renamed
+
+
+def live_count(data: dict, changes: dict) -> int:
+    """How many accounts the vault holds once `changes` are applied."""
+    count = len(data)
+    for name, entry in changes.items():
+        count += (entry is not None) - (name in data)
+    return count
@@ -1,23 +1,42 @@
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, filedialog
 import ttkbootstrap as tb
 from cryptography.fernet import Fernet
-import vault
+from src import vault
 from src import auth
-from src.crypto_utils import generate_key
-import re
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import random
 import string
+import threading
+import time
 import settings as app_settings # Make sure this import is at the top
 import pyperclip
+from src.save_queue import SaveQueue
+from src.search_index import TrigramIndex
+from src.search_scheduler import SearchScheduler
+from src.virtual_table import VirtualTable
+from src.strength_stats import StrengthStats, STRENGTH_CLASSES
+from src.analytics import password_strengths, scoring_identity
+from src.reuse_index import ReuseIndex
+from src.password_policy import PasswordPolicy
+from src import breach_check
+from src import importer
+from src import backup
+from src import snapshots
+from src import bulk_ops
+from src.utils import parallel_map
+from src import strength_estimator
+from src import startup
+
+startup.mark("modules imported")
 
 
 vault_data = {}  # global variable
 fernet = None
+save_queue = None  # write-behind persistence worker, started after unlock
+account_index = TrigramIndex()  # substring search over account names and usernames
+search_scheduler = None  # debounced search worker, started with the main loop
+strength_stats = StrengthStats()  # Weak/Medium/Strong counts, updated per change
+reuse_index = None  # keyed password digests -> accounts, built on the first analytics visit
 
 
 
@@ -122,8 +141,9 @@ def apply_global_fonts():
 # 1. Load the saved settings immediately
 saved_data = app_settings.load_settings()
 
-# 2. Set the global policy to the SAVED data
+# 2. Set the global policy to the SAVED data, compiled once for validation
 password_policy = saved_data
+policy_validator = PasswordPolicy(password_policy)
 
 # 3. Translate the saved preference into a valid theme name
 saved_theme_pref = saved_data.get("theme", "darkly")
@@ -214,46 +234,182 @@ def ask_master_password():
             messagebox.showerror("Error", "Password cannot be empty.", parent=popup)
             return
 
-        if is_new_user:
-            # First time setup logic
-            auth.create_master(pwd)
-            messagebox.showinfo("Success", "Vault initialized successfully!", parent=popup)
-        else:
-            # Standard login logic
-            if not auth.verify_master(pwd):
-                messagebox.showerror("Access Denied", "Incorrect master password.", parent=popup)
-                return
-
-        # Common logic: Generate key and enter app
         global fernet, vault_data
-        key = generate_key(pwd)
-        fernet = Fernet(key)
+        vault.set_backend(password_policy.get("storage_backend", "log"))
+        vault.set_fsync_policy(password_policy.get("fsync_policy", "always"))
+        vault.set_compression(password_policy.get("vault_compression", "none"))
+        vault.set_workers(password_policy.get("crypto_workers", 0))
+        try:
+            breach_check.open_corpus(password_policy.get("breach_corpus"))
+        except (OSError, ValueError) as e:
+            print(f"Breach corpus unavailable: {e}")
 
+        # A single KDF pass yields both the password verifier and the vault key
         try:
+            if is_new_user:
+                # First time setup logic
+                key = auth.create_master(pwd)
+                messagebox.showinfo("Success", "Vault initialized successfully!", parent=popup)
+            elif auth.uses_legacy_scheme():
+                # Old SHA-256 master hash: verify it, then move vault and password to the KDF
+                if not auth.verify_master(pwd):
+                    messagebox.showerror("Access Denied", "Incorrect master password.", parent=popup)
+                    return
+
+                leftover = []
+
+                def reencrypt(old_key, new_key):
+                    leftover.extend(vault.rekey_vault(Fernet(old_key), Fernet(new_key)))
+
+                key = auth.migrate_master(pwd, reencrypt)
+                leftover.extend(snapshots.delete_all_snapshots())   # they hold the old master.hash
+                warn_leftover_files(leftover, popup)
+            else:
+                # Standard login logic
+                key = auth.unlock(pwd)
+                if key is None:
+                    messagebox.showerror("Access Denied", "Incorrect master password.", parent=popup)
+                    return
+
+            fernet = Fernet(key)
             vault_data = vault.load_vault(fernet)
-        except Exception:
-            vault_data = {}
+            auth.confirm_unlock()
+            account_index.rebuild((name, data["username"]) for name, data in vault_data.items())
+            strength_stats.rebuild((name, data["strength"]) for name, data in vault_data.items())
+        except Exception as e:
+            # Never continue with an empty vault: the next save would overwrite the real one
+            messagebox.showerror("Vault Error", f"Could not open the vault: {e}", parent=popup)
+            return
+
+        if vault.RECOVERED_GENERATION is not None:
+            messagebox.showwarning(
+                "Vault Recovered",
+                "The vault log was damaged, so the vault was rolled back to the copy kept at its last full "
+                f"rewrite (generation {vault.RECOVERED_GENERATION}). Changes made since then are missing.\n\n"
+                f"The damaged log was kept as {vault.LOG_FILE}.corrupt.", parent=popup)
 
+        start_save_queue()
+
+        # Stored strength classes predate a new estimator or breach corpus
+        scoring_id = scoring_identity()
+        if scoring_id == password_policy.get("strength_scoring"):
+            open_dashboard()
+            return
+        if not vault_data:
+            remember_scoring(scoring_id)
+            open_dashboard()
+            return
+
+        # Re-scoring decrypts every password, so it runs on a worker and the
+        # dashboard opens once it is done
+        popup.geometry("450x400")
+        popup.protocol("WM_DELETE_WINDOW", lambda: None)
+        popup.unbind("<Return>")
+        unlock_btn.config(state="disabled")
+        progress_bar.pack(fill="x", padx=30, pady=(0, 5))
+        status_label.pack()
+        status_label.config(text="Updating password strengths…")
+
+        def update_progress(done, total):
+            percent = 100 * done / total if total else 100
+            progress_bar["value"] = percent
+            status_label.config(text=f"Updating password strengths… {percent:.0f}%")
+
+        def finish(scored, error):
+            if error is None:
+                apply_rescored(scored)
+                remember_scoring(scoring_id)
+            else:
+                # The stored classes stay as they were; the next unlock tries again
+                print(f"Could not re-score the vault: {error}")
+            open_dashboard()
+
+        def worker():
+            try:
+                scored = rescore_strengths(progress=lambda done, total: root.after(0, update_progress, done, total))
+                error = None
+            except Exception as e:
+                scored, error = None, e
+            root.after(0, finish, scored, error)
+
+        threading.Thread(target=worker, name="vault-rescore", daemon=True).start()
+
+    def remember_scoring(scoring_id):
+        password_policy["strength_scoring"] = scoring_id
+        try:
+            app_settings.save_settings(password_policy)
+        except OSError as e:
+            print(f"Could not save settings: {e}")
+
+    def open_dashboard():
         popup.destroy()
         root.deiconify()
         if 'refresh_home' in globals():  # Safety check
             refresh_home()
 
+        # Have the charting libraries ready by the time analytics is opened
+        warm_analytics_stack()
+
     # Submit Button
-    tb.Button(
+    unlock_btn = tb.Button(
         popup,
         text=button_text,
         bootstyle=button_style,
         width=20,
         command=submit_master
-    ).pack(pady=20)
+    )
+    unlock_btn.pack(pady=20)
+
+    # Shown while stored strengths are brought up to date after unlocking
+    progress_bar = tb.Progressbar(popup, bootstyle="info-striped", maximum=100)
+    status_label = tb.Label(popup, text="", font=("Inter", 9, "italic"))
 
     # Bind Enter key to submit
     popup.bind("<Return>", lambda e: submit_master())
 
 
+# ===============================
+# BACKGROUND SAVING
+# ===============================
+def start_save_queue():
+    global save_queue
+    window = password_policy.get("save_window_ms", 300) / 1000
+
+    def write_changes(changes, live_count):
+        vault.write_changes(changes, fernet, live_count)
+
+    save_queue = SaveQueue(
+        write_changes,
+        window=window,
+        # The worker thread must not touch widgets; hop onto the Tk thread
+        on_status=lambda status: root.after(0, update_save_status, status)
+    )
+
+
+def update_save_status(status):
+    if status == "pending":
+        save_status_label.config(text="● Saving…", bootstyle="warning")
+    elif status == "error":
+        save_status_label.config(text="⚠️ Save failed", bootstyle="danger")
+    else:
+        save_status_label.config(text="✔ Saved", bootstyle="success")
+
+
+def stop_save_queue():
+    """Writes any queued changes to disk before the vault is locked or closed."""
+    global save_queue
+    if save_queue is None:
+        return
+    try:
+        save_queue.stop()
+    except Exception as e:
+        messagebox.showerror("Save Error", f"Some changes could not be saved: {e}")
+    save_queue = None
+
+
 # Call the function
 ask_master_password()
+startup.mark("login prompt built")
 
 
 # -------------------
@@ -308,6 +464,10 @@ def create_hamburger(parent, command):
 
 
 create_hamburger(top_bar, toggle_sidebar)
+
+# Save status indicator (updated by the background save queue)
+save_status_label = tb.Label(top_bar, text="", font=("Segoe UI", 10))
+save_status_label.pack(side="right", padx=12)
 # -------------------
 # Search Bar with Magnifying Glass & Placeholder
 # -------------------
@@ -385,9 +545,12 @@ strong_label.pack(side="left", expand=True, fill="x", padx=5)
 
 
 
+# The table only holds items for the rows on screen; accounts_table maps them to vault keys
+table_frame = tb.Frame(home_frame)
+
 accounts_tree = tb.Treeview(
-    home_frame,
-    columns=("Account", "Username"),
+    table_frame,
+    columns=("Account", "Username", "Folder"),
     show="headings",
     bootstyle=None  # Make sure no theme override
 )
@@ -395,11 +558,22 @@ accounts_tree = tb.Treeview(
 
 accounts_tree.heading("Account", text="Website", anchor="w")
 accounts_tree.heading("Username", text="Username", anchor="w")
+accounts_tree.heading("Folder", text="Folder", anchor="w")
+
+accounts_tree.column("Account", anchor="w", width=350, stretch=True)
+accounts_tree.column("Username", anchor="w", width=300, stretch=True)
+accounts_tree.column("Folder", anchor="w", width=150, stretch=True)
 
-accounts_tree.column("Account", anchor="w", width=400, stretch=True)
-accounts_tree.column("Username", anchor="w", width=400, stretch=True)
+accounts_scrollbar = tb.Scrollbar(table_frame, orient="vertical")
+accounts_scrollbar.pack(side="right", fill="y")
+accounts_tree.pack(side="left", fill="both", expand=True)
+table_frame.pack(fill="both", expand=True, pady=10)
 
-accounts_tree.pack(fill="both", expand=True, pady=10)
+accounts_table = VirtualTable(
+    accounts_tree,
+    accounts_scrollbar,
+    row_values=lambda name: (name, vault_data[name]["username"], vault_data[name]["folder"])
+)
 
 style = tb.Style()
 is_dark = "dark" in style.theme.name or "darkly" in style.theme.name
@@ -427,22 +601,38 @@ settings = {
 # ===============================
 # FUNCTIONS
 # ===============================
-def password_strength(password):
-    score = 0
-    if len(password) >= 8: score += 1
-    if re.search(r"[A-Z]", password): score += 1
-    if re.search(r"[a-z]", password): score += 1
-    if re.search(r"[0-9]", password): score += 1
-    if re.search(r"[!@#$%^&*(),.?\":{}|<>]", password): score += 1
-
-    if score <= 2:
-        strength = "Weak"
-    elif score <= 4:
-        strength = "Medium"
-    else:
-        strength = "Strong"
-
-    return score, strength
+def rescore_strengths(progress=None, batch_size: int = 1000) -> dict:
+    """
+    Scores every account again after an estimator or breach corpus change
+    and returns name -> strength. It only reads the vault, so it can run on
+    a worker thread while nothing else edits it; progress(done, total) is
+    called after each batch. Hand the result to apply_rescored().
+    """
+    names = list(vault_data)
+    scored, memo = {}, {}   # one memo, so a password reused across batches is scored once
+    for start in range(0, len(names), batch_size):
+        batch = names[start:start + batch_size]
+        secrets = vault.get_secrets([vault_data[name] for name in batch], fernet)
+        results = password_strengths((secret["password"] for secret in secrets), memo)
+        scored.update((name, strength) for name, (_, strength) in zip(batch, results))
+        if progress:
+            progress(len(scored), len(names))
+    return scored
+
+
+def warn_leftover_files(paths, parent=None):
+    """Tells the user which files under the old master password a re-key could not delete."""
+    if paths:
+        messagebox.showwarning("Old Files Left Behind",
+                               "These files can still be opened with the old master password, but could not "
+                               "be deleted:\n\n" + "\n".join(paths) + "\n\nDelete them by hand.", parent=parent)
+
+
+def apply_rescored(scored: dict):
+    """Records re-scored strengths (on the Tk thread) and queues the accounts whose class moved."""
+    for name in strength_stats.rescore(scored.items()):
+        vault_data[name] = {**vault_data[name], "strength": scored[name]}
+        save_queue.put(name, vault_data[name], len(vault_data))
 
 
 def configure_zebra_tags():
@@ -462,7 +652,8 @@ def refresh_home():
 
     # ---------- EMPTY STATE ----------
     if not vault_data:
-        accounts_tree.pack_forget()
+        table_frame.pack_forget()
+        accounts_table.clear()
         empty_state_frame.pack(fill="both", expand=True)
 
         total_label.config(text="Total Accounts: 0")
@@ -472,34 +663,15 @@ def refresh_home():
 
     # ---------- NORMAL STATE ----------
     empty_state_frame.pack_forget()
-    accounts_tree.pack(fill="both", expand=True)
-
-    total_accounts = len(vault_data)
-    weak_count = medium_count = strong_count = 0
+    table_frame.pack(fill="both", expand=True)
 
-    for data in vault_data.values():
-        score, strength = password_strength(data["password"])
-        if strength == "Weak":
-            weak_count += 1
-        elif strength == "Medium":
-            medium_count += 1
-        else:
-            strong_count += 1
+    # Counters are kept up to date on every change, so this does not walk the vault
+    total_label.config(text=f"Total Accounts: {len(vault_data)}")
+    weak_label.config(text=f"Weak Passwords: {strength_stats.counts['Weak']}")
+    strong_label.config(text=f"Strong Passwords: {strength_stats.counts['Strong']}")
 
-    total_label.config(text=f"Total Accounts: {total_accounts}")
-    weak_label.config(text=f"Weak Passwords: {weak_count}")
-    strong_label.config(text=f"Strong Passwords: {strong_count}")
-
-    accounts_tree.delete(*accounts_tree.get_children())
-
-    for index, (name, data) in enumerate(vault_data.items()):
-        tag = "even" if index % 2 == 0 else "odd"
-        accounts_tree.insert(
-            "",
-            "end",
-            values=(name, data["username"]),
-            tags=(tag,)
-        )
+    # Only the visible rows become Treeview items; zebra tags follow the row index
+    accounts_table.set_rows(list(vault_data))
 
 
 def build_home():
@@ -553,43 +725,167 @@ def show_home():
     refresh_home()  # <--- This puts the data back in the table
 
 
-def show_analytics():
-    if not vault_data:
-        messagebox.showinfo("No Data", "No accounts in vault to analyze.")
-        return
+# ===============================
+# ANALYTICS STACK (LOADED ON DEMAND)
+# ===============================
+# seaborn and matplotlib take longer to import than the rest of the app put
+# together and are only used on the analytics page, so they are not loaded
+# before the login prompt. After unlock they are warmed on a background thread.
+analytics_stack = None
+
+
+def load_analytics_stack():
+    """Returns (sns, Figure, FigureCanvasTkAgg), importing them on first use."""
+    global analytics_stack
+    if analytics_stack is None:
+        import seaborn as sns
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        analytics_stack = (sns, Figure, FigureCanvasTkAgg)
+    return analytics_stack
+
+
+def warm_analytics_stack():
+    """Imports the analytics libraries in the background so the first chart opens quickly."""
+    def warm():
+        try:
+            import seaborn
+            import matplotlib.figure
+        except ImportError as e:
+            print(f"Analytics libraries unavailable: {e}")
+
+    threading.Thread(target=warm, name="analytics-warmup", daemon=True).start()
 
-    # 1. Hide the Home screen (don't destroy it!)
-    for widget in main_area.winfo_children():
-        widget.pack_forget()
 
-    # 2. Create a fresh container for Analytics
+# ===============================
+# ANALYTICS SCREEN
+# ===============================
+# The screen is built once and kept (hidden) between visits; each visit only
+# updates the bar heights. The figure is a plain matplotlib Figure rather than
+# a pyplot one, so pyplot never holds on to it, and release_analytics() frees
+# it when the screen goes away (lock, or the frame being destroyed).
+analytics_view = None
+analytics_chart = None  # (figure, axes, bars, canvas) while the screen exists
+reuse_summary_label = None
+reuse_tree = None
+
+
+def build_analytics_view():
+    global analytics_view, analytics_chart, reuse_summary_label, reuse_tree
+    sns, Figure, FigureCanvasTkAgg = load_analytics_stack()
+
     analytics_view = tb.Frame(main_area)
-    analytics_view.pack(fill="both", expand=True)
+    analytics_view.bind("<Destroy>", lambda event: release_analytics() if event.widget is analytics_view else None)
 
-    # 3. Add the Back Button (Packed at the bottom first)
+    # Back Button (Packed at the bottom first)
     tb.Button(
         analytics_view,
         text="← Back to Home",
         bootstyle="info",
         width=26,
-        command=show_home # Now calls the fixed show_home
+        command=show_home
     ).pack(side="bottom", pady=20)
 
-    # 4. Data & Chart Logic
-    df = pd.DataFrame.from_dict(vault_data, orient="index")
-    df["Strength"] = df["password"].apply(lambda x: password_strength(x)[1])
-    strength_counts = df["Strength"].value_counts().reindex(["Weak", "Medium", "Strong"], fill_value=0)
+    # Reused passwords panel (right side)
+    reuse_frame = tb.Frame(analytics_view)
+    reuse_frame.pack(side="right", fill="y", padx=(10, 0))
+
+    tb.Label(reuse_frame, text="Reused Passwords", font=("Segoe UI", 12, "bold")).pack(anchor="w", pady=(10, 5))
+    reuse_summary_label = tb.Label(reuse_frame, text="")
+    reuse_summary_label.pack(anchor="w", pady=(0, 5))
+
+    reuse_tree = tb.Treeview(reuse_frame, columns=("Accounts",), show="tree headings", height=12)
+    reuse_tree.heading("#0", text="Group", anchor="w")
+    reuse_tree.heading("Accounts", text="Accounts sharing one password", anchor="w")
+    reuse_tree.column("#0", width=80, stretch=False)
+    reuse_tree.column("Accounts", width=260, stretch=True)
+    reuse_tree.pack(fill="y", expand=True)
 
     chart_frame = tb.Frame(analytics_view)
-    chart_frame.pack(fill="both", expand=True)
+    chart_frame.pack(side="left", fill="both", expand=True)
 
-    fig, ax = plt.subplots(figsize=(5, 4), dpi=100)
-    sns.barplot(x=strength_counts.index, y=strength_counts.values, palette="viridis", ax=ax)
+    fig = Figure(figsize=(5, 4), dpi=100)
+    ax = fig.add_subplot()
+    bars = ax.bar(STRENGTH_CLASSES, [0] * len(STRENGTH_CLASSES), color=sns.color_palette("viridis", len(STRENGTH_CLASSES)))
     ax.set_title("Password Strength Distribution")
 
     canvas = FigureCanvasTkAgg(fig, master=chart_frame)
-    canvas.draw()
     canvas.get_tk_widget().pack(fill="both", expand=True)
+    analytics_chart = (fig, ax, bars, canvas)
+
+
+def release_analytics():
+    """Drops the analytics figure and its canvas so they can be garbage collected."""
+    global analytics_view, analytics_chart
+    if analytics_chart is not None:
+        fig, _, _, canvas = analytics_chart
+        analytics_chart = None
+        fig.clear()
+        canvas.get_tk_widget().destroy()
+    if analytics_view is not None:
+        view, analytics_view = analytics_view, None
+        view.destroy()
+
+
+def update_analytics_chart():
+    fig, ax, bars, canvas = analytics_chart
+
+    # Same counters as the home screen; no secrets are decrypted here
+    counts = strength_stats.counts
+    for bar, strength in zip(bars, STRENGTH_CLASSES):
+        bar.set_height(counts[strength])
+    ax.set_ylim(0, max(counts.values()) * 1.1 or 1)
+    canvas.draw_idle()
+
+
+def ensure_reuse_index():
+    """Builds the reuse index on first use; afterwards every change keeps it current."""
+    global reuse_index
+    if reuse_index is None:
+        names = list(vault_data)
+        secrets = vault.get_secrets([vault_data[name] for name in names], fernet)
+        reuse_index = ReuseIndex()
+        reuse_index.rebuild((name, secret["password"]) for name, secret in zip(names, secrets))
+    return reuse_index
+
+
+def update_reuse_panel():
+    groups = ensure_reuse_index().groups()
+    if groups:
+        reuse_summary_label.config(
+            text=f"{reuse_index.reused_count()} accounts share {len(groups)} passwords",
+            bootstyle="danger"
+        )
+    else:
+        reuse_summary_label.config(text="No reused passwords found", bootstyle="success")
+
+    reuse_tree.delete(*reuse_tree.get_children())
+    for number, group in enumerate(groups, start=1):
+        reuse_tree.insert("", "end", text=f"#{number}", values=(", ".join(group),))
+
+
+def show_analytics():
+    if not vault_data:
+        messagebox.showinfo("No Data", "No accounts in vault to analyze.")
+        return
+
+    if analytics_view is None:
+        try:
+            build_analytics_view()
+        except ImportError as e:
+            messagebox.showerror("Analytics Unavailable", f"Could not load the charting libraries: {e}")
+            return
+
+    # Hide the current screen (don't destroy it!) and bring back the chart
+    for widget in main_area.winfo_children():
+        widget.pack_forget()
+    analytics_view.pack(fill="both", expand=True)
+
+    update_analytics_chart()
+    try:
+        update_reuse_panel()
+    except Exception as e:
+        messagebox.showerror("Error", f"Could not check for reused passwords: {e}")
 
 
 def show_settings():
@@ -627,6 +923,8 @@ def show_settings():
     require_number_var = tk.BooleanVar(value=password_policy.get("require_number", True))
     require_upper_var = tk.BooleanVar(value=password_policy.get("require_upper", True))
     require_special_var = tk.BooleanVar(value=password_policy.get("require_special", True))
+    max_repeats_var = tk.IntVar(value=password_policy.get("max_repeats", 0))
+    banned_var = tk.StringVar(value=", ".join(password_policy.get("banned_substrings", [])))
 
     tb.Label(settings_frame, text="Minimum Password Length:").pack(anchor="w")
     tb.Entry(settings_frame, textvariable=min_length_var, width=5).pack(anchor="w", pady=2)
@@ -636,18 +934,43 @@ def show_settings():
                    bootstyle="secondary").pack(anchor="w")
     tb.Checkbutton(settings_frame, text="Require Special Character", variable=require_special_var,
                    bootstyle="secondary").pack(anchor="w")
+    tb.Label(settings_frame, text="Max Repeated Characters in a Row (0 = no limit):").pack(anchor="w")
+    tb.Entry(settings_frame, textvariable=max_repeats_var, width=5).pack(anchor="w", pady=2)
+    tb.Label(settings_frame, text="Banned Words (comma separated):").pack(anchor="w")
+    tb.Entry(settings_frame, textvariable=banned_var, width=40).pack(anchor="w", pady=2)
 
     def save_settings_action():
-        global password_policy
+        global password_policy, policy_validator
+        old_policy = password_policy
 
-        # Update the dictionary
+        # Update the dictionary (keeping settings this page does not edit)
         password_policy = {
+            **old_policy,
             "theme": "cosmo" if theme_var.get() == "light" else "darkly",
             "min_length": min_length_var.get(),
             "require_number": require_number_var.get(),
             "require_upper": require_upper_var.get(),
-            "require_special": require_special_var.get()
+            "require_special": require_special_var.get(),
+            "max_repeats": max_repeats_var.get(),
+            "banned_substrings": [word.strip() for word in banned_var.get().split(",") if word.strip()],
+            "storage_backend": backend_var.get(),
+            "snapshot_keep": max(1, snapshot_keep_var.get())
         }
+        policy_validator = PasswordPolicy(password_policy)
+
+        # Move the vault into the newly selected storage backend
+        if backend_var.get() != vault.BACKEND:
+            save_queue.flush()
+            try:
+                vault.migrate_backend(vault_data, fernet, backend_var.get())
+            except Exception as e:
+                # The vault stays where it was, so none of these settings apply
+                password_policy = old_policy
+                policy_validator = PasswordPolicy(password_policy)
+                backend_var.set(vault.BACKEND)
+                messagebox.showerror("Settings", f"Could not move the vault to the new storage; "
+                                                 f"nothing was changed: {e}")
+                return
 
         # 🔥 SAVE TO FILE
         app_settings.save_settings(password_policy)
@@ -655,12 +978,478 @@ def show_settings():
         messagebox.showinfo("Saved", "Settings saved successfully.")
         show_home()
 
+    # Vault Maintenance
+    tb.Label(settings_frame, text="Vault Maintenance", font=("Segoe UI", 12, "bold")).pack(anchor="w", pady=(20, 5))
+
+    backend_var = tk.StringVar(value=password_policy.get("storage_backend", "log"))
+    tb.Radiobutton(settings_frame, text="Storage: Encrypted log file", variable=backend_var, value="log",
+                   bootstyle="secondary").pack(anchor="w")
+    tb.Radiobutton(settings_frame, text="Storage: SQLite database", variable=backend_var, value="sqlite",
+                   bootstyle="secondary").pack(anchor="w")
+
+    def compact_vault_action():
+        save_queue.flush()
+        vault.compact_vault(vault_data, fernet)
+        messagebox.showinfo("Compacted", "Vault log compacted successfully.")
+
+    tb.Button(settings_frame, text="Compact Vault", bootstyle="secondary-outline",
+              command=compact_vault_action).pack(anchor="w", pady=2)
+    tb.Button(settings_frame, text="Change Master Password", bootstyle="warning-outline",
+              command=change_master_password).pack(anchor="w", pady=2)
+    tb.Button(settings_frame, text="Import Accounts…", bootstyle="secondary-outline",
+              command=import_accounts_dialog).pack(anchor="w", pady=2)
+    tb.Button(settings_frame, text="Export Backup…", bootstyle="secondary-outline",
+              command=lambda: backup_dialog(restoring=False)).pack(anchor="w", pady=2)
+    tb.Button(settings_frame, text="Restore Backup…", bootstyle="secondary-outline",
+              command=lambda: backup_dialog(restoring=True)).pack(anchor="w", pady=2)
+    tb.Button(settings_frame, text="Restore Snapshot…", bootstyle="secondary-outline",
+              command=snapshot_dialog).pack(anchor="w", pady=2)
+
+    snapshot_keep_var = tk.IntVar(value=password_policy.get("snapshot_keep", snapshots.DEFAULT_KEEP))
+    tb.Label(settings_frame, text="Snapshots to Keep (taken on lock and exit):").pack(anchor="w")
+    tb.Entry(settings_frame, textvariable=snapshot_keep_var, width=5).pack(anchor="w", pady=2)
+
     btn_frame = tb.Frame(settings_frame)
     btn_frame.pack(pady=20)
     tb.Button(btn_frame, text="Save Settings", bootstyle="success", command=save_settings_action).pack(side="left",
                                                                                                        padx=5)
     tb.Button(btn_frame, text="Cancel", bootstyle="secondary", command=show_home).pack(side="left", padx=10)
 
+def change_master_password():
+    popup = tb.Toplevel(root)
+    popup.title("Change Master Password")
+    popup.geometry("450x470")
+    popup.resizable(False, False)
+    popup.grab_set()
+
+    tb.Label(popup, text="Change Master Password", font=("Inter", 14, "bold")).pack(pady=(20, 5))
+    tb.Label(popup, text="Snapshots open with the current password, so they are all deleted.",
+             font=("Inter", 9, "italic")).pack(pady=(0, 10))
+
+    entries = []
+    for label in ("Current Password", "New Password", "Confirm New Password"):
+        tb.Label(popup, text=label).pack(anchor="w", padx=30)
+        entry = tb.Entry(popup, show="*", font=("JetBrains Mono", 11))
+        entry.pack(fill="x", padx=30, pady=(0, 8))
+        entries.append(entry)
+    current_entry, new_entry, confirm_entry = entries
+
+    progress_bar = tb.Progressbar(popup, bootstyle="info-striped", maximum=100)
+    status_label = tb.Label(popup, text="", font=("Inter", 9, "italic"))
+    leftover = []   # old-key files the re-key could not delete
+
+    def update_progress(done, total):
+        percent = 100 * done / total if total else 100
+        progress_bar["value"] = percent
+        status_label.config(text=f"Re-encrypting vault… {percent:.0f}%")
+
+    def finish(new_key, error):
+        global fernet, vault_data
+        if error is not None or new_key is None:
+            # The vault is still on the old key; resume normal saving
+            start_save_queue()
+            popup.protocol("WM_DELETE_WINDOW", popup.destroy)
+            submit_btn.config(state="normal")
+            status_label.config(text="")
+            if error is not None:
+                messagebox.showerror("Error", f"Could not change the master password: {error}", parent=popup)
+            else:
+                messagebox.showerror("Access Denied", "Current master password is incorrect.", parent=popup)
+            return
+
+        # In-memory secrets were encrypted under the old key, so reload the index
+        fernet = Fernet(new_key)
+        try:
+            vault_data = vault.load_vault(fernet)
+        except Exception as e:
+            # The loaded secrets no longer match the key; never save them, start over from the login
+            start_save_queue()
+            popup.destroy()
+            messagebox.showerror("Error", f"The master password was changed, but the vault could not be "
+                                          f"reloaded: {e}\n\nUnlock it with the new password.")
+            lock_vault()
+            return
+        start_save_queue()
+        popup.destroy()
+        messagebox.showinfo("Success", "Master password changed successfully.")
+        warn_leftover_files(leftover)
+        refresh_home()
+
+    def submit():
+        current, new, confirm = current_entry.get(), new_entry.get(), confirm_entry.get()
+        if not current or not new:
+            messagebox.showerror("Error", "Password cannot be empty.", parent=popup)
+            return
+        if new != confirm:
+            messagebox.showerror("Error", "New passwords do not match.", parent=popup)
+            return
+
+        submit_btn.config(state="disabled")
+        progress_bar.pack(fill="x", padx=30, pady=(10, 0))
+        status_label.pack(pady=5)
+        status_label.config(text="Verifying…")
+
+        # Everything queued must be on disk before the vault is re-keyed, and
+        # the popup stays open (saving is off) until finish() has run
+        popup.protocol("WM_DELETE_WINDOW", lambda: None)
+        stop_save_queue()
+
+        def reencrypt(old_key, new_key):
+            leftover.extend(vault.rekey_vault(
+                Fernet(old_key),
+                Fernet(new_key),
+                progress=lambda done, total: root.after(0, update_progress, done, total)
+            ))
+
+        def worker():
+            try:
+                new_key, error = auth.change_master(current, new, reencrypt), None
+            except Exception as e:
+                new_key, error = None, e
+            if new_key is not None:
+                # Snapshots hold the vault and master.kdf under the old password
+                leftover.extend(snapshots.delete_all_snapshots())
+            root.after(0, finish, new_key, error)
+
+        threading.Thread(target=worker, name="vault-rekey", daemon=True).start()
+
+    submit_btn = tb.Button(popup, text="Change Password", bootstyle="warning", width=20, command=submit)
+    submit_btn.pack(pady=15)
+
+
+def add_entries(entries: dict):
+    """Brings entries that were already written to disk (import, restore) into the session."""
+    global reuse_index
+    vault_data.update(entries)
+    for name, entry in entries.items():
+        account_index.add(name, entry["username"])
+        strength_stats.set(name, entry["strength"])
+    reuse_index = None  # rebuilt with the new passwords on the next analytics visit
+    refresh_home()
+
+
+def apply_bulk_changes(changes: dict, renamed: dict = None):
+    """
+    Commits a bulk edit from bulk_ops: one vault write, whatever the batch
+    size, then the session indexes and a single refresh of the home screen.
+    `renamed` (old name -> new name) lets the reuse index follow renames.
+    """
+    if not changes:
+        return
+    save_queue.flush()  # queued single edits go first, so they cannot overwrite the batch
+    vault.write_changes(changes, fernet, bulk_ops.live_count(vault_data, changes))
+
+    for name, entry in changes.items():
+        if entry is None:
+            vault_data.pop(name, None)
+            account_index.remove(name)
+            strength_stats.remove(name)
+        else:
+            vault_data[name] = entry
+            account_index.add(name, entry["username"])
+            strength_stats.set(name, entry["strength"])
+    if reuse_index is not None:
+        if renamed:
+            reuse_index.rename(renamed)
+        for name, entry in changes.items():
+            if entry is None:
+                reuse_index.remove(name)
+    refresh_home()
+
+
+def bulk_edit_dialog():
+    names = accounts_table.selected_keys()
+    if not names:
+        messagebox.showwarning("Selection Required",
+                               "Select the accounts to edit first (Ctrl-click, Shift-click or Ctrl-A).")
+        return
+
+    popup = tb.Toplevel(root)
+    popup.title("Bulk Edit")
+    popup.geometry("460x520")
+    popup.resizable(False, False)
+    popup.grab_set()
+
+    tb.Label(popup, text="Bulk Edit", font=("Inter", 14, "bold")).pack(pady=(20, 0))
+    tb.Label(popup, text=f"{len(names)} accounts selected", font=("Inter", 9, "italic")).pack(pady=(0, 10))
+
+    def run(build, done_message):
+        # build() returns (changes, renamed) from bulk_ops
+        try:
+            changes, renamed = build()
+            apply_bulk_changes(changes, renamed)
+        except ValueError as e:
+            messagebox.showerror("Bulk Edit", str(e), parent=popup)
+            return
+        except Exception as e:
+            messagebox.showerror("Bulk Edit", f"Could not save the changes; the vault is unchanged: {e}", parent=popup)
+            return
+        popup.destroy()
+        count = len(renamed) if renamed is not None else len(changes)
+        messagebox.showinfo("Bulk Edit", done_message.format(count=count))
+
+    # Rename by pattern
+    rename_frame = tb.Labelframe(popup, text="Rename")
+    rename_frame.pack(fill="x", padx=20, pady=5)
+    tb.Label(rename_frame, text="Find (text, or * and ? wildcards):").pack(anchor="w", padx=10)
+    find_entry = tb.Entry(rename_frame)
+    find_entry.pack(fill="x", padx=10)
+    tb.Label(rename_frame, text="Replace with:").pack(anchor="w", padx=10)
+    replace_entry = tb.Entry(rename_frame)
+    replace_entry.pack(fill="x", padx=10)
+    regex_var = tk.BooleanVar(value=False)
+    tb.Checkbutton(rename_frame, text="Regular expression", variable=regex_var,
+                   bootstyle="secondary").pack(anchor="w", padx=10, pady=5)
+    tb.Button(rename_frame, text="Rename", bootstyle="info", command=lambda: run(
+        lambda: bulk_ops.rename_changes(vault_data, names, find_entry.get(), replace_entry.get(), regex_var.get()),
+        "Renamed {count} accounts."
+    )).pack(anchor="e", padx=10, pady=(0, 10))
+
+    # Move to folder
+    folder_frame = tb.Labelframe(popup, text="Move to Folder")
+    folder_frame.pack(fill="x", padx=20, pady=5)
+    folders = sorted({entry["folder"] for entry in vault_data.values()} - {""})
+    folder_box = tb.Combobox(folder_frame, values=folders)
+    folder_box.pack(fill="x", padx=10, pady=(5, 0))
+    tb.Button(folder_frame, text="Move", bootstyle="info", command=lambda: run(
+        lambda: (bulk_ops.move_changes(vault_data, names, folder_box.get()), None),
+        "Moved {count} accounts."
+    )).pack(anchor="e", padx=10, pady=10)
+
+    # Change username
+    username_frame = tb.Labelframe(popup, text="Change Username")
+    username_frame.pack(fill="x", padx=20, pady=5)
+    username_entry = tb.Entry(username_frame)
+    username_entry.pack(fill="x", padx=10, pady=(5, 0))
+    tb.Button(username_frame, text="Change", bootstyle="info", command=lambda: run(
+        lambda: (bulk_ops.username_changes(vault_data, names, username_entry.get()), None),
+        "Updated {count} accounts."
+    )).pack(anchor="e", padx=10, pady=10)
+
+
+def backup_dialog(restoring: bool):
+    popup = tb.Toplevel(root)
+    popup.title("Restore Backup" if restoring else "Export Backup")
+    popup.geometry("450x380" if restoring else "450x440")
+    popup.resizable(False, False)
+    popup.grab_set()
+
+    tb.Label(popup, text="Restore Backup" if restoring else "Export Encrypted Backup",
+             font=("Inter", 14, "bold")).pack(pady=(20, 10))
+
+    entries = []
+    for label in ("Backup Passphrase",) if restoring else ("Backup Passphrase", "Confirm Passphrase"):
+        tb.Label(popup, text=label).pack(anchor="w", padx=30)
+        entry = tb.Entry(popup, show="*", font=("JetBrains Mono", 11))
+        entry.pack(fill="x", padx=30, pady=(0, 8))
+        entries.append(entry)
+
+    progress_bar = tb.Progressbar(popup, bootstyle="info-striped", maximum=100)
+    status_label = tb.Label(popup, text="", font=("Inter", 9, "italic"))
+
+    def update_progress(done, total):
+        percent = 100 * done / total if total else 100
+        progress_bar["value"] = percent
+        status_label.config(text=f"{'Restoring' if restoring else 'Exporting'}… {percent:.0f}%")
+
+    def finish(changes, count, error):
+        if error is not None:
+            popup.protocol("WM_DELETE_WINDOW", popup.destroy)
+            submit_btn.config(state="normal")
+            status_label.config(text="")
+            action = "restore the backup; the vault is unchanged" if restoring else "export the backup"
+            messagebox.showerror("Backup", f"Could not {action}: {error}", parent=popup)
+            return
+
+        popup.destroy()
+        if restoring:
+            add_entries(changes)
+            messagebox.showinfo("Backup", f"Restored {count} accounts.")
+        else:
+            messagebox.showinfo("Backup", f"Exported {count} accounts.")
+
+    def submit():
+        passphrase = entries[0].get()
+        if not passphrase:
+            messagebox.showerror("Error", "Passphrase cannot be empty.", parent=popup)
+            return
+        if not restoring and passphrase != entries[1].get():
+            messagebox.showerror("Error", "Passphrases do not match.", parent=popup)
+            return
+
+        if restoring:
+            path = filedialog.askopenfilename(parent=popup, title="Restore Backup",
+                                              filetypes=[("CyberVault backup", "*.cvbackup"), ("All files", "*")])
+        else:
+            path = filedialog.asksaveasfilename(parent=popup, title="Export Backup", defaultextension=".cvbackup",
+                                                filetypes=[("CyberVault backup", "*.cvbackup")])
+        if not path:
+            return
+
+        # The popup (and its grab) stays until finish() has run, so nothing
+        # is edited while a restore writes and its widgets outlive the worker
+        popup.protocol("WM_DELETE_WINDOW", lambda: None)
+        submit_btn.config(state="disabled")
+        progress_bar.pack(fill="x", padx=30, pady=(10, 0))
+        status_label.pack(pady=5)
+        status_label.config(text="Deriving key…")
+        report = lambda done, total: root.after(0, update_progress, done, total)
+
+        if restoring:
+            # Nothing is written until every chunk has verified
+            save_queue.flush()
+            live = set(vault_data)
+
+            def work():
+                changes, batch = {}, []
+
+                def flush():
+                    made = parallel_map(lambda row: vault.make_entry(row[1], row[2], row[3], fernet, row[4]), batch)
+                    changes.update(zip((row[0] for row in batch), made))
+                    batch.clear()
+
+                for row in backup.restore_backup(path, passphrase, progress=report):
+                    batch.append(row)
+                    if len(batch) >= importer.BATCH_SIZE:
+                        flush()
+                flush()
+                vault.write_changes(changes, fernet, len(live | changes.keys()))
+                return changes, len(changes)
+        else:
+            items = list(vault_data.items())
+
+            def work():
+                count = backup.export_backup(path, items, lambda entry: vault.get_secret(entry, fernet), passphrase,
+                                             progress=lambda done: report(done, len(items)))
+                return None, count
+
+        def worker():
+            try:
+                changes, count = work()
+                error = None
+            except Exception as e:
+                changes, count, error = None, 0, e
+            root.after(0, finish, changes, count, error)
+
+        threading.Thread(target=worker, name="vault-backup", daemon=True).start()
+
+    submit_btn = tb.Button(popup, text="Restore" if restoring else "Export", bootstyle="warning", width=20,
+                           command=submit)
+    submit_btn.pack(pady=15)
+
+
+def snapshot_dialog():
+    try:
+        available = snapshots.list_snapshots()
+    except (OSError, ValueError) as e:
+        messagebox.showerror("Snapshots", f"Could not read the snapshots: {e}")
+        return
+    if not available:
+        messagebox.showinfo("Snapshots", "No snapshots yet. One is taken each time the vault is locked or closed.")
+        return
+
+    popup = tb.Toplevel(root)
+    popup.title("Restore Snapshot")
+    popup.geometry("520x420")
+    popup.grab_set()
+
+    tb.Label(popup, text="Restore Snapshot", font=("Inter", 14, "bold")).pack(pady=(20, 10))
+    snapshot_tree = tb.Treeview(popup, columns=("taken", "event", "size"), show="headings", height=10)
+    for column, heading, width in (("taken", "Taken", 200), ("event", "Event", 140), ("size", "Size", 100)):
+        snapshot_tree.heading(column, text=heading)
+        snapshot_tree.column(column, width=width)
+    snapshot_tree.pack(fill="both", expand=True, padx=20)
+    for snapshot in reversed(available):
+        taken = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot["created"]))
+        snapshot_tree.insert("", "end", iid=snapshot["id"],
+                             values=(taken, snapshot["label"], f"{snapshot['size'] / 1024:,.0f} KiB"))
+
+    def restore():
+        selected = snapshot_tree.selection()
+        if not selected:
+            return
+        if not messagebox.askyesno(
+                "Restore Snapshot",
+                "The vault will be locked and replaced by this snapshot. Its current state is snapshotted "
+                "first, so this can be undone.\n\nUnlock with the master password in use when the snapshot "
+                "was taken.", parent=popup):
+            return
+        popup.destroy()
+        lock_vault(restore_id=selected[0])
+
+    tb.Button(popup, text="Restore", bootstyle="warning", width=20, command=restore).pack(pady=15)
+
+
+def import_accounts_dialog():
+    path = filedialog.askopenfilename(
+        title="Import Accounts",
+        filetypes=[("Password exports", "*.csv *.xml"), ("CSV files", "*.csv"), ("KeePass XML", "*.xml")]
+    )
+    if not path:
+        return
+    try:
+        fmt = importer.detect_format(path)
+    except (OSError, ValueError) as e:
+        messagebox.showerror("Import", f"Could not read {path}: {e}")
+        return
+
+    popup = tb.Toplevel(root)
+    popup.title("Import Accounts")
+    popup.geometry("450x200")
+    popup.resizable(False, False)
+    popup.grab_set()
+    popup.protocol("WM_DELETE_WINDOW", lambda: None)  # the import runs to completion
+
+    tb.Label(popup, text="Importing Accounts", font=("Inter", 14, "bold")).pack(pady=(20, 10))
+    progress_bar = tb.Progressbar(popup, bootstyle="info-striped", maximum=100)
+    progress_bar.pack(fill="x", padx=30, pady=(10, 0))
+    status_label = tb.Label(popup, text="Reading…", font=("Inter", 9, "italic"))
+    status_label.pack(pady=5)
+
+    def update_progress(done, total):
+        percent = 100 * done / total if total else 100
+        progress_bar["value"] = percent
+        status_label.config(text=f"Importing {fmt.replace('_', ' ')} export… {percent:.0f}%")
+
+    def finish(entries, report, error):
+        popup.destroy()
+        if error is not None:
+            messagebox.showerror("Import", f"Import failed, nothing was added: {error}")
+            return
+
+        add_entries(entries)
+
+        lines = [f"Imported {report['imported']} of {report['rows']} accounts."]
+        skipped = {
+            "existing": "already in the vault",
+            "duplicates": "duplicated in the file",
+            "incomplete": "missing a name or password",
+        }
+        lines += [f"{report[key]} skipped: {reason}" for key, reason in skipped.items() if report[key]]
+        if report["policy_violations"]:
+            lines.append(f"{report['policy_violations']} do not meet the password policy")
+        messagebox.showinfo("Import", "\n".join(lines))
+
+    # Everything queued goes first, so the import lands as one write after it
+    save_queue.flush()
+    existing = {name: entry["username"] for name, entry in vault_data.items()}
+    live_count = len(vault_data)
+
+    def worker():
+        try:
+            entries, report = importer.import_accounts(
+                path, existing, fernet, policy_validator, fmt=fmt,
+                progress=lambda done, total: root.after(0, update_progress, done, total)
+            )
+            vault.write_changes(entries, fernet, live_count + len(entries))
+            error = None
+        except Exception as e:
+            entries, report, error = {}, None, e
+        root.after(0, finish, entries, report, error)
+
+    threading.Thread(target=worker, name="vault-import", daemon=True).start()
+
+
 def add_account():
     popup = tb.Toplevel(root)
     popup.title("Add New Account")
@@ -741,17 +1530,7 @@ def add_account():
             strength_label.config(text="Strength: ", bootstyle="default")
             return
 
-        score, strength = password_strength(pwd)
-        errors = []
-        if len(pwd) < password_policy["min_length"]:
-            errors.append(f"Min length: {password_policy['min_length']}")
-        if password_policy["require_number"] and not re.search(r"[0-9]", pwd):
-            errors.append("Must include a number")
-        if password_policy["require_upper"] and not re.search(r"[A-Z]", pwd):
-            errors.append("Must include uppercase")
-        if password_policy["require_special"] and not re.search(r"[!@#$%^&*(),.?\":{}|<>]", pwd):
-            errors.append("Must include special char")
-
+        errors, strength = policy_validator.check(pwd, site=name_entry.get())
         if errors:
             strength_label.config(text="Password invalid: " + ", ".join(errors), bootstyle="danger")
         else:
@@ -771,12 +1550,16 @@ def add_account():
             messagebox.showerror("Error", "Please fill all required fields.", parent=popup)
             return
 
-        if "Password invalid" in strength_label.cget("text"):
+        if policy_validator.check(password, site=name)[0]:
             messagebox.showerror("Error", "Password does not meet policy requirements.", parent=popup)
             return
 
-        vault_data[name] = {"username": username, "password": password, "notes": notes}
-        vault.save_vault(vault_data, fernet)
+        vault_data[name] = vault.make_entry(username, password, notes, fernet)
+        account_index.add(name, username)
+        strength_stats.set(name, vault_data[name]["strength"])
+        if reuse_index is not None:
+            reuse_index.set(name, password)
+        save_queue.put(name, vault_data[name], len(vault_data))
         popup.destroy()
         messagebox.showinfo("Success", "Account saved successfully.")
         refresh_home()
@@ -819,15 +1602,15 @@ tb.Button(
 
 def view_account():
     # 1. Get selection from the Treeview
-    selected = accounts_tree.focus()
-    if not selected:
+    name = accounts_table.selected_key()
+    if name is None:
         messagebox.showwarning("Select", "Please select an account from the list first.")
         return
 
-    # 2. Extract data
+    # 2. Extract data (password and notes are decrypted only now)
     try:
-        name = accounts_tree.item(selected)["values"][0]
         data = vault_data[name]
+        secret = vault.get_secret(data, fernet)
     except Exception as e:
         messagebox.showerror("Error", f"Could not load account data: {e}")
         return
@@ -889,7 +1672,7 @@ def view_account():
 
         create_detail_block("WEBSITE NAME", name)
         create_detail_block("USERNAME", data["username"])
-        create_detail_block("PASSWORD", data["password"], is_password=True)
+        create_detail_block("PASSWORD", secret["password"], is_password=True)
 
         # Notes
         tb.Label(
@@ -901,7 +1684,7 @@ def view_account():
 
         tb.Label(
             view_frame,
-            text=data["notes"] if data["notes"] else "---",
+            text=secret["notes"] if secret["notes"] else "---",
             font=DATA_FONT,
             wraplength=550,
             justify="left"
@@ -981,7 +1764,7 @@ def view_account():
             font=("JetBrains Mono", 12),
             show="*"
         )
-        pass_entry.insert(0, data["password"])
+        pass_entry.insert(0, secret["password"])
         pass_entry.pack(side="left", fill="x", expand=True)
 
         # --- SUGGESTION LOGIC ---
@@ -1037,23 +1820,13 @@ def view_account():
                 strength_label.config(text="Strength: ", bootstyle="default")
                 return
 
-            errors = []
-            if len(pwd) < password_policy["min_length"]:
-                errors.append(f"Min length: {password_policy['min_length']}")
-            if password_policy["require_number"] and not re.search(r"[0-9]", pwd):
-                errors.append("Need number")
-            if password_policy["require_upper"] and not re.search(r"[A-Z]", pwd):
-                errors.append("Need uppercase")
-            if password_policy["require_special"] and not re.search(r"[!@#$%^&*(),.?\":{}|<>]", pwd):
-                errors.append("Need special character")
-
+            errors, strength = policy_validator.check(pwd, site=name_entry.get())
             if errors:
                 strength_label.config(
                     text="⚠️ Policy: " + ", ".join(errors),
                     bootstyle="danger"
                 )
             else:
-                score, strength = password_strength(pwd)
                 color = {"Weak": "danger", "Medium": "warning", "Strong": "success"}[strength]
                 strength_label.config(
                     text=f"✅ Strength: {strength}",
@@ -1078,7 +1851,7 @@ def view_account():
             relief="flat",
             highlightthickness=1
         )
-        notes_text.insert("1.0", data["notes"])
+        notes_text.insert("1.0", secret["notes"])
         notes_text.pack(fill="x", pady=(5, 15))
 
         def validate_and_save():
@@ -1090,25 +1863,35 @@ def view_account():
                 messagebox.showerror("Error", "Missing required fields.")
                 return
 
-            if "Policy:" in strength_label.cget("text"):
+            if policy_validator.check(new_pass, site=new_name)[0]:
                 messagebox.showerror(
                     "Policy Violation",
                     "Fix password requirements first."
                 )
                 return
 
-            # Update the global vault_data
+            # Update the global vault_data and queue only the changed rows
+            folder = vault_data[name]["folder"]
             if new_name != name:
                 del vault_data[name]
-
-            vault_data[new_name] = {
-                "username": new_user,
-                "password": new_pass,
-                "notes": notes_text.get("1.0", "end-1c")
-            }
-
-            # Call the global save function
-            vault.save_vault(vault_data, fernet)
+                account_index.remove(name)
+                strength_stats.remove(name)
+                if reuse_index is not None:
+                    reuse_index.remove(name)
+                save_queue.delete(name, len(vault_data))
+
+            vault_data[new_name] = vault.make_entry(
+                new_user,
+                new_pass,
+                notes_text.get("1.0", "end-1c"),
+                fernet,
+                folder
+            )
+            account_index.add(new_name, new_user)
+            strength_stats.set(new_name, vault_data[new_name]["strength"])
+            if reuse_index is not None:
+                reuse_index.set(new_name, new_pass)
+            save_queue.put(new_name, vault_data[new_name], len(vault_data))
             messagebox.showinfo("Success", "Account Modified!")
             show_home()
 
@@ -1138,52 +1921,97 @@ def view_account():
 
 
 def delete_account():
-    selected = accounts_tree.focus()
-    if not selected:
+    # The account keys of the selected rows
+    names = accounts_table.selected_keys()
+    if not names:
         messagebox.showwarning("Selection Required", "Please select an account from the list to delete.")
         return
 
-    # Get the account name from the Treeview
-    name = accounts_tree.item(selected)["values"][0]
-
     # Professional confirmation with a 'Warning' icon
+    what = f"the account: '{names[0]}'" if len(names) == 1 else f"these {len(names)} accounts"
     confirm = messagebox.askyesno(
         "Confirm Deletion",
-        f"Are you sure you want to permanently delete the account: '{name}'?\n\n"
+        f"Are you sure you want to permanently delete {what}?\n\n"
         "This action cannot be undone.",
         icon='warning'
     )
 
     if confirm:
         try:
-            # Remove from dictionary
-            vault_data.pop(name)
-
-            # Save the updated vault to the encrypted file
-            vault.save_vault(vault_data, fernet)
-
-            # Refresh the UI to show the account is gone
-
+            # One vault write and one refresh, however many were selected
+            apply_bulk_changes(bulk_ops.delete_changes(vault_data, names))
 
-            messagebox.showinfo("Deleted", f"Successfully removed '{name}' from your vault.")
-            refresh_home()
+            what = f"'{names[0]}'" if len(names) == 1 else f"{len(names)} accounts"
+            messagebox.showinfo("Deleted", f"Successfully removed {what} from your vault.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to delete account: {e}")
+
+
 def search_accounts(*args):
-    query = search_var.get().lower()
-    accounts_tree.delete(*accounts_tree.get_children())
+    # Matching runs on the search worker once typing pauses; see show_search_results
+    search_scheduler.submit(search_var.get())
 
-    # Filter matching accounts
-    filtered_accounts = {
-        name: data
-        for name, data in vault_data.items()
-        if query in name.lower() or query in data["username"].lower()
-    }
 
-    # Insert with zebra tags
-    for index, (name, data) in enumerate(filtered_accounts.items()):
-        tag = "even" if index % 2 == 0 else "odd"
-        accounts_tree.insert("", "end", values=(name, data["username"]), tags=(tag,))
+def show_search_results(query, matches):
+    # A newer keystroke is already on its way
+    if not search_scheduler.is_current(query):
+        return
+
+    # Accounts deleted while the search ran are skipped; only visible rows are drawn
+    accounts_table.set_rows([name for name in matches if name in vault_data])
+
+
+def snapshot_vault(label: str):
+    """Snapshots the closed vault and prunes old snapshots; a failure never blocks locking or quitting."""
+    try:
+        snapshots.take_snapshot(label)
+        snapshots.prune_snapshots(password_policy.get("snapshot_keep", snapshots.DEFAULT_KEEP))
+    except Exception as e:
+        print(f"Could not snapshot the vault: {e}")
+
+
+def lock_vault(restore_id: str = None):
+    """
+    Flushes pending saves, snapshots the vault, forgets the key and returns
+    to the login prompt. With restore_id, that snapshot is restored once the
+    current state has been snapshotted.
+    """
+    global fernet, vault_data, reuse_index, password_policy
+    stop_save_queue()
+    vault.close()
+    snapshot_vault("Before restore" if restore_id else "Locked")
+    if restore_id:
+        try:
+            backend = snapshots.restore_snapshot(restore_id)
+        except Exception as e:
+            messagebox.showerror("Snapshots", f"Could not restore the snapshot; the vault is unchanged: {e}")
+        else:
+            # The next unlock opens the vault in the backend the snapshot holds it in
+            if backend != password_policy.get("storage_backend", "log"):
+                password_policy = {**password_policy, "storage_backend": backend}
+                app_settings.save_settings(password_policy)
+
+    fernet = None
+    vault_data = {}
+    account_index.rebuild(())
+    strength_stats.rebuild(())
+    breach_check.close_corpus()
+    strength_estimator.clear_cache()
+    reuse_index = None  # drops the session key with the digests
+    accounts_table.clear()
+    release_analytics()
+    save_status_label.config(text="")
+
+    root.withdraw()
+    ask_master_password()
+
+
+def close_app():
+    search_scheduler.stop()
+    stop_save_queue()
+    vault.close()
+    snapshot_vault("Closed")
+    root.destroy()
 
 
 def show_about():
@@ -1295,6 +2123,12 @@ tb.Button(accounts_buttons_frame,
           bootstyle="danger",
           style='danger.Sidebar.TButton',
           command=delete_account).pack(fill="x", pady=5)
+
+tb.Button(accounts_buttons_frame,
+          text="🧰 Bulk Edit",
+          bootstyle="secondary",
+          style='secondary.Sidebar.TButton',
+          command=bulk_edit_dialog).pack(fill="x", pady=5)
 # Other sidebar buttons
 tb.Button(
     sidebar,
@@ -1313,6 +2147,14 @@ tb.Button(sidebar,
           style='Sidebar.TButton',
           command=show_settings).pack(pady=8)
 
+# Lock Button (pinned to the very bottom, below About)
+tb.Button(sidebar,
+          text="🔒 Lock Vault",
+          width=26,
+          bootstyle="info",
+          style='Sidebar.TButton',
+          command=lock_vault).pack(side="bottom", pady=8)
+
 # About Button (Matches Home characteristics but stays at the bottom)
 tb.Button(sidebar,
           text="ℹ️ About",
@@ -1323,7 +2165,16 @@ tb.Button(sidebar,
 # ===============================
 # BINDINGS & START
 # ===============================
+search_scheduler = SearchScheduler(
+    account_index.query,
+    # Results arrive on the worker thread; hop onto the Tk thread
+    on_result=lambda query, matches: root.after(0, show_search_results, query, matches),
+    delay=password_policy.get("search_debounce_ms", 150) / 1000
+)
 search_var.trace_add("write", search_accounts)
+root.protocol("WM_DELETE_WINDOW", close_app)
 refresh_home()
 apply_global_fonts()
+startup.mark("main window built")
+root.after_idle(startup.login_prompt_shown, root)
 root.mainloop()
@@ -0,0 +1,197 @@
+import csv
+import os
+import xml.etree.ElementTree as ET
+from urllib.parse import urlsplit
+
+from src import vault
+from src.utils import parallel_map
+
+# Bulk import of password exports from browsers and other password managers.
+#
+# The file is read as a stream (CSV rows or XML entries one at a time) and
+# handled in batches: each batch is normalized, de-duplicated against the
+# vault and what was already imported, checked against the password policy,
+# then scored and encrypted. The caller writes the result with a single
+# vault.write_changes(), i.e. one append or one SQLite transaction.
+FORMATS = ("chrome", "firefox", "bitwarden", "keepass_csv", "keepass_xml")
+BATCH_SIZE = 2000
+
+# For each CSV format: the header names each field may appear under
+_CSV_COLUMNS = {
+    "chrome": {"name": ("name",), "url": ("url",), "username": ("username",), "password": ("password",),
+               "notes": ("note", "notes")},
+    "firefox": {"url": ("url",), "username": ("username",), "password": ("password",)},
+    "bitwarden": {"name": ("name",), "url": ("login_uri",), "username": ("login_username",),
+                  "password": ("login_password",), "notes": ("notes",)},
+    "keepass_csv": {"name": ("title", "account"), "url": ("url", "web site"),
+                    "username": ("username", "user name", "login name"), "password": ("password",),
+                    "notes": ("notes", "comments")},
+}
+_FIELDS = ("name", "url", "username", "password", "notes")
+
+
+class _CountingReader:
+    """Binary file wrapper that remembers how many bytes have been read, for progress."""
+
+    def __init__(self, f):
+        self._file = f
+        self.done = 0
+
+    def read(self, size=-1):
+        data = self._file.read(size)
+        self.done += len(data)
+        return data
+
+    def __iter__(self):
+        for line in self._file:
+            self.done += len(line)
+            yield line
+
+
+def _csv_format(header) -> str:
+    columns = {column.strip().lower() for column in header}
+    if "login_password" in columns:
+        return "bitwarden"
+    if "httprealm" in columns or "formactionorigin" in columns:
+        return "firefox"
+    if "title" in columns or "login name" in columns:
+        return "keepass_csv"
+    if {"name", "url", "username", "password"} <= columns:
+        return "chrome"
+    raise ValueError("Unrecognised CSV export: expected a Chrome, Firefox, Bitwarden or KeePass header")
+
+
+def detect_format(path: str) -> str:
+    """Tells the export format from the start of the file."""
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        head = f.read(4096)
+    if head.lstrip().startswith("<"):
+        if "<KeePassFile" in head:
+            return "keepass_xml"
+        raise ValueError("Unrecognised XML export: only KeePass 2 XML is supported")
+    return _csv_format(next(csv.reader([head.splitlines()[0] if head else ""])))
+
+
+def _read_csv(reader: _CountingReader, fmt: str):
+    lines = (line.decode("utf-8-sig" if i == 0 else "utf-8", errors="replace")
+             for i, line in enumerate(reader))
+    rows = csv.reader(lines)
+    header = [column.strip().lower() for column in next(rows, [])]
+    detected = _csv_format(header)
+    if fmt is None:
+        fmt = detected
+
+    indexes = []
+    for field in _FIELDS:
+        names = _CSV_COLUMNS[fmt].get(field, ())
+        indexes.append(next((header.index(name) for name in names if name in header), None))
+
+    for row in rows:
+        yield tuple(row[index] if index is not None and index < len(row) else "" for index in indexes)
+
+
+def _read_keepass_xml(reader: _CountingReader):
+    # Entries inside <History> are old versions of an entry, not accounts
+    in_history = 0
+    for event, element in ET.iterparse(reader, events=("start", "end")):
+        tag = element.tag
+        if tag == "History":
+            in_history += 1 if event == "start" else -1
+            if event == "end":
+                element.clear()
+        elif event == "end" and tag == "Entry" and not in_history:
+            fields = {string.findtext("Key", ""): string.findtext("Value", "") or ""
+                      for string in element.iterfind("String")}
+            yield fields.get("Title", ""), fields.get("URL", ""), fields.get("UserName", ""), \
+                fields.get("Password", ""), fields.get("Notes", "")
+            element.clear()
+        elif event == "end" and tag in ("Group", "Meta"):
+            element.clear()
+
+
+def _site_name(url: str) -> str:
+    host = urlsplit(url if "://" in url else "//" + url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def import_accounts(path: str, existing: dict, fernet, policy=None, fmt: str = None,
+                    skip_invalid: bool = False, progress=None, batch_size: int = BATCH_SIZE):
+    """
+    Reads an export file and returns (entries, report).
+
+    `existing` maps the vault's account names to usernames; an account whose
+    name and username are already there is skipped, never overwritten. Rows
+    repeating an earlier (name, username) pair are skipped too, and a name
+    taken by another username gets the username appended. `policy` is a
+    PasswordPolicy; passwords that break it are counted, and left out when
+    skip_invalid is set. `entries` maps new account names to vault entries,
+    ready for vault.write_changes(). progress(done, total) gets bytes read.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown import format: {fmt}")
+
+    report = {"format": fmt, "rows": 0, "imported": 0, "duplicates": 0, "existing": 0,
+              "incomplete": 0, "policy_violations": 0}
+    entries = {}
+    taken = {name.lower() for name in existing}
+    known = {(name.lower(), username.lower()) for name, username in existing.items()}
+    seen = set()
+
+    def flush(batch):
+        made = parallel_map(lambda row: vault.make_entry(row[1], row[2], row[3], fernet), batch)
+        for (name, *_), entry in zip(batch, made):
+            entries[name] = entry
+        report["imported"] += len(batch)
+
+    total = os.path.getsize(path)
+    with open(path, "rb") as f:
+        reader = _CountingReader(f)
+        rows = _read_keepass_xml(reader) if fmt == "keepass_xml" else _read_csv(reader, fmt)
+
+        batch = []
+        for name, url, username, password, notes in rows:
+            report["rows"] += 1
+            name, username, url, notes = name.strip(), username.strip(), url.strip(), notes.strip()
+            name = name or _site_name(url)
+            if not name or not password:
+                report["incomplete"] += 1
+                continue
+
+            key = (name.lower(), username.lower())
+            if key in known:
+                report["existing"] += 1
+                continue
+            if key in seen:
+                report["duplicates"] += 1
+                continue
+            seen.add(key)
+
+            unique = name
+            if unique.lower() in taken and username:
+                unique = f"{name} ({username})"
+            suffix = 2
+            while unique.lower() in taken:
+                unique = f"{name} ({suffix})"
+                suffix += 1
+            taken.add(unique.lower())
+
+            if policy is not None and policy.for_site(unique).violations(password):
+                report["policy_violations"] += 1
+                if skip_invalid:
+                    continue
+
+            if url and url not in notes:
+                notes = f"URL: {url}\n{notes}".rstrip()
+            batch.append((unique, username, password, notes))
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+                if progress:
+                    progress(reader.done, total)
+        if batch:
+            flush(batch)
+
+    if progress:
+        progress(total, total)
+    return entries, report
@@ -0,0 +1,101 @@
+import base64
+import hashlib
+import hmac
+import os
+import time
+
+# Key derivation for the master password. One KDF pass produces a 32-byte
+# secret, and the stored verifier and the Fernet key are both derived from it
+# with HMAC under distinct labels, so unlocking never runs the (deliberately
+# slow) KDF twice and checking a guess against the verifier costs the full KDF.
+#
+# Version 1 parameters (no "version" key) asked for 64 bytes and used the two
+# halves directly. PBKDF2 computes those as independent blocks, so half the
+# work was enough to test a guess; they are still read so existing vaults
+# and backups open, and a password change writes version 2.
+ALGORITHMS = ("scrypt", "pbkdf2")
+DEFAULT_ALGORITHM = "scrypt"
+VERSION = 2
+
+# Calibration aims for roughly this much time per unlock on the current machine
+TARGET_MS = 250
+
+SALT_BYTES = 16
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_MIN_N = 2 ** 14
+SCRYPT_MAX_N = 2 ** 17      # 128 MiB of memory with r=8
+PBKDF2_MIN_ITERATIONS = 100_000
+
+SECRET_BYTES = 32
+_V1_BYTES = 64
+
+
+def _scrypt(password: bytes, salt: bytes, n: int, r: int, p: int, dklen: int = SECRET_BYTES) -> bytes:
+    return hashlib.scrypt(password, salt=salt, n=n, r=r, p=p, maxmem=132 * r * n, dklen=dklen)
+
+
+def derive(password: str, params: dict) -> bytes:
+    """
+    Runs the KDF described by `params` once and returns its output: 32 bytes,
+    or 64 for version 1 parameters. Pass it to split_keys() or subkey().
+    """
+    salt = base64.b64decode(params["salt"])
+    dklen = SECRET_BYTES if params.get("version", 1) >= 2 else _V1_BYTES
+    if params["algorithm"] == "scrypt":
+        return _scrypt(password.encode(), salt, params["n"], params["r"], params["p"], dklen)
+    if params["algorithm"] == "pbkdf2":
+        return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, params["iterations"], dklen=dklen)
+    raise ValueError(f"Unknown KDF algorithm: {params['algorithm']}")
+
+
+def subkey(derived: bytes, label: bytes) -> bytes:
+    """A 32-byte key for one purpose, from a version 2 KDF output."""
+    return hmac.new(derived, label, hashlib.sha256).digest()
+
+
+def split_keys(derived: bytes):
+    """Returns (verifier hex digest, Fernet key) from one KDF output."""
+    if len(derived) == _V1_BYTES:
+        return hashlib.sha256(derived[:32]).hexdigest(), base64.urlsafe_b64encode(derived[32:])
+    verifier = subkey(derived, b"master password verifier").hex()
+    key = base64.urlsafe_b64encode(subkey(derived, b"vault key"))
+    return verifier, key
+
+
+def backup_key(derived: bytes) -> bytes:
+    """The AEAD key of a backup file from one KDF output."""
+    if len(derived) == _V1_BYTES:
+        return derived[32:]
+    return subkey(derived, b"backup key")
+
+
+def calibrate(algorithm: str = DEFAULT_ALGORITHM, target_ms: int = TARGET_MS) -> dict:
+    """Benchmarks this machine and picks KDF parameters for about `target_ms` per unlock."""
+    salt = os.urandom(SALT_BYTES)
+    params = {"algorithm": algorithm, "version": VERSION, "salt": base64.b64encode(salt).decode()}
+    target = target_ms / 1000
+
+    if algorithm == "scrypt":
+        n = SCRYPT_MIN_N
+        start = time.perf_counter()
+        _scrypt(b"calibration", salt, n, SCRYPT_R, SCRYPT_P)
+        elapsed = time.perf_counter() - start
+
+        # scrypt cost is linear in n, which must stay a power of two
+        while n < SCRYPT_MAX_N and elapsed * 2 <= target:
+            n *= 2
+            elapsed *= 2
+        params.update(n=n, r=SCRYPT_R, p=SCRYPT_P)
+
+    elif algorithm == "pbkdf2":
+        probe = 50_000
+        start = time.perf_counter()
+        hashlib.pbkdf2_hmac("sha256", b"calibration", salt, probe, dklen=SECRET_BYTES)
+        elapsed = time.perf_counter() - start
+        params["iterations"] = max(PBKDF2_MIN_ITERATIONS, int(probe * target / elapsed))
+
+    else:
+        raise ValueError(f"Unknown KDF algorithm: {algorithm}")
+
+    return params
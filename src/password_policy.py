@@ -0,0 +1,130 @@
+from src.analytics import password_strength
+
+# Character classes, as the policy settings have always defined them
+NUMBER, UPPER, SPECIAL = 1, 2, 4
+_CLASSES = {
+    **dict.fromkeys("0123456789", NUMBER),
+    **dict.fromkeys("ABCDEFGHIJKLMNOPQRSTUVWXYZ", UPPER),
+    **dict.fromkeys("!@#$%^&*(),.?\":{}|<>", SPECIAL),
+}
+
+DEFAULTS = {
+    "min_length": 8,
+    "require_number": True,
+    "require_upper": True,
+    "require_special": True,
+    "max_repeats": 0,           # longest run of one character; 0 = no limit
+    "banned_substrings": [],    # matched case-insensitively
+}
+RULE_KEYS = tuple(DEFAULTS)
+
+
+class _BannedSubstrings:
+    """Aho-Corasick automaton: one step per character however many substrings are banned."""
+
+    def __init__(self, words):
+        self._goto = [{}]
+        self._fail = [0]
+        self._found = [()]      # banned words ending at each state
+        for word in words:
+            state = 0
+            for char in word:
+                state = self._goto[state].get(char) or self._new_state(state, char)
+            self._found[state] += (word,)
+
+        # Breadth first: each state's failure link is the longest proper
+        # suffix that is also a prefix of some word
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._found[child] += self._found[self._fail[child]]
+                queue.append(child)
+
+    def _new_state(self, state, char):
+        self._goto.append({})
+        self._fail.append(0)
+        self._found.append(())
+        self._goto[state][char] = len(self._goto) - 1
+        return len(self._goto) - 1
+
+    def step(self, state, char):
+        goto, fail = self._goto, self._fail
+        while state and char not in goto[state]:
+            state = fail[state]
+        return goto[state].get(char, 0)
+
+    def found(self, state):
+        return self._found[state]
+
+
+class PasswordPolicy:
+    """
+    The password policy settings compiled into one validator.
+
+    check() walks the password once: the character classes, the longest run
+    of a repeated character and every banned substring are all tracked in
+    that pass, so adding rules does not add scans. Per-site policies (the
+    "site_policies" setting, mapping part of an account name to overriding
+    rules) are compiled up front as well. Build a new one when the settings
+    change.
+    """
+
+    def __init__(self, settings: dict, _site: bool = False):
+        rules = {**DEFAULTS, **{key: settings[key] for key in RULE_KEYS if key in settings}}
+        self.min_length = int(rules["min_length"])
+        self.max_repeats = int(rules["max_repeats"])
+        self.required = ((NUMBER, "Must include a number") if rules["require_number"] else None,
+                         (UPPER, "Must include uppercase") if rules["require_upper"] else None,
+                         (SPECIAL, "Must include special char") if rules["require_special"] else None)
+        self.required = [rule for rule in self.required if rule]
+        banned = sorted({word.strip().lower() for word in rules["banned_substrings"] if word.strip()})
+        self._banned = _BannedSubstrings(banned) if banned else None
+
+        self._sites = []
+        if not _site:
+            for site, overrides in settings.get("site_policies", {}).items():
+                self._sites.append((site.lower(), PasswordPolicy({**rules, **overrides}, _site=True)))
+            # The most specific (longest) match wins
+            self._sites.sort(key=lambda item: -len(item[0]))
+
+    def for_site(self, name: str) -> "PasswordPolicy":
+        """The policy for an account name: a site policy whose key it contains, or this one."""
+        name = (name or "").lower()
+        for site, policy in self._sites:
+            if site in name:
+                return policy
+        return self
+
+    def violations(self, password: str) -> list:
+        classes = 0
+        run, longest, previous = 0, 0, None
+        banned, state, found = self._banned, 0, []
+        lookup = _CLASSES.get
+
+        for char in password:
+            classes |= lookup(char, 0)
+            run = run + 1 if char == previous else 1
+            if run > longest:
+                longest = run
+            previous = char
+            if banned is not None:
+                state = banned.step(state, char.lower())
+                found.extend(word for word in banned.found(state) if word not in found)
+
+        errors = []
+        if len(password) < self.min_length:
+            errors.append(f"Min length: {self.min_length}")
+        errors += [message for flag, message in self.required if not classes & flag]
+        if self.max_repeats and longest > self.max_repeats:
+            errors.append(f"No character more than {self.max_repeats} times in a row")
+        errors += [f"Must not contain \"{word}\"" for word in found]
+        return errors
+
+    def check(self, password: str, site: str = None):
+        """Returns (violations, strength class) for a password, under the site's policy if it has one."""
+        policy = self.for_site(site) if site else self
+        return policy.violations(password), password_strength(password)[1]
@@ -0,0 +1,79 @@
+import hashlib
+import os
+from collections import defaultdict
+
+
+class ReuseIndex:
+    """
+    Finds accounts that share a password without keeping or comparing plaintexts.
+
+    Each password is reduced to a BLAKE2b digest keyed with a random per-session
+    key, and accounts are grouped by digest. The key never leaves memory, so the
+    digests are useless for offline guessing once the session ends. Adds, edits
+    and deletes are O(1); groups() only walks the digests that are shared.
+    """
+
+    DIGEST_SIZE = 16
+
+    def __init__(self):
+        self._key = os.urandom(32)
+        self._accounts = defaultdict(set)   # digest -> account names
+        self._digests = {}                  # account name -> digest
+        self._shared = set()                # digests used by more than one account
+
+    def __len__(self):
+        return len(self._digests)
+
+    def _digest(self, password: str) -> bytes:
+        return hashlib.blake2b(password.encode(), key=self._key, digest_size=self.DIGEST_SIZE).digest()
+
+    def rebuild(self, items):
+        """Indexes (name, password) pairs from scratch, under a fresh session key."""
+        self.__init__()
+        for name, password in items:
+            self.set(name, password)
+
+    def set(self, name: str, password: str):
+        """Records a new or edited account."""
+        self._set_digest(name, self._digest(password))
+
+    def rename(self, renamed: dict):
+        """Moves accounts to new names (old name -> new name); passwords are not needed."""
+        digests = {old: self._digests[old] for old in renamed if old in self._digests}
+        for old in digests:
+            self.remove(old)
+        for old, digest in digests.items():
+            self._set_digest(renamed[old], digest)
+
+    def _set_digest(self, name: str, digest: bytes):
+        old = self._digests.get(name)
+        if old == digest:
+            return
+        self.remove(name)
+
+        accounts = self._accounts[digest]
+        accounts.add(name)
+        self._digests[name] = digest
+        if len(accounts) > 1:
+            self._shared.add(digest)
+
+    def remove(self, name: str):
+        digest = self._digests.pop(name, None)
+        if digest is None:
+            return
+        accounts = self._accounts[digest]
+        accounts.discard(name)
+        if len(accounts) < 2:
+            self._shared.discard(digest)
+        if not accounts:
+            del self._accounts[digest]
+
+    def groups(self) -> list:
+        """Sorted lists of account names that share a password, largest group first."""
+        groups = [sorted(self._accounts[digest]) for digest in self._shared]
+        groups.sort(key=lambda group: (-len(group), group[0]))
+        return groups
+
+    def reused_count(self) -> int:
+        """Number of accounts whose password is also used elsewhere."""
+        return sum(len(self._accounts[digest]) for digest in self._shared)
@@ -0,0 +1,116 @@
+import threading
+
+
+class SaveQueue:
+    """
+    Write-behind persistence for vault mutations.
+
+    Puts and deletes are collected on the caller's thread and written by a
+    background worker. Changes arriving within `window` seconds of each other
+    are coalesced (only the latest state of each account is kept) and handed
+    to `write_changes(changes, live_count)` as one batch.
+
+    `on_status` is called from the worker thread with "pending", "saved" or
+    "error"; GUI callers should marshal it onto the Tk thread with root.after.
+    """
+
+    def __init__(self, write_changes, window=0.3, on_status=None):
+        self.window = window
+        self._write_changes = write_changes
+        self._on_status = on_status or (lambda status: None)
+
+        self._cond = threading.Condition()
+        self._pending = {}        # account name -> entry, or None for a delete
+        self._live_count = None
+        self._writing = False
+        self._flush_requested = False
+        self._retry_blocked = False   # after a failed write, wait for new work before retrying
+        self._stopped = False
+        self.last_error = None
+
+        self._thread = threading.Thread(target=self._run, name="vault-save-queue", daemon=True)
+        self._thread.start()
+
+    # -------------------
+    # Producer side
+    # -------------------
+    def put(self, name, entry, live_count=None):
+        self._enqueue(name, entry, live_count)
+
+    def delete(self, name, live_count=None):
+        self._enqueue(name, None, live_count)
+
+    def _enqueue(self, name, entry, live_count):
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("Save queue has been stopped.")
+            self._pending[name] = entry
+            self._live_count = live_count
+            self._retry_blocked = False
+            self._cond.notify_all()
+        self._on_status("pending")
+
+    def has_pending(self) -> bool:
+        with self._cond:
+            return bool(self._pending) or self._writing
+
+    def flush(self):
+        """Blocks until everything queued so far has been written (or failed)."""
+        with self._cond:
+            self._flush_requested = True
+            self._retry_blocked = False
+            self.last_error = None
+            self._cond.notify_all()
+            while (self._pending or self._writing) and self.last_error is None:
+                self._cond.wait()
+            self._flush_requested = False
+        if self.last_error is not None:
+            raise self.last_error
+
+    def stop(self):
+        """Flushes outstanding changes and shuts the worker down (lock / exit)."""
+        try:
+            self.flush()
+        finally:
+            with self._cond:
+                self._stopped = True
+                self._cond.notify_all()
+            self._thread.join()
+
+    # -------------------
+    # Worker side
+    # -------------------
+    def _run(self):
+        while True:
+            with self._cond:
+                while (not self._pending or self._retry_blocked) and not self._stopped:
+                    self._cond.wait()
+                if self._stopped and (not self._pending or self._retry_blocked):
+                    return
+
+                # Let the rest of a burst arrive, unless someone is waiting on us
+                self._cond.wait_for(lambda: self._flush_requested or self._stopped, timeout=self.window)
+
+                changes, self._pending = self._pending, {}
+                live_count = self._live_count
+                self._writing = True
+
+            try:
+                self._write_changes(changes, live_count)
+                error = None
+            except Exception as e:
+                print(f"Vault save error: {e}")
+                error = e
+
+            with self._cond:
+                self._writing = False
+                self.last_error = error
+                if error is not None:
+                    # Keep failed changes unless a newer change replaced them
+                    for name, entry in changes.items():
+                        self._pending.setdefault(name, entry)
+                    self._retry_blocked = True
+                status = "error" if error is not None else ("pending" if self._pending else "saved")
+                self._cond.notify_all()
+
+            self._on_status(status)
@@ -0,0 +1,122 @@
+import threading
+from collections import defaultdict
+
+_EMPTY = frozenset()
+
+
+def _trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    In-memory trigram index for substring search over account names and usernames.
+
+    Each account's lower-cased "name\\nusername" text is split into trigrams,
+    and every trigram maps to the set of account keys containing it. A query
+    intersects the postings of its trigrams (smallest first) and verifies the
+    few candidates left, so its cost follows the rarest trigram rather than
+    the vault size. When a query extends the previous one, the previous
+    (already ordered) result is filtered instead. Queries shorter than three
+    characters match most of the vault anyway and are answered by a scan.
+    Results come back in insertion order.
+
+    All methods take an internal lock, so queries may run on a worker thread
+    while the Tk thread adds and removes accounts.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._postings = defaultdict(set)
+        self._texts = {}        # key -> "name\nusername", lower-cased
+        self._order = {}        # key -> insertion sequence, for stable result order
+        self._next_seq = 0
+        self._last_query = None
+        self._last_result = None
+
+    def __len__(self):
+        return len(self._texts)
+
+    def __contains__(self, key):
+        return key in self._texts
+
+    def rebuild(self, items):
+        """Indexes (key, username) pairs from scratch."""
+        with self._lock:
+            self._reset()
+            for key, username in items:
+                self._add(key, username)
+
+    def add(self, key: str, username: str):
+        """Adds an account, or re-indexes it in place if the key already exists."""
+        with self._lock:
+            self._add(key, username)
+
+    def _add(self, key: str, username: str):
+        if key in self._texts:
+            self._drop_postings(key)
+        else:
+            self._order[key] = self._next_seq
+            self._next_seq += 1
+
+        text = f"{key}\n{username}".lower()
+        for gram in _trigrams(text):
+            self._postings[gram].add(key)
+        self._texts[key] = text
+        self._last_query = None
+
+    def remove(self, key: str):
+        with self._lock:
+            if key not in self._texts:
+                return
+            self._drop_postings(key)
+            del self._texts[key]
+            del self._order[key]
+            self._last_query = None
+
+    def _drop_postings(self, key: str):
+        for gram in _trigrams(self._texts[key]):
+            posting = self._postings[gram]
+            posting.discard(key)
+            if not posting:
+                del self._postings[gram]
+
+    def query(self, text: str) -> list:
+        """Returns the keys whose name or username contains `text` (case-insensitive)."""
+        with self._lock:
+            return self._query(text.lower())
+
+    def _query(self, text: str) -> list:
+        if not text:
+            return list(self._order)
+
+        texts = self._texts
+        postings = sorted((self._postings.get(gram, _EMPTY) for gram in _trigrams(text)), key=len)
+        smallest = len(postings[0]) if postings else len(texts)
+
+        last = self._last_result
+        if self._last_query is not None and self._last_query in text and len(last) <= 4 * smallest:
+            # A longer version of the last query can only match a subset of its results
+            result = [key for key in last if text in texts[key]]
+        elif not postings:
+            result = [key for key in self._order if text in texts[key]]
+        else:
+            candidates = postings[0]
+            for posting in postings[1:]:
+                if len(candidates) <= 32:
+                    break  # cheaper to verify what is left than to keep intersecting
+                candidates = candidates & posting
+            result = self._ordered({key for key in candidates if text in texts[key]})
+
+        self._last_query = text
+        self._last_result = result
+        return result
+
+    def _ordered(self, keys: set) -> list:
+        # Sorting wins for small result sets, a filtered walk of the index for large ones
+        if len(keys) * 16 < len(self._order):
+            return sorted(keys, key=self._order.__getitem__)
+        return [key for key in self._order if key in keys]
@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import deque
+
+
+class SearchScheduler:
+    """
+    Runs account searches on a background worker so typing never blocks Tk.
+
+    submit() records the latest query and returns at once. The worker waits
+    until no newer keystroke has arrived for `delay` seconds, runs
+    `search(text)` and hands the result to `on_result(text, result)`. A query
+    that is superseded before it starts is skipped, and one superseded while
+    it runs has its result dropped, so only the newest query is ever shown.
+
+    `on_result` is called from the worker thread; GUI callers should marshal
+    it onto the Tk thread with root.after. stats() reports latencies for
+    tuning the delay.
+    """
+
+    def __init__(self, search, on_result, delay=0.15, history=200):
+        self.delay = delay
+        self._search = search
+        self._on_result = on_result
+
+        self._cond = threading.Condition()
+        self._query = None            # newest query not yet started
+        self._generation = 0          # bumped on every submit
+        self._submitted_at = 0.0
+        self._delivered = (0, None)   # (generation, text) of the last delivered result
+        self._stopped = False
+
+        self._submitted = self._completed = self._skipped = self._dropped = 0
+        self._latencies = deque(maxlen=history)     # keystroke -> result, seconds
+        self._search_times = deque(maxlen=history)  # time inside search(), seconds
+
+        self._thread = threading.Thread(target=self._run, name="account-search", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str):
+        with self._cond:
+            if self._query is not None:
+                self._skipped += 1
+            self._query = text
+            self._generation += 1
+            self._submitted += 1
+            self._submitted_at = time.perf_counter()
+            self._cond.notify_all()
+
+    def is_current(self, text: str) -> bool:
+        """True if `text` is the newest query and its result was delivered (for the Tk thread)."""
+        with self._cond:
+            return self._delivered == (self._generation, text)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def stats(self) -> dict:
+        """Counters plus mean / p95 latency in milliseconds over the recent history."""
+        with self._cond:
+            latencies = sorted(self._latencies)
+            search_times = sorted(self._search_times)
+            result = {
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "skipped": self._skipped,     # superseded while debouncing
+                "dropped": self._dropped,     # superseded while running
+                "delay_ms": self.delay * 1000,
+            }
+
+        for name, values in (("latency", latencies), ("search", search_times)):
+            if values:
+                result[f"{name}_mean_ms"] = sum(values) / len(values) * 1000
+                result[f"{name}_p95_ms"] = values[min(len(values) - 1, int(len(values) * 0.95))] * 1000
+            else:
+                result[f"{name}_mean_ms"] = result[f"{name}_p95_ms"] = 0.0
+        return result
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._query is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+
+                # Debounce: wait until the user has paused for `delay` seconds
+                while True:
+                    remaining = self._submitted_at + self.delay - time.perf_counter()
+                    if remaining <= 0 or self._stopped:
+                        break
+                    self._cond.wait(remaining)
+                if self._stopped:
+                    return
+
+                text, generation, submitted_at = self._query, self._generation, self._submitted_at
+                self._query = None
+
+            start = time.perf_counter()
+            try:
+                result = self._search(text)
+            except Exception as e:
+                print(f"Search error: {e}")
+                continue
+            finished = time.perf_counter()
+
+            with self._cond:
+                if generation != self._generation:
+                    self._dropped += 1
+                    continue
+                self._completed += 1
+                self._delivered = (generation, text)
+                self._search_times.append(finished - start)
+                self._latencies.append(finished - submitted_at)
+
+            self._on_result(text, result)
@@ -0,0 +1,373 @@
+import hashlib
+import json
+import os
+import struct
+import time
+import zlib
+
+from src import utils
+from src import vault
+
+# Incremental, deduplicated point-in-time snapshots of the vault files.
+#
+#   data/snapshots/chunks/<digest[:2]>/<digest[2:]>   file pieces, stored once
+#   data/snapshots/manifests/<id>.json               one per snapshot
+#
+# Each file is split into content-defined chunks, stored by BLAKE2b digest.
+# A manifest names, per file, a few "list" blobs, which are chunks themselves,
+# each holding part of the file's (digest, size) chunk list. An edit adds only
+# the chunks around it and the list blob(s) that point at them.
+#
+# Chunk boundaries depend on content, not on offsets. Candidate cut points
+# come right after a newline byte. A candidate becomes a boundary when the
+# CRC-32 of the WINDOW bytes before it has its CUT_MASK bits clear. Every
+# vault.log line is one record, so boundaries fall between records and move
+# with them. Candidates are found with bytes.find, so chunking needs no
+# per-byte Python loop. vault.db is the exception: SQLite rewrites whole
+# pages in place and nothing ever shifts, so it is cut every PAGE_CHUNK
+# bytes, which lines up with its pages.
+#
+# A file whose size and mtime match the last snapshot is not read at all.
+# Otherwise the previous snapshot's chunks are checked in order, and chunking
+# resumes at the first one that differs. For the append-only vault.log only
+# the tail gets chunked again.
+#
+# Snapshots hold the vault files as they are on disk, master.kdf included, so
+# each one opens with the master password of its time. Changing the password
+# deletes them all (delete_all_snapshots), so the old password opens nothing.
+SNAPSHOT_FILES = ("vault.log", "vault.enc", "vault.db", "master.kdf", "master.hash")
+DEFAULT_KEEP = 50
+
+MIN_CHUNK = 2 * 1024
+MAX_CHUNK = 64 * 1024
+WINDOW = 16
+CUT_MASK = 0x7              # one candidate in eight becomes a boundary
+PAGE_CHUNK = 4096           # SQLite's default page size; larger pages are multiples of it
+LIST_CUT = 4                # a list blob ends after a digest whose first byte is below this (~1 in 64)
+
+_DIGEST_SIZE = 32
+_LIST_ENTRY = struct.Struct(f"<{_DIGEST_SIZE}sI")
+_READ_SIZE = 1 << 20
+
+# Directories with renames not yet synced; take_snapshot() syncs them before
+# writing the manifest, so a manifest never names a chunk a crash could lose
+_unsynced_dirs = set()
+
+
+def _digest(data) -> bytes:
+    return hashlib.blake2b(data, digest_size=_DIGEST_SIZE).digest()
+
+
+def _store_dir(*parts) -> str:
+    # Follows vault.use_data_dir(); the GUI shares this src.vault module
+    return os.path.join(vault.DATA_DIR, "snapshots", *parts)
+
+
+# -------------------
+# Chunk store
+# -------------------
+def _chunk_path(digest: bytes) -> str:
+    name = digest.hex()
+    return _store_dir("chunks", name[:2], name[2:])
+
+
+def _chunk_intact(path: str, digest: bytes, size: int) -> bool:
+    try:
+        if os.path.getsize(path) != size:
+            return False
+        with open(path, "rb") as f:
+            return _digest(f.read()) == digest
+    except OSError:
+        return False
+
+
+def _put_chunk(data) -> bytes:
+    digest = _digest(data)
+    path = _chunk_path(digest)
+    # A chunk torn by a crash is written again rather than shared by later snapshots
+    if _chunk_intact(path, digest, len(data)):
+        return digest
+
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+        _unsynced_dirs.update((os.path.dirname(directory), _store_dir()))
+    _write_durably(path, data)
+    _unsynced_dirs.add(directory)
+    return digest
+
+
+def _write_durably(path: str, data):
+    # Temp file + fsync + rename, following vault.FSYNC_POLICY like vault._atomic_write
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        if vault.FSYNC_POLICY != "never":
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _sync_dirs():
+    if vault.FSYNC_POLICY != "never":
+        for directory in sorted(_unsynced_dirs, key=len, reverse=True):
+            utils.fsync_dir(directory)
+    _unsynced_dirs.clear()
+
+
+def _get_chunk(digest: bytes) -> bytes:
+    with open(_chunk_path(digest), "rb") as f:
+        data = f.read()
+    if _digest(data) != digest:
+        raise ValueError(f"Snapshot chunk {digest.hex()} is corrupted")
+    return data
+
+
+def _write_lists(chunks) -> list:
+    # Lists are cut after content-defined entries too, so unchanged runs of a file share list blobs
+    lists, blob = [], bytearray()
+    for digest, size in chunks:
+        blob += _LIST_ENTRY.pack(digest, size)
+        if digest[0] < LIST_CUT:
+            lists.append(_put_chunk(bytes(blob)).hex())
+            blob = bytearray()
+    if blob:
+        lists.append(_put_chunk(bytes(blob)).hex())
+    return lists
+
+
+def _read_lists(lists):
+    for name in lists:
+        yield from _LIST_ENTRY.iter_unpack(_get_chunk(bytes.fromhex(name)))
+
+
+# -------------------
+# Chunking
+# -------------------
+def _cut_points(data, final: bool):
+    """Yields chunk ends in data; a trailing partial chunk is held back unless final."""
+    start, end = 0, len(data)
+    while start < end:
+        limit = min(start + MAX_CHUNK, end)
+        cut = None
+        position = data.find(b"\n", start + MIN_CHUNK - 1, limit)
+        while position != -1:
+            if not zlib.crc32(data[position + 1 - WINDOW:position + 1]) & CUT_MASK:
+                cut = position + 1
+                break
+            position = data.find(b"\n", position + 1, limit)
+
+        if cut is None:
+            if limit - start < MAX_CHUNK and not final:
+                return
+            cut = limit
+        yield cut
+        start = cut
+
+
+def _chunk_stream(f, chunks: list, fixed: bool):
+    """Chunks the rest of an open file, storing new chunks and appending (digest, size) to `chunks`."""
+    if fixed:
+        for block in iter(lambda: f.read(PAGE_CHUNK), b""):
+            chunks.append((_put_chunk(block), len(block)))
+        return
+
+    buffer = bytearray()
+    while True:
+        block = f.read(_READ_SIZE)
+        final = not block
+        buffer += block
+        start = 0
+        with memoryview(buffer) as view:
+            for cut in _cut_points(buffer, final):
+                chunks.append((_put_chunk(view[start:cut]), cut - start))
+                start = cut
+        del buffer[:start]
+        if final:
+            return
+
+
+def _snapshot_file(path: str, previous: dict) -> dict:
+    stat = os.stat(path)
+    if previous and previous["size"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns:
+        return previous
+
+    chunks = []
+    with open(path, "rb") as f:
+        if previous:
+            # Keep the leading chunks that are unchanged; the last one may have grown since
+            old = list(_read_lists(previous["lists"]))
+            for digest, size in old[:-1]:
+                data = f.read(size)
+                if len(data) != size or _digest(data) != digest:
+                    break
+                chunks.append((digest, size))
+            f.seek(sum(size for _, size in chunks))
+        _chunk_stream(f, chunks, fixed=os.path.basename(path) == "vault.db")
+
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "lists": _write_lists(chunks)}
+
+
+# -------------------
+# Snapshots
+# -------------------
+def _manifest_path(snapshot_id: str) -> str:
+    return _store_dir("manifests", snapshot_id + ".json")
+
+
+def _load_manifest(snapshot_id: str) -> dict:
+    with open(_manifest_path(snapshot_id), "r") as f:
+        return json.load(f)
+
+
+def _snapshot_ids() -> list:
+    # Ids start with the time taken, so they sort oldest first
+    directory = _store_dir("manifests")
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len(".json")] for name in os.listdir(directory) if name.endswith(".json"))
+
+
+def _backend_of(manifest: dict) -> str:
+    if "backend" in manifest:
+        return manifest["backend"]
+    # Taken before the backend was recorded: the store written last is the one in use
+    log, db = manifest["files"].get("vault.log"), manifest["files"].get("vault.db")
+    return "sqlite" if db and (not log or db["mtime_ns"] > log["mtime_ns"]) else "log"
+
+
+def _summary(manifest: dict) -> dict:
+    return {"id": manifest["id"], "created": manifest["created"], "label": manifest["label"],
+            "size": sum(record["size"] for record in manifest["files"].values())}
+
+
+def take_snapshot(label: str = "") -> dict:
+    """
+    Snapshots the vault files as they are on disk and returns its summary,
+    or None when nothing changed since the last snapshot. Call it with the
+    vault closed (vault.close()), so SQLite has nothing left in its
+    write-ahead log.
+    """
+    if not os.path.isdir(_store_dir("manifests")):
+        os.makedirs(_store_dir("manifests"))
+        _unsynced_dirs.update((vault.DATA_DIR, _store_dir()))
+    snapshot_ids = _snapshot_ids()
+    last = _load_manifest(snapshot_ids[-1]) if snapshot_ids else None
+    previous = last["files"] if last else {}
+
+    files = {}
+    for name in SNAPSHOT_FILES:
+        path = os.path.join(vault.DATA_DIR, name)
+        if os.path.exists(path):
+            files[name] = _snapshot_file(path, previous.get(name))
+    if last and files == previous and _backend_of(last) == vault.BACKEND:
+        return None
+
+    created = time.time()
+    snapshot_id = time.strftime("%Y%m%d-%H%M%S", time.localtime(created)) + f"-{int(created * 1e6) % 1_000_000:06d}"
+    # The backend in use says which of vault.log and vault.db holds the vault
+    manifest = {"id": snapshot_id, "created": created, "label": label, "backend": vault.BACKEND, "files": files}
+    _sync_dirs()
+    _write_durably(_manifest_path(snapshot_id), json.dumps(manifest).encode())
+    _unsynced_dirs.add(_store_dir("manifests"))
+    _sync_dirs()
+    return _summary(manifest)
+
+
+def list_snapshots() -> list:
+    """Summaries (id, created, label, size) of every snapshot, oldest first."""
+    return [_summary(_load_manifest(snapshot_id)) for snapshot_id in _snapshot_ids()]
+
+
+def restore_snapshot(snapshot_id: str, target_dir: str = None) -> str:
+    """
+    Rebuilds a snapshot's files in `target_dir` (default: the data
+    directory), verifying every chunk before anything is replaced. Vault
+    files the snapshot does not have are removed, so the vault is exactly as
+    it was. Close the vault first. Returns the storage backend the snapshot
+    was taken with; the vault must be opened with it (vault.set_backend).
+    """
+    target_dir = target_dir or vault.DATA_DIR
+    manifest = _load_manifest(snapshot_id)
+    files = manifest["files"]
+    os.makedirs(target_dir, exist_ok=True)
+
+    restored = []
+    try:
+        for name, record in files.items():
+            tmp_path = os.path.join(target_dir, name + ".restore")
+            restored.append(tmp_path)
+            with open(tmp_path, "wb") as f:
+                for digest, _ in _read_lists(record["lists"]):
+                    f.write(_get_chunk(digest))
+                f.flush()
+                os.fsync(f.fileno())
+    except Exception:
+        for tmp_path in restored:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+
+    for name in files:
+        os.replace(os.path.join(target_dir, name + ".restore"), os.path.join(target_dir, name))
+    for name in SNAPSHOT_FILES:
+        path = os.path.join(target_dir, name)
+        if name not in files and os.path.exists(path):
+            os.remove(path)
+    utils.fsync_dir(target_dir)
+    return _backend_of(manifest)
+
+
+def prune_snapshots(keep: int) -> int:
+    """Deletes all but the newest `keep` snapshots, and chunks no other snapshot uses; returns bytes freed."""
+    snapshot_ids = _snapshot_ids()
+    doomed = snapshot_ids[:max(0, len(snapshot_ids) - keep)]
+    if not doomed:
+        return 0
+    for snapshot_id in doomed:
+        os.remove(_manifest_path(snapshot_id))
+
+    # Mark everything the remaining snapshots use, then sweep the rest
+    live = set()
+    for snapshot_id in snapshot_ids[len(doomed):]:
+        for record in _load_manifest(snapshot_id)["files"].values():
+            for name in record["lists"]:
+                if name not in live:
+                    live.add(name)
+                    live.update(digest.hex() for digest, _ in _read_lists([name]))
+
+    freed = 0
+    chunks_dir = _store_dir("chunks")
+    for prefix in os.listdir(chunks_dir):
+        for entry in os.scandir(os.path.join(chunks_dir, prefix)):
+            if prefix + entry.name not in live:
+                freed += entry.stat().st_size
+                os.remove(entry.path)
+    return freed
+
+
+def delete_all_snapshots() -> list:
+    """Deletes every snapshot and chunk; returns the paths it could not delete."""
+    leftover = []
+    # Manifests first, so none outlives the chunks it names
+    for directory in (_store_dir("manifests"), _store_dir()):
+        for parent, _, names in os.walk(directory, topdown=False):
+            for name in names:
+                path = os.path.join(parent, name)
+                try:
+                    os.remove(path)
+                except OSError:
+                    leftover.append(path)
+            try:
+                os.rmdir(parent)
+            except OSError:
+                pass
+    return leftover
+
+
+def store_size() -> int:
+    """Bytes the snapshot store takes on disk (chunks and manifests)."""
+    total = 0
+    for directory, _, names in os.walk(_store_dir()):
+        total += sum(os.path.getsize(os.path.join(directory, name)) for name in names)
+    return total
@@ -0,0 +1,225 @@
+import hashlib
+import hmac
+import os
+import sqlite3
+from contextlib import contextmanager
+from cryptography.fernet import Fernet, InvalidToken
+from src import codec
+from src.utils import fsync_dir, parallel_map
+
+# SQLite storage backend for the vault. Each row holds one account: the
+# account key and username are stored only as keyed hashes (indexed for
+# lookups), the display metadata and the secrets as separate Fernet tokens.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DB_FILE = os.path.join(DATA_DIR, "vault.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    account_id TEXT PRIMARY KEY,  -- keyed hash of the account name
+    user_hash  TEXT NOT NULL,     -- keyed hash of the username
+    meta       BLOB NOT NULL,     -- Fernet(name, username, strength, folder)
+    secret     BLOB NOT NULL      -- Fernet(password, notes)
+);
+CREATE INDEX IF NOT EXISTS entries_user_hash ON entries (user_hash);
+"""
+
+# Rows fetched (and decrypted in parallel) per step when iterating
+FETCH_BATCH = 8192
+
+# PRAGMA synchronous level; vault.set_fsync_policy keeps this in step with FSYNC_POLICY
+SYNCHRONOUS = "FULL"
+
+_conn = None
+_hash_key = None
+_transaction_depth = 0
+
+
+def _connect(fernet: Fernet) -> sqlite3.Connection:
+    """Opens the database once per session and unwraps the lookup-hash key."""
+    global _conn, _hash_key
+    if _conn is not None:
+        return _conn
+
+    if not os.path.exists(DATA_DIR):
+        os.makedirs(DATA_DIR)
+
+    # Writes may come from the save queue's worker thread; vault serializes them
+    conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={SYNCHRONOUS}")
+    conn.executescript(SCHEMA)
+
+    row = conn.execute("SELECT value FROM meta WHERE key = 'hash_key'").fetchone()
+    if row is None:
+        # Random per-vault key for the indexed hashes, stored wrapped by the vault key
+        _hash_key = os.urandom(32)
+        conn.execute("INSERT INTO meta (key, value) VALUES ('hash_key', ?)", (fernet.encrypt(_hash_key),))
+        conn.commit()
+    else:
+        _hash_key = fernet.decrypt(row[0])
+
+    _conn = conn
+    return _conn
+
+
+def set_synchronous(level: str):
+    global SYNCHRONOUS
+    SYNCHRONOUS = level
+    if _conn is not None:
+        _conn.execute(f"PRAGMA synchronous={level}")
+
+
+def close():
+    """Closes the session connection (call on lock or when the key changes)."""
+    global _conn, _hash_key
+    if _conn is not None:
+        _conn.close()
+    _conn = None
+    _hash_key = None
+
+
+def _keyed_hash(value: str) -> str:
+    return hmac.new(_hash_key, value.encode(), hashlib.sha256).hexdigest()
+
+
+def _commit(conn: sqlite3.Connection):
+    if _transaction_depth == 0:
+        conn.commit()
+
+
+def _row_values(name: str, entry: dict, fernet: Fernet) -> tuple:
+    meta = fernet.encrypt(codec.encode({
+        "name": name,
+        "username": entry["username"],
+        "strength": entry["strength"],
+        "folder": entry["folder"],
+    }))
+    return _keyed_hash(name), _keyed_hash(entry["username"]), meta, entry["secret"]
+
+
+def _entry_from_row(meta: bytes, secret: bytes, fernet: Fernet):
+    record = codec.decode(fernet.decrypt(meta))
+    return record["name"], {"username": record["username"], "strength": record["strength"],
+                            "folder": record.get("folder", ""), "secret": secret}
+
+
+@contextmanager
+def transaction(fernet: Fernet):
+    """Groups puts and deletes into a single SQLite transaction."""
+    global _transaction_depth
+    conn = _connect(fernet)
+    _transaction_depth += 1
+    try:
+        yield
+    except Exception:
+        _transaction_depth -= 1
+        if _transaction_depth == 0:
+            conn.rollback()
+        raise
+    _transaction_depth -= 1
+    _commit(conn)
+
+
+def put(name: str, entry: dict, fernet: Fernet):
+    conn = _connect(fernet)
+    conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", _row_values(name, entry, fernet))
+    _commit(conn)
+
+
+def delete(name: str, fernet: Fernet):
+    conn = _connect(fernet)
+    conn.execute("DELETE FROM entries WHERE account_id = ?", (_keyed_hash(name),))
+    _commit(conn)
+
+
+def iterate(fernet: Fernet):
+    """Yields (name, entry) for every row without decrypting secrets."""
+    conn = _connect(fernet)
+    cursor = conn.execute("SELECT meta, secret FROM entries")
+    while True:
+        rows = cursor.fetchmany(FETCH_BATCH)
+        if not rows:
+            return
+        yield from parallel_map(lambda row: _entry_from_row(row[0], row[1], fernet), rows)
+
+
+def replace_all(data: dict, fernet: Fernet):
+    """Replaces every row with the contents of `data` in one transaction."""
+    conn = _connect(fernet)
+    with transaction(fernet):
+        conn.execute("DELETE FROM entries")
+        conn.executemany(
+            "INSERT INTO entries VALUES (?, ?, ?, ?)",
+            parallel_map(lambda item: _row_values(item[0], item[1], fernet), data.items())
+        )
+
+
+def rekey(old_fernet: Fernet, new_fernet: Fernet, progress=None, batch_size: int = FETCH_BATCH):
+    """
+    Copies every row into a new database re-encrypted under `new_fernet`,
+    one batch per transaction, then swaps the files. The lookup hashes keep
+    their key, so the indexed columns are copied unchanged.
+    """
+    close()  # checkpoints the WAL so the old file is complete
+    src = sqlite3.connect(DB_FILE)
+    src.executescript(SCHEMA)
+    row = src.execute("SELECT value FROM meta WHERE key = 'hash_key'").fetchone()
+    if row is None:
+        src.close()
+        return
+    try:
+        new_fernet.decrypt(row[0])
+        src.close()
+        return  # already re-keyed
+    except InvalidToken:
+        hash_key = old_fernet.decrypt(row[0])
+
+    tmp_file = DB_FILE + ".rekey"
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+    dst = sqlite3.connect(tmp_file)
+    dst.executescript(SCHEMA)
+    dst.execute("INSERT INTO meta (key, value) VALUES ('hash_key', ?)", (new_fernet.encrypt(hash_key),))
+
+    def convert(row):
+        account_id, user_hash, meta, secret = row[1:]
+        return (account_id, user_hash,
+                new_fernet.encrypt(old_fernet.decrypt(meta)),
+                new_fernet.encrypt(old_fernet.decrypt(secret)))
+
+    total = src.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    done = last_rowid = 0
+    while True:
+        rows = src.execute(
+            "SELECT rowid, account_id, user_hash, meta, secret FROM entries WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            (last_rowid, batch_size)
+        ).fetchall()
+        if not rows:
+            break
+        dst.executemany("INSERT INTO entries VALUES (?, ?, ?, ?)", parallel_map(convert, rows))
+        dst.commit()
+        last_rowid = rows[-1][0]
+        done += len(rows)
+        if progress:
+            progress(done, total)
+
+    src.close()
+    dst.close()
+
+    # A leftover WAL of the old database must never be applied to the new one
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(DB_FILE + suffix):
+            os.remove(DB_FILE + suffix)
+    os.replace(tmp_file, DB_FILE)
+    if SYNCHRONOUS != "OFF":  # i.e. vault.FSYNC_POLICY is not "never"
+        fsync_dir(DATA_DIR)
+
+
+def vacuum(fernet: Fernet):
+    conn = _connect(fernet)
+    conn.execute("VACUUM")
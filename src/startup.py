@@ -0,0 +1,41 @@
+import sys
+import time
+
+# Startup timing. main.py imports this first, so START is as close to process
+# start as Python code gets; the GUI marks each phase up to the login prompt.
+START = time.perf_counter()
+
+# Set by `python main.py --startup-report`: print the report and exit once the
+# login prompt is up (used by benchmarks/bench_startup.py)
+REPORT_AND_EXIT = False
+
+# Libraries that belong on the analytics page only; none should be loaded
+# before the login prompt appears
+HEAVY_MODULES = ("pandas", "seaborn", "matplotlib", "numpy")
+
+_marks = []
+
+
+def mark(phase: str):
+    _marks.append((phase, time.perf_counter() - START))
+
+
+def heavy_modules_loaded() -> list:
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def report():
+    print("Startup report:")
+    previous = 0.0
+    for phase, elapsed in _marks:
+        print(f"  {phase:<24} {elapsed * 1000:8.1f} ms  (+{(elapsed - previous) * 1000:.1f} ms)")
+        previous = elapsed
+    print(f"  heavy modules loaded:    {', '.join(heavy_modules_loaded()) or 'none'}")
+
+
+def login_prompt_shown(root):
+    """Called from the Tk main loop once the login prompt has been drawn."""
+    mark("login prompt shown")
+    if REPORT_AND_EXIT:
+        report()
+        root.destroy()
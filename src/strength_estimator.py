@@ -0,0 +1,561 @@
+import datetime
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+from collections import OrderedDict
+
+# Guess-based password strength estimation in the style of zxcvbn.
+#
+# A password is broken into matches (dictionary words, including l33t and
+# reversed spellings, keyboard walks, repeats, sequences, dates and years),
+# each with an estimated number of guesses. The cheapest way to cover the
+# whole password with matches and brute-forced gaps gives the guess count.
+#
+# The dictionaries in src/wordlists are compiled once into a trie file in
+# data/ and memory-mapped, so they are not parsed on every start.
+ESTIMATOR_VERSION = 1
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WORDLIST_DIR = os.path.join(BASE_DIR, "wordlists")
+WORDLISTS = ("passwords.txt", "english.txt", "names.txt")   # each ranked, most common first
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DICTIONARY_FILE = os.path.join(DATA_DIR, "strength_dictionary.bin")
+
+MIN_WORD_LENGTH = 3
+SEGMENT_LENGTH = 24             # longer passwords are scored in independent segments
+CACHE_SIZE = 4096
+
+BRUTEFORCE_CARDINALITY = 10
+MIN_GUESSES_BEFORE_GROWING_SEQUENCE = 10000
+MIN_SUBMATCH_GUESSES_SINGLE_CHAR = 10
+MIN_SUBMATCH_GUESSES_MULTI_CHAR = 50
+MIN_YEAR_SPACE = 20
+REFERENCE_YEAR = datetime.date.today().year
+
+# Guesses below each threshold give scores 0..3; anything above scores 4
+SCORE_THRESHOLDS = (1e3 + 5, 1e6 + 5, 1e8 + 5, 1e10 + 5)
+STRENGTH_BY_SCORE = ("Weak", "Weak", "Medium", "Medium", "Strong")
+
+
+# -------------------
+# Dictionary trie (compiled file, memory-mapped)
+# -------------------
+# Node layout: child count (u8) | rank (u32, 0 = no word ends here) |
+#              child characters (count bytes) | child offsets (count x u32)
+_MAGIC = b"CVTRIE"
+_TRIE_VERSION = 1
+_HEADER = struct.Struct("<6sBx")
+_NODE = struct.Struct("<BI")
+_OFFSET = struct.Struct("<I")
+_ROOT = _HEADER.size
+
+
+def compile_dictionary(wordlists, out_path):
+    """Compiles ranked word lists (one word per line) into a trie file."""
+    root = {}
+    for path in wordlists:
+        with open(path, "r", encoding="utf-8") as f:
+            rank = 0
+            for line in f:
+                word = line.strip().lower()
+                if len(word) < MIN_WORD_LENGTH or not word.isascii() or word.startswith("#"):
+                    continue
+                rank += 1
+                node = root
+                for char in word:
+                    node = node.setdefault(char, {})
+                # A word in several lists keeps its best rank
+                node[""] = min(node.get("", rank), rank)
+
+    # Lay the nodes out breadth first, then write them with child offsets
+    order, offsets, position = [root], {}, _ROOT
+    for node in order:
+        offsets[id(node)] = position
+        children = sorted(key for key in node if key)
+        position += _NODE.size + len(children) * (1 + _OFFSET.size)
+        order.extend(node[key] for key in children)
+
+    out = bytearray(_HEADER.pack(_MAGIC, _TRIE_VERSION))
+    for node in order:
+        children = sorted(key for key in node if key)
+        out += _NODE.pack(len(children), node.get("", 0))
+        out += "".join(children).encode()
+        for key in children:
+            out += _OFFSET.pack(offsets[id(node[key])])
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(out)
+    os.replace(tmp_path, out_path)
+
+
+_trie = None
+_trie_lock = threading.Lock()
+
+
+def _dictionary():
+    """The memory-mapped trie, compiled from the word lists first if it is missing or stale."""
+    global _trie
+    if _trie is not None:
+        return _trie
+
+    with _trie_lock:
+        if _trie is None:
+            sources = [os.path.join(WORDLIST_DIR, name) for name in WORDLISTS]
+            newest = max(os.path.getmtime(path) for path in sources)
+            if not os.path.exists(DICTIONARY_FILE) or os.path.getmtime(DICTIONARY_FILE) < newest:
+                os.makedirs(DATA_DIR, exist_ok=True)
+                compile_dictionary(sources, DICTIONARY_FILE)
+
+            with open(DICTIONARY_FILE, "rb") as f:
+                trie = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if _HEADER.unpack_from(trie, 0) != (_MAGIC, _TRIE_VERSION):
+                trie.close()
+                os.remove(DICTIONARY_FILE)
+                raise ValueError("Strength dictionary was stale; it will be rebuilt on next use")
+            _trie = trie
+    return _trie
+
+
+_L33T = {
+    "4": "a", "@": "a", "8": "b", "(": "c", "{": "c", "[": "c", "<": "c", "3": "e", "6": "g",
+    "9": "g", "1": "il", "!": "i", "|": "il", "0": "o", "$": "s", "5": "s", "+": "t", "7": "tl",
+    "%": "x", "2": "z",
+}
+# For each character: the trie letters it can stand for, as (byte, substituted)
+_CANDIDATES = {}
+for _code in range(128):
+    _char = chr(_code)
+    _options = [(_char.lower(), False)] if _char.isalpha() else []
+    _options += [(letter, True) for letter in _L33T.get(_char, "")]
+    if _options:
+        _CANDIDATES[_char] = _options
+
+
+# Decoded trie nodes, filled in as they are visited: offset -> (rank, {letter: child})
+_nodes = {}
+
+
+def _node(trie, offset):
+    node = _nodes.get(offset)
+    if node is None:
+        count, rank = _NODE.unpack_from(trie, offset)
+        chars = offset + _NODE.size
+        letters = trie[chars:chars + count].decode()
+        children = struct.unpack_from(f"<{count}I", trie, chars + count)
+        node = _nodes[offset] = (rank, dict(zip(letters, children)))
+    return node
+
+
+def _dictionary_matches(password: str, reversed_: bool = False):
+    trie = _dictionary()
+    text = password[::-1] if reversed_ else password
+    n = len(text)
+    matches = []
+
+    for i in range(n):
+        stack = [(_ROOT, i, ())]
+        while stack:
+            offset, j, subs = stack.pop()
+            rank, children = _node(trie, offset)
+            if rank:
+                matches.append(_dictionary_match(text, i, j - 1, rank, subs, reversed_, n))
+            if j == n or not children:
+                continue
+
+            char = text[j]
+            for letter, substituted in _CANDIDATES.get(char, ()):
+                child = children.get(letter)
+                if child is not None:
+                    stack.append((child, j + 1, subs + ((char, letter),) if substituted else subs))
+    return matches
+
+
+def _dictionary_match(text, i, j, rank, subs, reversed_, n):
+    token = text[i:j + 1]
+    guesses = rank * _uppercase_variations(token) * _l33t_variations(token, subs) * (2 if reversed_ else 1)
+    if reversed_:
+        i, j, token = n - 1 - j, n - 1 - i, token[::-1]
+    return i, j, guesses, "dictionary", token
+
+
+def _binomial_sum(a: int, b: int) -> int:
+    return sum(math.comb(a + b, k) for k in range(1, min(a, b) + 1))
+
+
+def _uppercase_variations(token: str) -> int:
+    upper = sum(1 for char in token if char.isupper())
+    lower = sum(1 for char in token if char.islower())
+    if not upper:
+        return 1
+    # First-letter, last-letter and all caps are the common cases
+    if not lower or (upper == 1 and (token[0].isupper() or token[-1].isupper())):
+        return 2
+    return _binomial_sum(upper, lower)
+
+
+def _l33t_variations(token: str, subs) -> int:
+    if not subs:
+        return 1
+    variations = 1
+    lowered = token.lower()
+    for subbed, letter in set(subs):
+        substituted = lowered.count(subbed)
+        plain = lowered.count(letter)
+        variations *= 2 if not plain else _binomial_sum(substituted, plain)
+    return variations
+
+
+# -------------------
+# Keyboard walks
+# -------------------
+_KEYBOARD_ROWS = (
+    ("`1234567890-=", "~!@#$%^&*()_+"),
+    ("qwertyuiop[]\\", "QWERTYUIOP{}|"),
+    ("asdfghjkl;'", 'ASDFGHJKL:"'),
+    ("zxcvbnm,./", "ZXCVBNM<>?"),
+)
+_KEY_BASE = {}        # character -> (unshifted key, shifted?)
+_KEY_NEIGHBOURS = {}  # unshifted key -> neighbour per direction (or None)
+for _row, (_plain, _shifted) in enumerate(_KEYBOARD_ROWS):
+    for _col, _char in enumerate(_plain):
+        _KEY_BASE[_char] = (_char, False)
+        _KEY_BASE[_shifted[_col]] = (_char, True)
+
+        def _key(row, col):
+            if 0 <= row < len(_KEYBOARD_ROWS) and 0 <= col < len(_KEYBOARD_ROWS[row][0]):
+                return _KEYBOARD_ROWS[row][0][col]
+            return None
+
+        # Rows are staggered by half a key: left, right, up-left, up-right, down-left, down-right
+        _KEY_NEIGHBOURS[_char] = (
+            _key(_row, _col - 1), _key(_row, _col + 1), _key(_row - 1, _col), _key(_row - 1, _col + 1),
+            _key(_row + 1, _col - 1), _key(_row + 1, _col),
+        )
+_KEYBOARD_STARTS = len(_KEY_NEIGHBOURS)
+_KEYBOARD_DEGREE = sum(sum(1 for key in keys if key) for keys in _KEY_NEIGHBOURS.values()) / _KEYBOARD_STARTS
+
+
+def _spatial_matches(password: str):
+    matches = []
+    n = len(password)
+    i = 0
+    while i < n - 2:
+        j, turns, last_direction = i, 0, None
+        shifted = 1 if _KEY_BASE.get(password[i], (None, False))[1] else 0
+        while j + 1 < n:
+            current, following = _KEY_BASE.get(password[j]), _KEY_BASE.get(password[j + 1])
+            if current is None or following is None:
+                break
+            neighbours = _KEY_NEIGHBOURS[current[0]]
+            if following[0] not in neighbours:
+                break
+            direction = neighbours.index(following[0])
+            if direction != last_direction:
+                turns += 1
+                last_direction = direction
+            shifted += following[1]
+            j += 1
+
+        if j - i >= 2:
+            matches.append((i, j, _spatial_guesses(j - i + 1, turns, shifted), "spatial", password[i:j + 1]))
+            i = j
+        else:
+            i += 1
+    return matches
+
+
+def _spatial_guesses(length: int, turns: int, shifted: int) -> float:
+    guesses = 0.0
+    for i in range(2, length + 1):
+        for j in range(1, min(turns, i - 1) + 1):
+            guesses += math.comb(i - 1, j - 1) * _KEYBOARD_STARTS * _KEYBOARD_DEGREE ** j
+    if shifted:
+        unshifted = length - shifted
+        guesses *= 2 if not unshifted else _binomial_sum(shifted, unshifted)
+    return guesses
+
+
+# -------------------
+# Repeats, sequences, dates
+# -------------------
+_GREEDY_REPEAT = re.compile(r"(.+)\1+", re.S)
+_LAZY_REPEAT = re.compile(r"(.+?)\1+", re.S)
+_LAZY_ANCHORED = re.compile(r"^(.+?)\1+$", re.S)
+
+
+def _repeat_matches(password: str):
+    matches = []
+    i = 0
+    while i < len(password):
+        greedy = _GREEDY_REPEAT.search(password, i)
+        if greedy is None:
+            break
+        lazy = _LAZY_REPEAT.search(password, i)
+        if len(greedy.group(0)) > len(lazy.group(0)):
+            match, base = greedy, _LAZY_ANCHORED.match(greedy.group(0)).group(1)
+        else:
+            match, base = lazy, lazy.group(1)
+
+        repeats = len(match.group(0)) // len(base)
+        guesses = _estimate(base)[0] * repeats
+        matches.append((match.start(), match.end() - 1, guesses, "repeat", match.group(0)))
+        i = match.end()
+    return matches
+
+
+def _sequence_matches(password: str):
+    matches = []
+    n = len(password)
+    i = 0
+    while i < n - 2:
+        delta = ord(password[i + 1]) - ord(password[i])
+        j = i + 1
+        while j + 1 < n and ord(password[j + 1]) - ord(password[j]) == delta:
+            j += 1
+        if j - i >= 2 and 0 < abs(delta) <= 5:
+            token = password[i:j + 1]
+            if token.isdigit() or token.islower() or token.isupper():
+                if token[0] in "aAzZ019":
+                    base = 4
+                elif token[0].isdigit():
+                    base = 10
+                else:
+                    base = 26
+                guesses = base * len(token) * (1 if delta > 0 else 2)
+                matches.append((i, j, guesses, "sequence", token))
+        i = j
+    return matches
+
+
+_DATE_WITH_SEPARATOR = re.compile(r"(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})")
+_RECENT_YEAR = re.compile(r"19\d\d|20\d\d")
+_DATE_SPLITS = {
+    4: ((1, 2), (2, 3)),
+    5: ((1, 3), (2, 3)),
+    6: ((1, 2), (2, 4), (4, 5)),
+    7: ((1, 3), (2, 3), (4, 5), (4, 6)),
+    8: ((2, 4), (4, 6)),
+}
+
+
+def _year_guesses(year: int) -> float:
+    return max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE)
+
+
+def _date_year(parts):
+    """The year of a plausible (day, month, year) reading of three numbers, or None."""
+    for year, rest in ((parts[2], parts[:2]), (parts[0], parts[1:])):
+        if year < 100:
+            year += 1900 if year > 50 else 2000
+        elif not 1000 <= year <= 2050:
+            continue
+        first, second = rest
+        if (1 <= first <= 31 and 1 <= second <= 12) or (1 <= first <= 12 and 1 <= second <= 31):
+            return year
+    return None
+
+
+def _date_matches(password: str):
+    dates = []
+    n = len(password)
+
+    for i in range(n):
+        for length in range(4, 9):
+            token = password[i:i + length]
+            if len(token) < length or not token.isdigit():
+                break
+            years = [_date_year((int(token[:k]), int(token[k:l]), int(token[l:])))
+                     for k, l in _DATE_SPLITS[length]]
+            years = [year for year in years if year is not None]
+            if years:
+                year = min(years, key=lambda y: abs(y - REFERENCE_YEAR))
+                dates.append((i, i + length - 1, _year_guesses(year) * 365, "date", token))
+
+    for match in _DATE_WITH_SEPARATOR.finditer(password):
+        year = _date_year((int(match.group(1)), int(match.group(3)), int(match.group(4))))
+        if year is not None:
+            dates.append((match.start(), match.end() - 1, _year_guesses(year) * 365 * 4, "date", match.group(0)))
+
+    # A date inside a longer date is only ever a worse reading of the same digits
+    matches = [date for date in dates
+               if not any(other is not date and other[0] <= date[0] and date[1] <= other[1] for other in dates)]
+    for match in _RECENT_YEAR.finditer(password):
+        matches.append((match.start(), match.end() - 1, _year_guesses(int(match.group(0))), "year", match.group(0)))
+    return matches
+
+
+# -------------------
+# Finding the cheapest decomposition
+# -------------------
+def _bruteforce_guesses(length: int) -> float:
+    minimum = MIN_SUBMATCH_GUESSES_SINGLE_CHAR if length == 1 else MIN_SUBMATCH_GUESSES_MULTI_CHAR
+    return max(float(BRUTEFORCE_CARDINALITY) ** length, minimum + 1)
+
+
+_BRUTEFORCE = [_bruteforce_guesses(length) for length in range(SEGMENT_LENGTH + 1)]
+
+
+def _estimate(password: str):
+    """Returns (guesses, [(pattern, start, end), ...]) for the cheapest way to guess `password`."""
+    n = len(password)
+    if not n:
+        return 1.0, []
+
+    matches = (
+        _dictionary_matches(password) + _dictionary_matches(password, reversed_=True)
+        + _spatial_matches(password) + _sequence_matches(password) + _date_matches(password)
+    )
+    if n > 1:
+        matches += _repeat_matches(password)
+
+    by_end = [[] for _ in range(n)]
+    for i, j, guesses, pattern, token in matches:
+        if j - i + 1 < n:
+            # Parts of a longer password are never cheaper than this
+            minimum = MIN_SUBMATCH_GUESSES_SINGLE_CHAR if i == j else MIN_SUBMATCH_GUESSES_MULTI_CHAR
+            guesses = max(guesses, minimum)
+        by_end[j].append((i, guesses, pattern, token))
+
+    # best[k][l]: cheapest cover of password[:k + 1] with l matches, as
+    # (total guesses, product of match guesses, pattern, token, start)
+    best = [dict() for _ in range(n)]
+    factorials = [math.factorial(length) for length in range(n + 2)]
+    penalties = [MIN_GUESSES_BEFORE_GROWING_SEQUENCE ** (length - 1) for length in range(n + 2)]
+
+    anchors = []    # positions where a cover ends with a match, so a gap may follow
+
+    def consider(k, length, product, pattern, token, start):
+        total = factorials[length] * product + penalties[length]
+        candidates = best[k]
+        for other_length, other in candidates.items():
+            if other_length <= length and other[0] <= total:
+                return
+        candidates[length] = (total, product, pattern, token, start)
+
+    bruteforce = _BRUTEFORCE if n < len(_BRUTEFORCE) else [_bruteforce_guesses(length) for length in range(n + 1)]
+    for k in range(n):
+        for i, guesses, pattern, token in by_end[k]:
+            if i == 0:
+                consider(k, 1, guesses, pattern, token, i)
+            else:
+                for length, previous in list(best[i - 1].items()):
+                    consider(k, length + 1, previous[1] * guesses, pattern, token, i)
+
+        # A brute-forced gap ending here, after anything but another gap
+        consider(k, 1, bruteforce[k + 1], "bruteforce", password[:k + 1], 0)
+        for anchor in anchors:
+            guesses = bruteforce[k - anchor]
+            for length, previous in list(best[anchor].items()):
+                if previous[2] != "bruteforce":
+                    consider(k, length + 1, previous[1] * guesses, "bruteforce", password[anchor + 1:k + 1], anchor + 1)
+
+        if any(entry[2] != "bruteforce" for entry in best[k].values()):
+            anchors.append(k)
+
+    length, (total, *_) = min(best[n - 1].items(), key=lambda item: item[1][0])
+
+    sequence, k = [], n - 1
+    while k >= 0:
+        _, _, pattern, _, start = best[k][length]
+        sequence.append((pattern, start, k))
+        k, length = start - 1, length - 1
+    return total, sequence[::-1]
+
+
+# -------------------
+# Public API
+# -------------------
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_CACHE_KEY = os.urandom(16)   # cache keys are keyed hashes, never the passwords themselves
+
+
+def _memoized(kind: bytes, text: str, compute):
+    key = hashlib.blake2b(text.encode(), key=_CACHE_KEY, person=kind, digest_size=16).digest()
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+            return result
+
+    result = compute(text)
+    with _cache_lock:
+        _cache[key] = result
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+def _cached_segment(segment: str):
+    return _memoized(b"segment", segment, _estimate)
+
+
+def _estimate_password(password: str, estimate_segment=_cached_segment) -> dict:
+    # The search is quadratic in the length, so long passwords are scored in
+    # segments; while typing, only the last segment is new
+    guesses, sequence = 1.0, []
+    for offset in range(0, len(password), SEGMENT_LENGTH):
+        segment = password[offset:offset + SEGMENT_LENGTH]
+        segment_guesses, segment_sequence = estimate_segment(segment)
+        guesses *= segment_guesses
+        sequence += [(pattern, start + offset, end + offset) for pattern, start, end in segment_sequence]
+
+    # ...which would miss a short base repeated across segments
+    whole = _LAZY_ANCHORED.match(password) if len(password) > SEGMENT_LENGTH else None
+    if whole and len(whole.group(1)) <= SEGMENT_LENGTH:
+        base = whole.group(1)
+        repeated = estimate_segment(base)[0] * (len(password) // len(base))
+        if repeated < guesses:
+            guesses, sequence = repeated, [("repeat", 0, len(password) - 1)]
+
+    score = sum(1 for threshold in SCORE_THRESHOLDS if guesses >= threshold)
+    return {
+        "guesses": guesses,
+        "guesses_log10": math.log10(guesses),
+        "entropy_bits": math.log2(guesses),
+        "score": score,
+        "strength": STRENGTH_BY_SCORE[score],
+        "sequence": sequence,
+    }
+
+
+def estimate(password: str) -> dict:
+    """
+    Estimates how many guesses `password` would take. Returns guesses,
+    guesses_log10, entropy_bits, score (0-4), strength (Weak/Medium/Strong)
+    and the matched sequence as (pattern, start, end) spans. Results are
+    memoized per password hash and hold no part of the password.
+    """
+    return _memoized(b"password", password, _estimate_password)
+
+
+def estimate_many(passwords) -> list:
+    """
+    Estimates many passwords at once; returns the same results as estimate()
+    on each, in order. Each distinct password and segment is searched once
+    per call, and the shared cache is bypassed: a whole vault would only
+    evict what the UI is using.
+    """
+    segments, results = {}, {}
+
+    def estimate_segment(segment):
+        result = segments.get(segment)
+        if result is None:
+            result = segments[segment] = _estimate(segment)
+        return result
+
+    for password in passwords:
+        if password not in results:
+            results[password] = _estimate_password(password, estimate_segment)
+    return [results[password] for password in passwords]
+
+
+def clear_cache():
+    """Forgets memoized results (e.g. on lock)."""
+    with _cache_lock:
+        _cache.clear()
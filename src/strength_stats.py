@@ -0,0 +1,53 @@
+STRENGTH_CLASSES = ("Weak", "Medium", "Strong")
+
+
+class StrengthStats:
+    """
+    Weak / Medium / Strong counters kept in step with the vault.
+
+    Each account's strength class is remembered, so an add, edit or delete
+    adjusts the counters in O(1) and readers (the home labels, the analytics
+    chart) never walk the vault. Only a scoring policy change re-scores
+    everything, through rescore().
+    """
+
+    def __init__(self):
+        self.counts = dict.fromkeys(STRENGTH_CLASSES, 0)
+        self._classes = {}      # account name -> strength class
+
+    def __len__(self):
+        return len(self._classes)
+
+    def rebuild(self, items):
+        """Counts (name, strength) pairs from scratch."""
+        self.counts = dict.fromkeys(STRENGTH_CLASSES, 0)
+        self._classes = {}
+        for name, strength in items:
+            self.set(name, strength)
+
+    def set(self, name: str, strength: str):
+        """Records a new or edited account."""
+        old = self._classes.get(name)
+        if old == strength:
+            return
+        if old is not None:
+            self.counts[old] -= 1
+        self._classes[name] = strength
+        self.counts[strength] += 1
+
+    def remove(self, name: str):
+        old = self._classes.pop(name, None)
+        if old is not None:
+            self.counts[old] -= 1
+
+    def rescore(self, items) -> list:
+        """
+        Re-records (name, strength) pairs after a scoring policy change and
+        returns the names whose class changed.
+        """
+        changed = []
+        for name, strength in items:
+            if self._classes.get(name) != strength:
+                changed.append(name)
+                self.set(name, strength)
+        return changed
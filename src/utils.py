@@ -0,0 +1,44 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Worker threads for bulk encrypt/decrypt. The cryptography primitives behind
+# Fernet release the GIL, so per-record work spreads across cores.
+WORKERS = os.cpu_count() or 1
+
+# Below this many items a thread pool costs more than it saves
+PARALLEL_MIN_ITEMS = 256
+
+
+def set_workers(count: int):
+    """Sets the bulk crypto worker count; 0 means one per CPU core."""
+    global WORKERS
+    WORKERS = count if count > 0 else (os.cpu_count() or 1)
+
+
+def fsync_dir(path: str):
+    """Makes a rename durable by syncing the directory entry (no-op where unsupported)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def parallel_map(func, items) -> list:
+    """Returns [func(item) for item in items], computed in chunks on WORKERS threads."""
+    items = list(items)
+    if WORKERS <= 1 or len(items) < PARALLEL_MIN_ITEMS:
+        return [func(item) for item in items]
+
+    # A few chunks per worker keeps them busy without per-item scheduling cost
+    size = -(-len(items) // (WORKERS * 4))
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = pool.map(lambda chunk: [func(item) for item in chunk], chunks)
+        return [result for chunk in results for result in chunk]
@@ -1,37 +1,541 @@
-import json
+import itertools
 import os
-from cryptography.fernet import Fernet
+import shutil
+import threading
+from cryptography.fernet import Fernet, InvalidToken
+from src.analytics import password_strength
+from src import codec
+from src import sqlite_store
+from src import utils
+from src.utils import parallel_map
 
 # 1. Get the correct directory (the project root)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
-VAULT_FILE = os.path.join(DATA_DIR, "vault.enc")
+VAULT_FILE = os.path.join(DATA_DIR, "vault.enc")  # legacy single-token vault
+LOG_FILE = os.path.join(DATA_DIR, "vault.log")
 
+# The log is compacted once it holds this many records AND at least
+# COMPACT_RATIO times as many records as there are live entries.
+COMPACT_MIN_RECORDS = 1000
+COMPACT_RATIO = 2
 
-def save_vault(data: dict, fernet: Fernet):
-    """Encrypts and saves the vault data to disk."""
-    # Ensure the data directory exists
+# Each log line is "<index token>[ <secret token>]". The index token holds only
+# the metadata the home screen needs; the secret token holds password and notes
+# and is kept encrypted in memory until get_secret() is called. Records
+# written before folders existed have no folder, i.e. folder "".
+INDEX_FIELDS = ("username", "strength", "folder")
+
+# Storage backend: "log" (append-only vault.log) or "sqlite" (vault.db)
+BACKENDS = ("log", "sqlite")
+BACKEND = "log"
+
+# When to fsync: "always" (every append and rewrite), "rewrite" (only full
+# rewrites/compactions) or "never". See benchmarks/bench_durability.py.
+FSYNC_POLICIES = ("always", "rewrite", "never")
+FSYNC_POLICY = "always"
+
+# How many previous versions of the log a full rewrite keeps (vault.log.1 is newest)
+GENERATIONS = 3
+
+# The generation the last load_vault() rolled back to because the log was
+# damaged (the damaged log is kept as vault.log.corrupt), or None
+RECOVERED_GENERATION = None
+
+# Lines read (and decrypted in parallel) per step when replaying the log
+READ_BATCH = 8192
+
+# Number of records currently in LOG_FILE (set by load/compact, bumped on append)
+_log_records = 0
+# Serializes writers (the GUI thread and the save queue worker)
+_write_lock = threading.RLock()
+
+
+def _ensure_data_dir():
     if not os.path.exists(DATA_DIR):
         os.makedirs(DATA_DIR)
 
-    encrypted = fernet.encrypt(json.dumps(data).encode())
 
-    with open(VAULT_FILE, "wb") as f:
-        f.write(encrypted)
+def use_data_dir(path: str):
+    """Points the vault (and the SQLite backend) at another data directory."""
+    global DATA_DIR, VAULT_FILE, LOG_FILE
+    DATA_DIR = path
+    VAULT_FILE = os.path.join(path, "vault.enc")
+    LOG_FILE = os.path.join(path, "vault.log")
+    sqlite_store.close()
+    sqlite_store.DATA_DIR = path
+    sqlite_store.DB_FILE = os.path.join(path, "vault.db")
 
 
-def load_vault(fernet: Fernet) -> dict:
-    """Loads and decrypts the vault data from disk."""
-    if not os.path.exists(VAULT_FILE):
-        return {}
+def set_compression(name: str):
+    """Selects the compression applied to new records before encryption."""
+    if name not in codec.COMPRESSORS:
+        raise ValueError(f"Unknown compression: {name}")
+    codec.COMPRESSION = name
+
+
+def set_workers(count: int):
+    """Sets how many threads bulk encryption/decryption uses (0 = one per core)."""
+    utils.set_workers(count)
+
+
+def set_fsync_policy(policy: str):
+    """Selects the durability/latency trade-off; see FSYNC_POLICIES."""
+    global FSYNC_POLICY
+    if policy not in FSYNC_POLICIES:
+        raise ValueError(f"Unknown fsync policy: {policy}")
+    FSYNC_POLICY = policy
+    sqlite_store.set_synchronous({"always": "FULL", "rewrite": "NORMAL", "never": "OFF"}[policy])
+
+
+def _rotate_generations(path: str):
+    """Shifts path.1 -> path.2 ... and keeps the current file as path.1."""
+    if GENERATIONS <= 0 or not os.path.exists(path):
+        return
+
+    for n in range(GENERATIONS - 1, 0, -1):
+        older = f"{path}.{n}"
+        if os.path.exists(older):
+            os.replace(older, f"{path}.{n + 1}")
+
+    # Hard link so the current file never disappears; copy where links are unsupported
+    try:
+        os.link(path, path + ".1")
+    except OSError:
+        shutil.copyfile(path, path + ".1")
+
+
+def _atomic_write(path: str, chunks):
+    """Writes a whole file via temp file + fsync + rename, keeping old generations."""
+    _ensure_data_dir()
+    sync = FSYNC_POLICY != "never"
+
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.writelines(chunks)
+        f.flush()
+        if sync:
+            os.fsync(f.fileno())
+
+    _rotate_generations(path)
+    os.replace(tmp_file, path)
+    if sync:
+        utils.fsync_dir(os.path.dirname(path))
+
+
+def _repair_tail(path: str):
+    """Cuts off a torn last record left by a crash in the middle of an append."""
+    with open(path, "r+b") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+
+        # Scan backwards for the end of the last complete record
+        pos = size
+        while pos > 0:
+            step = min(4096, pos)
+            pos -= step
+            f.seek(pos)
+            newline = f.read(step).rfind(b"\n")
+            if newline != -1:
+                pos += newline + 1
+                break
+        print(f"Discarding {size - pos} bytes of an incomplete vault record")
+        f.truncate(pos)
 
+
+def _encrypt_record(record: dict, fernet: Fernet) -> bytes:
+    return fernet.encrypt(codec.encode(record))
+
+
+def _put_line(name: str, entry: dict, fernet: Fernet) -> bytes:
+    record = {"op": "put", "name": name}
+    record.update({field: entry[field] for field in INDEX_FIELDS})
+    return _encrypt_record(record, fernet) + b" " + entry["secret"] + b"\n"
+
+
+def _del_line(name: str, fernet: Fernet) -> bytes:
+    return _encrypt_record({"op": "del", "name": name}, fernet) + b"\n"
+
+
+def make_entry(username: str, password: str, notes: str, fernet: Fernet, folder: str = "") -> dict:
+    """Builds an index entry, encrypting password and notes into its secret token."""
+    secret = fernet.encrypt(codec.encode({"password": password, "notes": notes}))
+    return {"username": username, "strength": password_strength(password)[1], "folder": folder, "secret": secret}
+
+
+def get_secret(entry: dict, fernet: Fernet) -> dict:
+    """Decrypts an entry's password and notes on demand."""
+    return codec.decode(fernet.decrypt(entry["secret"]))
+
+
+def get_secrets(entries, fernet: Fernet) -> list:
+    """Decrypts many entries' secrets at once, spread over the crypto workers."""
+    return parallel_map(lambda entry: get_secret(entry, fernet), entries)
+
+
+def _append_lines(lines):
+    """Appends already encrypted record lines to the log."""
+    global _log_records
+    _ensure_data_dir()
+
+    lines = list(lines)
+    with open(LOG_FILE, "ab") as f:
+        f.write(b"".join(lines))
+        if FSYNC_POLICY == "always":
+            f.flush()
+            os.fsync(f.fileno())
+    _log_records += len(lines)
+
+
+def _read_log(fernet: Fernet, path: str = None):
+    """Yields (record, parts) for each line of the log.
+
+    Only the index token (parts[0]) is decrypted. Raises ValueError if a
+    record cannot be read, since torn appends are removed by _repair_tail.
+    """
+    def decode(item):
+        try:
+            return codec.decode(fernet.decrypt(item[1][0])), None
+        except (InvalidToken, ValueError, IndexError) as e:
+            return None, e
+
+    with open(path or LOG_FILE, "rb") as f:
+        numbered = enumerate(f, start=1)
+        while True:
+            lines = list(itertools.islice(numbered, READ_BATCH))
+            if not lines:
+                return
+
+            batch = [(line_no, line.split()) for line_no, line in lines]
+            batch = [(line_no, parts) for line_no, parts in batch if parts]
+            for (line_no, parts), (record, error) in zip(batch, parallel_map(decode, batch)):
+                if error is not None:
+                    raise ValueError(f"Vault record {line_no} is unreadable: {error!r}")
+                yield record, parts
+
+
+def _replay_log(fernet: Fernet, path: str = None) -> dict:
+    """Rebuilds the vault index by applying every put/delete record in order.
+
+    Only index tokens are decrypted here; secret tokens stay encrypted.
+    """
+    global _log_records
+    data = {}
+    count = 0
+
+    for record, parts in _read_log(fernet, path):
+        count += 1
+        if record["op"] == "put" and "entry" in record:
+            # Single-token record written before the index/secret split
+            item = record["entry"]
+            data[record["name"]] = make_entry(item["username"], item["password"], item.get("notes", ""), fernet)
+        elif record["op"] == "put":
+            entry = {field: record.get(field, "") for field in INDEX_FIELDS}
+            entry["secret"] = parts[1]
+            data[record["name"]] = entry
+        elif record["op"] == "del":
+            data.pop(record["name"], None)
+
+    _log_records = count
+    return data
+
+
+def _load_legacy(fernet: Fernet) -> dict:
     with open(VAULT_FILE, "rb") as f:
         encrypted = f.read()
 
+    decrypted = codec.decode(fernet.decrypt(encrypted))
+    return {
+        name: make_entry(item["username"], item["password"], item.get("notes", ""), fernet)
+        for name, item in decrypted.items()
+    }
+
+
+def set_backend(name: str):
+    """Selects where entries are stored; see BACKENDS."""
+    global BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown vault backend: {name}")
+    BACKEND = name
+
+
+def migrate_backend(data: dict, fernet: Fernet, name: str):
+    """
+    Copies the loaded vault into another backend and switches to it. The
+    copy is complete before the switch, so if writing it fails the error is
+    raised and the current backend stays in use.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown vault backend: {name}")
+
+    with _write_lock:
+        if name == "sqlite":
+            created = not os.path.exists(sqlite_store.DB_FILE)
+            try:
+                sqlite_store.replace_all(data, fernet)
+            except Exception:
+                # Leave no half-made database behind to be mistaken for the vault
+                sqlite_store.close()
+                if created:
+                    for suffix in ("", "-wal", "-shm"):
+                        if os.path.exists(sqlite_store.DB_FILE + suffix):
+                            os.remove(sqlite_store.DB_FILE + suffix)
+                raise
+        else:
+            _write_log(data, fernet)
+        set_backend(name)
+
+
+def _write_log(data: dict, fernet: Fernet):
+    global _log_records
+    _ensure_data_dir()
+    lines = parallel_map(lambda item: _put_line(item[0], item[1], fernet), data.items())
+    _atomic_write(LOG_FILE, lines)
+    _log_records = len(data)
+
+
+def compact_vault(data: dict, fernet: Fernet):
+    """Rewrites the log so it holds exactly one put record per live entry."""
+    if BACKEND == "sqlite":
+        sqlite_store.vacuum(fernet)
+        return
+
+    with _write_lock:
+        _write_log(data, fernet)
+
+
+def _compact_log(fernet: Fernet):
+    """Rewrites the log from itself, keeping the latest line of each live entry.
+
+    Surviving lines are copied as-is, so nothing is re-encrypted.
+    """
+    global _log_records
+    live = {}
+    for record, parts in _read_log(fernet):
+        if record["op"] == "put":
+            live[record["name"]] = b" ".join(parts) + b"\n"
+        else:
+            live.pop(record["name"], None)
+
+    _atomic_write(LOG_FILE, live.values())
+    _log_records = len(live)
+
+
+def _maybe_compact(live_count: int, fernet: Fernet):
+    if _log_records >= COMPACT_MIN_RECORDS and _log_records >= COMPACT_RATIO * live_count:
+        _compact_log(fernet)
+
+
+def write_changes(changes: dict, fernet: Fernet, live_count: int = None):
+    """Persists a set of changes in one write.
+
+    `changes` maps account name -> entry (put) or None (delete). On the log
+    backend this is a single append; on SQLite a single transaction.
+    `live_count` is the number of entries in the vault afterwards and is
+    used to decide when the log needs compacting.
+    """
+    with _write_lock:
+        if BACKEND == "sqlite":
+            with sqlite_store.transaction(fernet):
+                for name, entry in changes.items():
+                    if entry is None:
+                        sqlite_store.delete(name, fernet)
+                    else:
+                        sqlite_store.put(name, entry, fernet)
+            return
+
+        _append_lines([
+            _del_line(name, fernet) if entry is None else _put_line(name, entry, fernet)
+            for name, entry in changes.items()
+        ])
+        if live_count is not None:
+            _maybe_compact(live_count, fernet)
+
+
+def save_vault(data: dict, fernet: Fernet):
+    """Encrypts and saves the whole vault to disk (a full compaction)."""
+    if BACKEND == "sqlite":
+        with _write_lock:
+            sqlite_store.replace_all(data, fernet)
+        return
+    compact_vault(data, fernet)
+
+
+def _log_uses_key(fernet: Fernet) -> bool:
+    """True if the first record of the log decrypts with `fernet`."""
+    with open(LOG_FILE, "rb") as f:
+        for line in f:
+            parts = line.split()
+            if parts:
+                try:
+                    fernet.decrypt(parts[0])
+                    return True
+                except InvalidToken:
+                    return False
+    return True
+
+
+def _remove_old_key_files():
+    """
+    Deletes files that the old key (and so the old password) could still
+    open: log generations, the legacy vault, and the copy left in the backend
+    not in use by migrate_backend(). The other backend's copy only goes once
+    the current one holds the vault. vault.log.corrupt stays: it may hold
+    changes a rollback lost, and only the user can decide it is not needed.
+    Returns the paths it could not delete.
+    """
+    stale = [f"{LOG_FILE}.{n}" for n in range(1, GENERATIONS + 1)]
+    stale.append(VAULT_FILE)
+    if BACKEND == "sqlite" and os.path.exists(sqlite_store.DB_FILE):
+        stale.append(LOG_FILE)
+    elif BACKEND == "log" and os.path.exists(LOG_FILE):
+        sqlite_store.close()
+        stale += [sqlite_store.DB_FILE + suffix for suffix in ("", "-wal", "-shm")]
+
+    removed, leftover = False, []
+    for path in stale:
+        if os.path.exists(path):
+            try:
+                os.remove(path)
+                removed = True
+            except OSError:
+                leftover.append(path)
+    if removed and FSYNC_POLICY != "never":
+        utils.fsync_dir(DATA_DIR)
+    return leftover
+
+
+def _rekey_log(old_fernet: Fernet, new_fernet: Fernet, progress, batch_size: int):
+    if not os.path.exists(LOG_FILE):
+        if not os.path.exists(VAULT_FILE):
+            return
+        load_vault(old_fernet)  # moves the legacy vault.enc into the log
+
+    _repair_tail(LOG_FILE)
+    if _log_uses_key(new_fernet):
+        return
+
+    def convert(line):
+        tokens = [new_fernet.encrypt(old_fernet.decrypt(token)) for token in line.split()]
+        return b" ".join(tokens) + b"\n"
+
+    total = os.path.getsize(LOG_FILE)
+    done = 0
+    tmp_file = LOG_FILE + ".rekey"
+    with open(LOG_FILE, "rb") as src, open(tmp_file, "wb") as dst:
+        while True:
+            lines = list(itertools.islice(src, batch_size))
+            if not lines:
+                break
+            dst.writelines(parallel_map(convert, [line for line in lines if line.strip()]))
+            done += sum(len(line) for line in lines)
+            if progress:
+                progress(done, total)
+
+        dst.flush()
+        if FSYNC_POLICY != "never":
+            os.fsync(dst.fileno())
+
+    os.replace(tmp_file, LOG_FILE)
+    if FSYNC_POLICY != "never":
+        utils.fsync_dir(DATA_DIR)
+
+
+def rekey_vault(old_fernet: Fernet, new_fernet: Fernet, progress=None, batch_size: int = READ_BATCH):
+    """
+    Re-encrypts the stored vault under a new key, streaming it in batches.
+
+    Records are copied batch by batch into a new file that replaces the old
+    one atomically, so memory use does not grow with the vault size.
+    progress(done, total) is called after each batch. Afterwards every other
+    file the old key can open is deleted. Running it again on a vault that
+    already uses the new key only repeats that clean-up.
+
+    It raises only while the vault is still under the old key. Once the new
+    file is in place it returns the paths of old-key files it could not
+    delete (normally none), for the caller to report.
+    """
+    with _write_lock:
+        if BACKEND == "sqlite":
+            sqlite_store.rekey(old_fernet, new_fernet, progress, batch_size)
+        else:
+            _rekey_log(old_fernet, new_fernet, progress, batch_size)
+        return _remove_old_key_files()
+
+
+def close():
+    """Releases backend resources at the end of a session."""
+    sqlite_store.close()
+
+
+def _recover_from_generation(fernet: Fernet) -> dict:
+    """Restores the newest readable generation as the current log (see RECOVERED_GENERATION)."""
+    global RECOVERED_GENERATION
+    for n in range(1, GENERATIONS + 1):
+        candidate = f"{LOG_FILE}.{n}"
+        if not os.path.exists(candidate):
+            continue
+        try:
+            data = _replay_log(fernet, candidate)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Vault generation {n} is unusable: {e}")
+            continue
+
+        print(f"Recovered the vault from generation {n}")
+        # The copy is complete on disk before it replaces anything
+        tmp_file = LOG_FILE + ".tmp"
+        shutil.copyfile(candidate, tmp_file)
+        if FSYNC_POLICY != "never":
+            with open(tmp_file, "rb") as f:
+                os.fsync(f.fileno())
+        if os.path.exists(LOG_FILE):
+            os.replace(LOG_FILE, LOG_FILE + ".corrupt")
+        os.replace(tmp_file, LOG_FILE)
+        if FSYNC_POLICY != "never":
+            utils.fsync_dir(DATA_DIR)
+        RECOVERED_GENERATION = n
+        return data
+
+    raise ValueError("The vault is damaged and no readable generation was found.")
+
+
+def load_vault(fernet: Fernet) -> dict:
+    """Loads and decrypts the vault data from disk.
+
+    A damaged log falls back to the newest readable generation; if nothing
+    can be read an exception is raised rather than returning an empty vault.
+    """
+    global RECOVERED_GENERATION
+    RECOVERED_GENERATION = None
+    if BACKEND == "sqlite":
+        return dict(sqlite_store.iterate(fernet))
+
+    if os.path.exists(LOG_FILE):
+        _repair_tail(LOG_FILE)
+        try:
+            return _replay_log(fernet)
+        except (ValueError, KeyError) as e:
+            print(f"Vault log is damaged: {e}")
+            return _recover_from_generation(fernet)
+
+    if os.path.exists(f"{LOG_FILE}.1"):
+        # Crash between rotating and renaming, or the log was removed
+        return _recover_from_generation(fernet)
+
+    if not os.path.exists(VAULT_FILE):
+        return {}
+
     try:
-        decrypted = fernet.decrypt(encrypted)
-        return json.loads(decrypted.decode())
+        data = _load_legacy(fernet)
     except Exception as e:
         print(f"Decryption error: {e}")
-        return {}
+        raise
 
+    # Migrate the old single-token vault into the record log
+    compact_vault(data, fernet)
+    return data
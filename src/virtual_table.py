@@ -0,0 +1,325 @@
+import tkinter as tk
+from bisect import bisect_left
+
+
+def _longest_increasing(values: list) -> set:
+    """Indexes of one longest strictly increasing subsequence of `values`."""
+    tails, tail_index, previous = [], [], [None] * len(values)
+    for index, value in enumerate(values):
+        slot = bisect_left(tails, value)
+        if slot:
+            previous[index] = tail_index[slot - 1]
+        if slot == len(tails):
+            tails.append(value)
+            tail_index.append(index)
+        else:
+            tails[slot] = value
+            tail_index[slot] = index
+
+    result = set()
+    index = tail_index[-1] if tail_index else None
+    while index is not None:
+        result.add(index)
+        index = previous[index]
+    return result
+
+
+class VirtualTable:
+    """
+    Shows a long list of rows in a Treeview while only creating items for the
+    rows that fit on screen.
+
+    The table keeps a plain list of row keys as its model. The Treeview only
+    holds items for the rows in view (plus `buffer` spares below the fold),
+    so scrolling and first paint cost the same for 1,000 rows as for
+    1,000,000. Selection is tracked by key, and zebra tags follow the
+    absolute row index.
+
+    Several rows can be selected (Ctrl-click toggles, Shift-click selects a
+    range, Ctrl-A selects all), including rows scrolled out of view, which
+    have no Treeview item. `selected` is the row the keyboard and single-row
+    actions work on; `selection` holds every selected key.
+
+    Each shown key keeps its item id, and render() reconciles the Treeview
+    against the new window: rows that stay are left alone (or moved), rows
+    that leave are recycled for rows that arrive, and values or tags are only
+    rewritten when they changed. A refresh after one edit therefore costs a
+    handful of Tk calls, one that changes nothing costs none, and the view
+    stays anchored on its top row.
+    """
+
+    def __init__(self, tree, scrollbar, row_values, buffer: int = 2):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_values = row_values
+        self.buffer = buffer
+
+        self.rows = []          # the model: row keys in display order
+        self.first = 0          # model index of the top visible row
+        self.visible = 1        # whole rows that fit in the widget
+        self.selected = None    # key of the focused row, if any
+        self.selection = set()  # keys of all selected rows
+        self._items = {}        # shown key -> Treeview item id
+        self._keys = {}         # Treeview item id -> shown key
+        self._shown = {}        # Treeview item id -> (values, tag) last written
+        self._order = []        # Treeview item ids, top to bottom
+        self._selected_items = ()   # Treeview selection last set
+        self._scroll = None     # scrollbar fractions last set
+        self._row_height = 0
+
+        scrollbar.configure(command=self._on_scrollbar)
+        tree.configure(selectmode="extended")
+        tree.bind("<Configure>", self._on_resize, add="+")
+        tree.bind("<Button-1>", self._on_click)
+        tree.bind("<Control-a>", lambda e: self.select_all() or "break")
+        tree.bind("<MouseWheel>", self._on_wheel, add="+")
+        tree.bind("<Button-4>", lambda e: self.scroll(-3) or "break", add="+")
+        tree.bind("<Button-5>", lambda e: self.scroll(3) or "break", add="+")
+        for key, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"), ("<Next>", "page"),
+                          ("<Home>", "home"), ("<End>", "end")):
+            tree.bind(key, lambda e, step=step: self._on_key(step))
+
+    # ---------- model ----------
+    def set_rows(self, keys):
+        """
+        Replaces the displayed rows. The view stays on the same top row and the
+        selection survives if their keys are still present.
+        """
+        top = self.rows[self.first] if self.first < len(self.rows) else None
+        self.rows = keys if isinstance(keys, list) else list(keys)
+
+        if top is not None:
+            self.first = self._find(top, self.first)
+        if self.selection and not self.selection.issubset(self._window()):
+            # Only pay for a full membership test when a selected key is outside the viewport
+            self.selection.intersection_update(self.rows)
+        if self.selected not in self.selection:
+            self.selected = None
+        self.first = self._clamp(self.first)
+        self.render()
+
+    def _find(self, key, near: int) -> int:
+        """Index of `key` in the model, searched near `near` first; `near` if absent."""
+        rows = self.rows
+        if near < len(rows) and rows[near] == key:
+            return near  # nothing moved above the view
+        try:
+            # Edits usually shift the view by a few rows
+            return rows.index(key, max(0, near - 64), near + 64)
+        except ValueError:
+            pass
+        try:
+            return rows.index(key)
+        except ValueError:
+            return near
+
+    def _window(self):
+        return self.rows[self.first:self.first + self.visible + self.buffer]
+
+    def selected_key(self):
+        return self.selected
+
+    def selected_keys(self) -> list:
+        """Every selected key, in display order."""
+        if len(self.selection) == 1:
+            return list(self.selection)
+        return [key for key in self.rows if key in self.selection]
+
+    def select(self, key):
+        """Selects only `key` and scrolls it into view."""
+        self.selected = key
+        self.selection = {key}
+        try:
+            self.see(self.rows.index(key))
+        except ValueError:
+            self.render()
+
+    def select_all(self):
+        self.selection = set(self.rows)
+        if self.selected is None and self.rows:
+            self.selected = self.rows[self.first]
+        self.render()
+
+    def clear(self):
+        self.rows = []
+        self.first = 0
+        self.selected = None
+        self.selection = set()
+        self.render()
+
+    # ---------- scrolling ----------
+    def _clamp(self, first: int) -> int:
+        return max(0, min(first, len(self.rows) - self.visible))
+
+    def scroll(self, rows: int):
+        self.scroll_to(self.first + rows)
+
+    def scroll_to(self, first: int):
+        first = self._clamp(first)
+        if first != self.first:
+            self.first = first
+            self.render()
+
+    def see(self, index: int):
+        """Scrolls the least distance that brings row `index` into view."""
+        if index < self.first:
+            self.first = self._clamp(index)
+        elif index >= self.first + self.visible:
+            self.first = self._clamp(index - self.visible + 1)
+        self.render()
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self.scroll_to(round(float(args[0]) * len(self.rows)))
+        elif action == "scroll":
+            amount, unit = int(args[0]), args[1]
+            self.scroll(amount * (self.visible if unit == "pages" else 1))
+
+    def _on_wheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll(-3 * step)
+        return "break"
+
+    def _on_key(self, step):
+        if not self.rows:
+            return "break"
+        window = self._window()
+        current = self.first + window.index(self.selected) if self.selected in window else self.first - 1
+        if step == "home":
+            index = 0
+        elif step == "end":
+            index = len(self.rows) - 1
+        elif step == "page":
+            index = current + self.visible
+        elif step == "-page":
+            index = current - self.visible
+        else:
+            index = current + step
+        index = max(0, min(index, len(self.rows) - 1))
+        self.selected = self.rows[index]
+        self.selection = {self.selected}
+        self.see(index)
+        return "break"  # the Treeview must not scroll its own items
+
+    def _on_resize(self, event):
+        if not self._row_height:
+            self._row_height = self._lookup_row_height()
+        # The heading row takes roughly one row of the widget height
+        visible = max(1, event.height // self._row_height - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.first = self._clamp(self.first)
+            self.render()
+
+    def _lookup_row_height(self) -> int:
+        style = self.tree.cget("style") or "Treeview"
+        try:
+            height = int(self.tree.tk.call("ttk::style", "lookup", style, "-rowheight"))
+        except (ValueError, tk.TclError):
+            height = 0
+        return height or 20
+
+    # ---------- selection ----------
+    def _on_click(self, event):
+        # The Treeview only knows the rows on screen, so clicks are handled on keys
+        item = self.tree.identify_row(event.y)
+        if item not in self._keys:
+            return None  # headings and empty space keep their default behaviour
+        key = self._keys[item]
+        self.tree.focus_set()
+
+        if event.state & 0x0001 and self.selected is not None:
+            # Shift: the range from the focused row, which may be far off screen
+            start, end = sorted((self._find(self.selected, self.first), self._find(key, self.first)))
+            self.selection = set(self.rows[start:end + 1])
+        elif event.state & 0x0004:
+            # Control: toggle one row
+            self.selection ^= {key}
+            if key in self.selection:
+                self.selected = key
+            elif self.selected not in self.selection:
+                self.selected = next(iter(self.selection), None)
+        else:
+            self.selected = key
+            self.selection = {key}
+        self.render()
+        return "break"
+
+    # ---------- drawing ----------
+    def render(self):
+        """Reconciles the Treeview with the current window; Tk calls scale with the changes."""
+        tree = self.tree
+        window = self._window()
+        items, keys, shown = self._items, self._keys, self._shown
+
+        # Items whose rows left the window are recycled for the rows that arrive
+        in_window = set(window)
+        spare = []
+        changed = False
+        for key in [key for key in items if key not in in_window]:
+            item = items.pop(key)
+            del keys[item]
+            spare.append(item)
+
+        order = []
+        for offset, key in enumerate(window):
+            index = self.first + offset
+            item = items.get(key)
+            if item is None:
+                item = spare.pop() if spare else tree.insert("", "end")
+                items[key] = item
+                keys[item] = key
+                changed = True
+            state = (self.row_values(key), "even" if index % 2 == 0 else "odd")
+            if shown.get(item) != state:
+                tree.item(item, values=state[0], tags=(state[1],))
+                shown[item] = state
+                changed = True
+            order.append(item)
+
+        if spare:
+            tree.delete(*spare)
+            for item in spare:
+                del shown[item]
+            changed = True
+
+        # Where Tk has the items now: survivors in their old places, new ones appended
+        current = [item for item in self._order if item in keys]
+        placed = set(current)
+        current += [item for item in order if item not in placed]
+
+        # Items already in the right relative order stay put; the rest are
+        # moved, each right after its predecessor in the new order
+        if current != order:
+            position = {item: index for index, item in enumerate(current)}
+            keep = _longest_increasing([position[item] for item in order])
+            for index, item in enumerate(order):
+                if index in keep:
+                    continue
+                current.remove(item)
+                target = current.index(order[index - 1]) + 1 if index else 0
+                current.insert(target, item)
+                tree.move(item, "", target)
+            changed = True
+        self._order = order
+
+        # Only this class sets the Treeview selection, so it is compared with
+        # what was last set rather than asked from Tk
+        selected_items = tuple(item for item in order if keys[item] in self.selection)
+        if selected_items != self._selected_items:
+            if selected_items:
+                tree.selection_set(*selected_items)
+            else:
+                tree.selection_remove(*tree.selection())
+            self._selected_items = selected_items
+
+        # The window always starts at the top of the widget; buffer rows stay
+        # below the fold. Inserting or moving items can scroll the Treeview.
+        if changed:
+            tree.yview_moveto(0)
+        total = len(self.rows)
+        scroll = (self.first / total, min(1.0, (self.first + self.visible) / total)) if total else (0, 1)
+        if scroll != self._scroll:
+            self.scrollbar.set(*scroll)
+            self._scroll = scroll